@@ -53,7 +53,8 @@ AUTH_INTERNAL_KEYWORDS = frozenset([
     'raw',
     'yield_pub_data',
     'batch',
-    'batch_delay'
+    'batch_delay',
+    'batch_use_minion_data_cache'
 ])
 
 
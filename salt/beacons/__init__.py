@@ -8,12 +8,15 @@ from __future__ import absolute_import
 import copy
 import logging
 import re
+import time
+from multiprocessing.pool import ThreadPool
 
 # Import Salt libs
 import salt.loader
 import salt.utils.event
 import salt.utils.minion
 from salt.exceptions import CommandExecutionError
+from salt.ext import six
 from salt.ext.six.moves import map
 
 log = logging.getLogger(__name__)
@@ -29,11 +32,20 @@ class Beacon(object):
         self.functions = functions
         self.beacons = salt.loader.beacons(opts, functions)
         self.interval_map = dict()
+        # Execution times of the beacons, reported by beacons.list
+        self.stats = dict()
+        # Beacons running in the thread pool, when beacons_threads is set
+        self.pool = None
+        self.running = dict()
 
     def process(self, config, grains):
         """
         Process the configured beacons
 
+        With ``beacons_threads`` set, the due beacons are handed to a thread
+        pool and the events of those which finished since the last call are
+        returned.
+
         The config must be a list and looks like this in yaml
 
         .. code_block:: yaml
@@ -44,9 +56,12 @@ class Beacon(object):
                     - /var/cache/foo: {}
         """
         ret = []
+        if self.opts.get("beacons_threads"):
+            # Send the events of the beacons which finished since the last loop
+            ret.extend(self._collect())
         b_config = copy.deepcopy(config)
         if "enabled" in b_config and not b_config["enabled"]:
-            return
+            return ret
         for mod in config:
             if mod == "enabled":
                 continue
@@ -79,6 +94,9 @@ class Beacon(object):
             fun_str = '{0}.beacon'.format(beacon_name)
             validate_str = '{0}.validate'.format(beacon_name)
             if fun_str in self.beacons:
+                if mod in self.running:
+                    log.trace("Skipping beacon %s. Still running.", mod)
+                    continue
                 runonce = self._determine_beacon_config(
                     current_beacon_config, "run_once"
                 )
@@ -90,6 +108,10 @@ class Beacon(object):
                     if not self._process_interval(mod, interval):
                         log.trace("Skipping beacon %s. Interval not reached.", mod)
                         continue
+                timeout = self.opts.get("beacons_timeout")
+                if "timeout" in current_beacon_config:
+                    timeout = current_beacon_config["timeout"]
+                    b_config = self._trim_config(b_config, mod, "timeout")
                 if self._determine_beacon_config(
                     current_beacon_config, "disable_during_state_run"
                 ):
@@ -130,22 +152,112 @@ class Beacon(object):
                         continue
 
                 # Fire the beacon!
-                raw = self.beacons[fun_str](b_config[mod])
-                for data in raw:
-                    tag = 'salt/beacon/{0}/{1}/'.format(self.opts['id'], mod)
-                    if 'tag' in data:
-                        tag += data.pop('tag')
-                    if 'id' not in data:
-                        data['id'] = self.opts['id']
-                    ret.append({'tag': tag,
-                                'data': data,
-                                'beacon_name': beacon_name})
+                if self.opts.get("beacons_threads"):
+                    self.running[mod] = {
+                        "result": self._get_pool().apply_async(
+                            self._run_beacon, (fun_str, b_config[mod])
+                        ),
+                        "start": time.time(),
+                        "timeout": timeout,
+                        "beacon_name": beacon_name,
+                        "runonce": runonce,
+                    }
+                    continue
+                raw, start, duration = self._run_beacon(fun_str, b_config[mod])
+                self._record_run(mod, start, duration)
+                ret.extend(self._format_events(mod, beacon_name, raw))
                 if runonce:
                     self.disable_beacon(mod)
             else:
                 log.warning("Unable to process beacon %s", mod)
         return ret
 
+    def _get_pool(self):
+        """
+        Return the thread pool running the beacons, starting it if needed
+        """
+        if self.pool is None:
+            self.pool = ThreadPool(self.opts["beacons_threads"])
+        return self.pool
+
+    def _run_beacon(self, fun_str, config):
+        """
+        Run a beacon, return its data along with when it started and how
+        long it took
+        """
+        start = time.time()
+        raw = self.beacons[fun_str](config)
+        return raw, start, time.time() - start
+
+    def _get_stats(self, mod):
+        """
+        Return the execution stats of a beacon
+        """
+        return self.stats.setdefault(mod, {"runs": 0, "timeouts": 0})
+
+    def _record_run(self, mod, start, duration):
+        """
+        Record the execution time of a beacon
+        """
+        stats = self._get_stats(mod)
+        stats["runs"] += 1
+        stats["last_run"] = start
+        stats["duration"] = duration
+
+    def _format_events(self, mod, beacon_name, raw):
+        """
+        Turn the data returned by a beacon into events
+        """
+        ret = []
+        for data in raw:
+            tag = "salt/beacon/{0}/{1}/".format(self.opts["id"], mod)
+            if "tag" in data:
+                tag += data.pop("tag")
+            if "id" not in data:
+                data["id"] = self.opts["id"]
+            ret.append({"tag": tag, "data": data, "beacon_name": beacon_name})
+        return ret
+
+    def _collect(self):
+        """
+        Return the events of the beacons which finished running in the
+        thread pool. Beacons running for longer than their timeout are given
+        up on, so that they can be started again.
+        """
+        ret = []
+        for mod, job in list(six.iteritems(self.running)):
+            if not job["result"].ready():
+                if job["timeout"] and time.time() - job["start"] > job["timeout"]:
+                    log.warning(
+                        "Beacon %s did not finish within %s seconds, "
+                        "its events will be discarded.",
+                        mod,
+                        job["timeout"],
+                    )
+                    del self.running[mod]
+                    self._get_stats(mod)["timeouts"] += 1
+                continue
+            del self.running[mod]
+            try:
+                raw, start, duration = job["result"].get()
+            except Exception:  # pylint: disable=broad-except
+                log.error("The beacon %s errored", mod, exc_info=True)
+                continue
+            self._record_run(mod, start, duration)
+            ret.extend(self._format_events(mod, job["beacon_name"], raw))
+            if job["runonce"]:
+                self.disable_beacon(mod)
+        return ret
+
+    def destroy(self):
+        """
+        Stop the thread pool running the beacons
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        self.running = dict()
+
     def _trim_config(self, b_config, mod, key):
         """
         Take a beacon configuration and strip out the interval bits
@@ -173,19 +285,15 @@ class Beacon(object):
         Return True if a beacon should be run on this loop
         """
         log.trace("Processing interval %s for beacon mod %s", interval, mod)
-        loop_interval = self.opts["loop_interval"]
+        now = time.time()
         if mod in self.interval_map:
-            log.trace("Processing interval in map")
-            counter = self.interval_map[mod]
-            log.trace("Interval counter: %s", counter)
-            if counter * loop_interval >= interval:
-                self.interval_map[mod] = 1
+            log.trace("Next run of beacon %s at %s", mod, self.interval_map[mod])
+            if now >= self.interval_map[mod]:
+                self.interval_map[mod] = now + interval
                 return True
-            else:
-                self.interval_map[mod] += 1
         else:
             log.trace("Interval process inserting mod: %s", mod)
-            self.interval_map[mod] = 1
+            self.interval_map[mod] = now + interval
         return False
 
     def _get_index(self, beacon_config, label):
@@ -256,7 +364,7 @@ class Beacon(object):
         # Fire the complete event back along with the list of beacons
         with salt.utils.event.get_event("minion", opts=self.opts) as evt:
             evt.fire_event(
-                {"complete": True, "beacons": beacons},
+                {"complete": True, "beacons": beacons, "stats": self.stats},
                 tag="/salt/minion/minion_beacons_list_complete",
             )
 
@@ -17,6 +17,7 @@ from datetime import datetime, timedelta
 import salt.client
 import salt.exceptions
 import salt.output
+import salt.utils.minions
 
 # Import salt libs
 import salt.utils.stringutils
@@ -89,6 +90,24 @@ def batch_get_opts(
     return opts
 
 
+def batch_get_minions_from_cache(opts):
+    '''
+    Return the connected minions matched by the target, and the matched ones
+    which are not connected, from the minion data cache instead of a
+    ``test.ping`` round. Return None if the minion data cache is disabled.
+    '''
+    if not opts.get('minion_data_cache', False):
+        log.warning(
+            'batch_use_minion_data_cache requires minion_data_cache, '
+            'falling back to test.ping')
+        return None
+    ckminions = salt.utils.minions.CkMinions(opts)
+    tgt_type = opts.get('selected_target_option') or opts.get('tgt_type', 'glob')
+    matched = set(ckminions.check_minions(opts['tgt'], tgt_type, greedy=False)['minions'])
+    connected = ckminions.connected_ids(subset=matched)
+    return connected, matched.difference(connected)
+
+
 def batch_get_eauth(kwargs):
     eauth = {}
     if 'eauth' in kwargs:
@@ -120,6 +139,11 @@ class Batch(object):
         """
         Return a list of minions to use for the batch run
         """
+        if self.opts.get("batch_use_minion_data_cache", False):
+            cached = batch_get_minions_from_cache(self.opts)
+            if cached is not None:
+                return (list(cached[0]), iter(()), cached[1])
+
         args = [
             self.opts["tgt"],
             "test.ping",
@@ -13,10 +13,57 @@ import salt.client
 # pylint: enable=import-error,no-name-in-module,redefined-builtin
 import logging
 import fnmatch
+import time
 
 log = logging.getLogger(__name__)
 
-from salt.cli.batch import get_bnum, batch_get_opts, batch_get_eauth
+from salt.cli.batch import (
+    get_bnum,
+    batch_get_opts,
+    batch_get_eauth,
+    batch_get_minions_from_cache,
+)
+
+# Upper bounds, in seconds, of the buckets of the batch latency histogram
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600)
+
+
+class BatchLatency(object):
+    '''
+    Histogram of the time the minions of a batch took to return
+    '''
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, latency):
+        self.count += 1
+        self.total += latency
+        self.min = latency if self.min is None else min(self.min, latency)
+        self.max = latency if self.max is None else max(self.max, latency)
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def to_dict(self):
+        histogram = dict(
+            ('<={0}'.format(bound), self.buckets[index])
+            for index, bound in enumerate(LATENCY_BUCKETS)
+        )
+        histogram['>{0}'.format(LATENCY_BUCKETS[-1])] = self.buckets[-1]
+        return {
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else None,
+            'histogram': histogram,
+        }
 
 
 class BatchAsync(object):
@@ -32,6 +79,12 @@ class BatchAsync(object):
         - batch_presence_ping_timeout: time to wait for presence pings before starting the batch
         - gather_job_timeout: `find_job` timeout
         - timeout: time to wait before firing a `find_job`
+        - batch_use_minion_data_cache: target the connected minions from the
+          minion data cache instead of a presence ping
+
+    A minion is started as soon as an in-flight one returns, unless
+    `batch_delay` is set. Minions which send job heartbeats (see the
+    `job_heartbeat_interval` minion option) are not pinged with `find_job`.
 
     When the batch stars, a `start` event is fired:
          - tag: salt/batch/<batch-jid>/start
@@ -40,13 +93,26 @@ class BatchAsync(object):
              "down_minions": self.down_minions
            }
 
+    Each time a minion returns or times out, a `progress` event is fired:
+        - tag: salt/batch/<batch-jid>/progress
+        - data: {
+             "minion": <minion id>,
+             "timedout": <whether the minion timed out>,
+             "total": <number of available minions>,
+             "done": <number of minions which returned>,
+             "timedout_count": <number of minions which timed out>,
+             "active": <number of minions running the job>,
+             "latency": <latency histogram of the returns>
+           }
+
     When the batch ends, an `done` event is fired:
         - tag: salt/batch/<batch-jid>/done
         - data: {
              "available_minions": self.minions,
              "down_minions": self.down_minions,
              "done_minions": self.done_minions,
-             "timedout_minions": self.timedout_minions
+             "timedout_minions": self.timedout_minions,
+             "latency": <latency histogram of the returns>
          }
     '''
     def __init__(self, parent_opts, jid_gen, clear_load):
@@ -57,13 +123,16 @@ class BatchAsync(object):
         else:
             clear_load['gather_job_timeout'] = self.local.opts['gather_job_timeout']
         self.batch_presence_ping_timeout = clear_load['kwargs'].get('batch_presence_ping_timeout', None)
-        self.batch_delay = clear_load['kwargs'].get('batch_delay', 1)
+        self.batch_delay = clear_load['kwargs'].get('batch_delay', 0)
         self.opts = batch_get_opts(
             clear_load.pop('tgt'),
             clear_load.pop('fun'),
             clear_load['kwargs'].pop('batch'),
             self.local.opts,
             **clear_load)
+        self.use_minion_data_cache = clear_load['kwargs'].get(
+            'batch_use_minion_data_cache',
+            self.opts.get('batch_use_minion_data_cache', False))
         self.eauth = batch_get_eauth(clear_load['kwargs'])
         self.metadata = clear_load['kwargs'].get('metadata', {})
         self.minions = set()
@@ -72,6 +141,10 @@ class BatchAsync(object):
         self.done_minions = set()
         self.active = set()
         self.initialized = False
+        self.ended = False
+        self.started = {}
+        self.heartbeats = {}
+        self.latency = BatchLatency()
         self.ping_jid = jid_gen()
         self.batch_jid = jid_gen()
         self.find_job_jid = jid_gen()
@@ -89,13 +162,16 @@ class BatchAsync(object):
         ping_return_pattern = 'salt/job/{0}/ret/*'.format(self.ping_jid)
         batch_return_pattern = 'salt/job/{0}/ret/*'.format(self.batch_jid)
         find_job_return_pattern = 'salt/job/{0}/ret/*'.format(self.find_job_jid)
+        heartbeat_pattern = 'salt/job/{0}/heartbeat/*'.format(self.batch_jid)
         self.event.subscribe(ping_return_pattern, match_type='glob')
         self.event.subscribe(batch_return_pattern, match_type='glob')
         self.event.subscribe(find_job_return_pattern, match_type='glob')
+        self.event.subscribe(heartbeat_pattern, match_type='glob')
         self.event.patterns = {
             (ping_return_pattern, 'ping_return'),
             (batch_return_pattern, 'batch_run'),
-            (find_job_return_pattern, 'find_job_return')
+            (find_job_return_pattern, 'find_job_return'),
+            (heartbeat_pattern, 'heartbeat'),
         }
         self.event.set_event_handler(self.__event_handler)
 
@@ -108,19 +184,39 @@ class BatchAsync(object):
                 minion = data['id']
                 if op == 'ping_return':
                     self.minions.add(minion)
-                    self.down_minions.remove(minion)
+                    self.down_minions.discard(minion)
                     if not self.down_minions:
                         self.event.io_loop.spawn_callback(self.start_batch)
                 elif op == 'find_job_return':
-                    self.find_job_returned.add(minion)
+                    # an empty return means the job is not running anymore
+                    if data.get('return') != {}:
+                        self.find_job_returned.add(minion)
+                elif op == 'heartbeat':
+                    if minion in self.active:
+                        self.heartbeats[minion] = (
+                            time.time()
+                            + data.get('heartbeat', 0)
+                            + self.opts['gather_job_timeout'])
                 elif op == 'batch_run':
                     if minion in self.active:
                         self.active.remove(minion)
                         self.done_minions.add(minion)
-                        # call later so that we maybe gather more returns
-                        self.event.io_loop.call_later(self.batch_delay, self.schedule_next)
+                        self.heartbeats.pop(minion, None)
+                        if minion in self.started:
+                            self.latency.add(time.time() - self.started.pop(minion))
+                        self.fire_progress(minion)
+                        if self.batch_delay:
+                            # call later so that we maybe gather more returns
+                            self.event.io_loop.call_later(self.batch_delay, self.schedule_next)
+                        else:
+                            # slide the window right away
+                            self.event.io_loop.spawn_callback(self.schedule_next)
 
-        if self.initialized and self.done_minions == self.minions.difference(self.timedout_minions):
+        self._check_done()
+
+    def _check_done(self):
+        if self.initialized and not self.ended and \
+                self.done_minions == self.minions.difference(self.timedout_minions):
             self.end_batch()
 
     def _get_next(self):
@@ -134,31 +230,47 @@ class BatchAsync(object):
         )
         return set(list(to_run)[:next_batch_size])
 
+    def _alive(self, minions):
+        '''
+        Return the minions which recently sent a heartbeat for the batch job
+        '''
+        now = time.time()
+        return set(minion for minion in minions if self.heartbeats.get(minion, 0) > now)
+
     @tornado.gen.coroutine
     def check_find_job(self, minions):
-        did_not_return = minions.difference(self.find_job_returned)
+        did_not_return = minions.difference(self.find_job_returned).difference(
+            self._alive(minions)).difference(self.done_minions)
         if did_not_return:
             for minion in did_not_return:
-                if minion in self.find_job_returned:
-                    self.find_job_returned.remove(minion)
                 if minion in self.active:
                     self.active.remove(minion)
+                self.started.pop(minion, None)
                 self.timedout_minions.add(minion)
+                self.fire_progress(minion, timedout=True)
+            if self.initialized:
+                # timed out minions free their slots
+                self.event.io_loop.spawn_callback(self.schedule_next)
         running = minions.difference(did_not_return).difference(self.done_minions).difference(self.timedout_minions)
         if running:
             self.event.io_loop.add_callback(self.find_job, running)
+        self._check_done()
 
     @tornado.gen.coroutine
     def find_job(self, minions):
         not_done = minions.difference(self.done_minions)
-        ping_return = yield self.local.run_job_async(
-            not_done,
-            'saltutil.find_job',
-            [self.batch_jid],
-            'list',
-            gather_job_timeout=self.opts['gather_job_timeout'],
-            jid=self.find_job_jid,
-            **self.eauth)
+        # minions sending heartbeats are known to be running the job
+        to_ping = not_done.difference(self._alive(not_done))
+        if to_ping:
+            self.find_job_returned.difference_update(to_ping)
+            ping_return = yield self.local.run_job_async(
+                to_ping,
+                'saltutil.find_job',
+                [self.batch_jid],
+                'list',
+                gather_job_timeout=self.opts['gather_job_timeout'],
+                jid=self.find_job_jid,
+                **self.eauth)
         self.event.io_loop.call_later(
             self.opts['gather_job_timeout'],
             self.check_find_job,
@@ -167,6 +279,12 @@ class BatchAsync(object):
     @tornado.gen.coroutine
     def start(self):
         self.__set_event_handler()
+        if self.use_minion_data_cache:
+            cached = batch_get_minions_from_cache(self.opts)
+            if cached is not None:
+                self.minions, self.down_minions = cached
+                yield self.start_batch()
+                return
         #start batching even if not all minions respond to ping
         self.event.io_loop.call_later(
             self.batch_presence_ping_timeout or self.opts['gather_job_timeout'],
@@ -198,12 +316,27 @@ class BatchAsync(object):
             self.event.fire_event(data, "salt/batch/{0}/start".format(self.batch_jid))
             yield self.schedule_next()
 
+    def fire_progress(self, minion, timedout=False):
+        data = {
+            "minion": minion,
+            "timedout": timedout,
+            "total": len(self.minions),
+            "done": len(self.done_minions),
+            "timedout_count": len(self.timedout_minions),
+            "active": len(self.active),
+            "latency": self.latency.to_dict(),
+            "metadata": self.metadata
+        }
+        self.event.fire_event(data, "salt/batch/{0}/progress".format(self.batch_jid))
+
     def end_batch(self):
+        self.ended = True
         data = {
             "available_minions": self.minions,
             "down_minions": self.down_minions,
             "done_minions": self.done_minions,
             "timedout_minions": self.timedout_minions,
+            "latency": self.latency.to_dict(),
             "metadata": self.metadata
         }
         self.event.fire_event(data, "salt/batch/{0}/done".format(self.batch_jid))
@@ -213,6 +346,12 @@ class BatchAsync(object):
     def schedule_next(self):
         next_batch = self._get_next()
         if next_batch:
+            # mark the minions active before publishing, so that concurrent
+            # calls do not pick them again
+            self.active = self.active.union(next_batch)
+            now = time.time()
+            for minion in next_batch:
+                self.started[minion] = now
             yield self.local.run_job_async(
                 next_batch,
                 self.opts['fun'],
@@ -225,4 +364,3 @@ class BatchAsync(object):
                 metadata=self.metadata,
                 **self.eauth)
             self.event.io_loop.call_later(self.opts['timeout'], self.find_job, set(next_batch))
-            self.active = self.active.union(next_batch)
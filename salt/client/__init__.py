@@ -1127,6 +1127,9 @@ class LocalClient(object):
 
         # timeouts per minion, id_ -> timeout time
         minion_timeouts = {}
+        # minions which sent a heartbeat for the job, id_ -> time until which
+        # they are known to be running it
+        heartbeats = {}
 
         found = set()
         missing = set()
@@ -1182,6 +1185,19 @@ class LocalClient(object):
                     if "missing" in raw.get("data", {}):
                         missing.update(raw["data"]["missing"])
                     continue
+                if "heartbeat" in raw["data"]:
+                    # The minion is still running the job, no need to ask it
+                    # with saltutil.find_job until its heartbeats stop
+                    id_ = raw["data"]["id"]
+                    if id_ not in found:
+                        minions.add(id_)
+                        now = time.time()
+                        heartbeats[id_] = (
+                            now + raw["data"]["heartbeat"] + gather_job_timeout
+                        )
+                        minion_timeouts[id_] = now + timeout
+                        minions_running = True
+                    continue
                 if "return" not in raw["data"]:
                     continue
                 if kwargs.get("raw", False):
@@ -1237,11 +1253,24 @@ class LocalClient(object):
             # if the jinfo has timed out and some minions are still running the job
             # re-do the ping
             if time.time() > timeout_at and minions_running:
-                # since this is a new ping, no one has responded yet
-                jinfo = self.gather_job_info(
-                    jid, list(minions - found), "list", **kwargs
+                # minions with a recent heartbeat are known to be running the
+                # job, only ping the others
+                now = time.time()
+                alive = set(
+                    id_ for id_ in minions - found if heartbeats.get(id_, 0) > now
                 )
-                minions_running = False
+                pending = minions - found - alive
+                if pending:
+                    # since this is a new ping, no one has responded yet
+                    jinfo = self.gather_job_info(jid, list(pending), "list", **kwargs)
+                else:
+                    log.debug(
+                        "jid %s is still running on %s, skipping find_job",
+                        jid,
+                        sorted(alive),
+                    )
+                    jinfo = {}
+                minions_running = bool(alive)
                 # if we weren't assigned any jid that means the master thinks
                 # we have nothing to send
                 if "jid" not in jinfo:
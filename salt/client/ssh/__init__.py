@@ -12,6 +12,7 @@ import datetime
 import getpass
 import hashlib
 import logging
+import math
 import multiprocessing
 import os
 import re
@@ -19,6 +20,7 @@ import subprocess
 import sys
 import tarfile
 import tempfile
+import threading
 import time
 import uuid
 
@@ -52,6 +54,7 @@ import salt.utils.verify
 # Import 3rd-party libs
 from salt.ext import six
 from salt.ext.six.moves import input  # pylint: disable=import-error,redefined-builtin
+from salt.ext.six.moves import queue  # pylint: disable=import-error
 from salt.template import compile_template
 from salt.utils.platform import is_windows
 from salt.utils.process import Process
@@ -312,7 +315,11 @@ class SSH(object):
         self.serial = salt.payload.Serial(opts)
         self.returners = salt.loader.returners(self.opts, {})
         self.fsclient = salt.fileclient.FSClient(self.opts)
-        self.thin = salt.utils.thin.gen_thin(
+        if self.opts.get("ssh_thin_layers"):
+            gen_thin = salt.utils.thin.gen_thin_layers
+        else:
+            gen_thin = salt.utils.thin.gen_thin
+        self.thin = gen_thin(
             self.opts["cachedir"],
             extra_mods=self.opts.get("thin_extra_mods"),
             overwrite=self.opts["regen_thin"],
@@ -516,7 +523,7 @@ class SSH(object):
             return {host: stderr}
         return {host: stdout}
 
-    def handle_routine(self, que, opts, host, target, mine=False):
+    def handle_routine(self, que, opts, host, target, mine=False, fsclient=None):
         """
         Run the routine in a "Thread", put a dict on the queue
         """
@@ -526,7 +533,7 @@ class SSH(object):
             opts["argv"],
             host,
             mods=self.mods,
-            fsclient=self.fsclient,
+            fsclient=fsclient or self.fsclient,
             thin=self.thin,
             mine=mine,
             **target
@@ -552,11 +559,127 @@ class SSH(object):
             }
         que.put(ret)
 
+    def _prep_target(self, host):
+        """
+        Fill in the defaults of a target, return the return of the target
+        when it cannot be run
+        """
+        for default in self.defaults:
+            if default not in self.targets[host]:
+                self.targets[host][default] = self.defaults[default]
+        if "host" not in self.targets[host]:
+            self.targets[host]["host"] = host
+        if self.targets[host].get("winrm") and not HAS_WINSHELL:
+            log_msg = "Please contact sales@saltstack.com for access to the enterprise saltwinshell module."
+            log.debug(log_msg)
+            return {
+                "fun_args": [],
+                "jid": None,
+                "return": log_msg,
+                "retcode": 1,
+                "fun": "",
+                "id": host,
+            }
+        return None
+
+    def handle_pool_worker(self, tasks, que, opts, mine, threads):
+        """
+        Run the routines of the targets read from the tasks queue in up to
+        ``threads`` threads, put their returns on the queue
+        """
+
+        def _run_tasks():
+            # Neither the file client nor the opts are shared between threads,
+            # handle_routine runs each target on its own copy of the opts
+            fsclient = salt.fileclient.FSClient(copy.deepcopy(opts))
+            while True:
+                task = tasks.get()
+                if task is None:
+                    break
+                host, target = task
+                try:
+                    self.handle_routine(que, opts, host, target, mine, fsclient)
+                except Exception as exc:  # pylint: disable=broad-except
+                    log.error("Error running the routine of %s", host, exc_info=True)
+                    que.put(
+                        {
+                            "id": host,
+                            "ret": "Target '{0}' did not return any data: {1}".format(
+                                host, exc
+                            ),
+                        }
+                    )
+
+        workers = [threading.Thread(target=_run_tasks) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def handle_ssh_pool(self, mine=False):
+        """
+        Run the routines of the targets in threads spread over ssh_pool_procs
+        processes, instead of one process per target
+        """
+        que = multiprocessing.Queue()
+        tasks = multiprocessing.Queue()
+        procs = max(1, min(self.opts["ssh_pool_procs"], len(self.targets)))
+        threads = max(
+            1, int(math.ceil(float(self.opts.get("ssh_max_procs", 25)) / procs))
+        )
+        pending = set()
+        for host in self.targets:
+            no_ret = self._prep_target(host)
+            if no_ret is not None:
+                yield {host: no_ret}
+                continue
+            pending.add(host)
+            tasks.put((host, self.targets[host]))
+        for _ in range(procs * threads):
+            tasks.put(None)
+
+        workers = []
+        for _ in range(procs):
+            worker = Process(
+                target=self.handle_pool_worker,
+                args=(tasks, que, self.opts, mine, threads),
+            )
+            worker.start()
+            workers.append(worker)
+
+        while pending:
+            try:
+                ret = que.get(True, 0.1)
+            except queue.Empty:
+                if any(worker.is_alive() for worker in workers):
+                    continue
+                # Every worker is gone, collect what is left
+                try:
+                    ret = que.get(True, 1)
+                except queue.Empty:
+                    break
+            if "id" in ret and ret["id"] in pending:
+                pending.discard(ret["id"])
+                yield {ret["id"]: ret["ret"]}
+
+        for host in pending:
+            error = (
+                "Target '{0}' did not return any data, probably due to an error."
+            ).format(host)
+            log.error(error)
+            yield {host: error}
+        for worker in workers:
+            worker.join()
+
     def handle_ssh(self, mine=False):
         """
         Spin up the needed threads or processes and execute the subsequent
         routines
         """
+        if self.opts.get("ssh_pool_procs", 0) > 0:
+            for ret in self.handle_ssh_pool(mine=mine):
+                yield ret
+            return
         que = multiprocessing.Queue()
         running = {}
         target_iter = self.targets.__iter__()
@@ -573,24 +696,10 @@ class SSH(object):
                 except StopIteration:
                     init = True
                     continue
-                for default in self.defaults:
-                    if default not in self.targets[host]:
-                        self.targets[host][default] = self.defaults[default]
-                if "host" not in self.targets[host]:
-                    self.targets[host]["host"] = host
-                if self.targets[host].get("winrm") and not HAS_WINSHELL:
+                no_ret = self._prep_target(host)
+                if no_ret is not None:
                     returned.add(host)
                     rets.add(host)
-                    log_msg = "Please contact sales@saltstack.com for access to the enterprise saltwinshell module."
-                    log.debug(log_msg)
-                    no_ret = {
-                        "fun_args": [],
-                        "jid": None,
-                        "return": log_msg,
-                        "retcode": 1,
-                        "fun": "",
-                        "id": host,
-                    }
                     yield {host: no_ret}
                     continue
                 args = (
@@ -959,6 +1068,7 @@ class Single(object):
             arch, _, _ = self.shell.exec_cmd("powershell $ENV:PROCESSOR_ARCHITECTURE")
             self.arch = arch.strip()
         self.thin = thin if thin else salt.utils.thin.thin_path(opts["cachedir"])
+        self.thin_layers = self.opts.get("ssh_thin_layers", False)
 
     def __arg_comps(self):
         """
@@ -1009,10 +1119,44 @@ class Single(object):
         """
         Deploy salt-thin
         """
+        if self.thin_layers:
+            self.deploy_layers()
+        else:
+            self.shell.send(
+                self.thin, os.path.join(self.thin_dir, "salt-thin.tgz"),
+            )
+        self.deploy_ext()
+        return True
+
+    def deploy_layers(self, layer_ids=None):
+        """
+        Deploy the given salt-thin layers, or all the layers of the manifest
+        """
+        cachedir = self._thin_cachedir()
+        manifest_ids = [
+            layer["id"]
+            for layer in salt.utils.thin.thin_manifest(cachedir).get("layers", [])
+        ]
+        if layer_ids is None:
+            layer_ids = manifest_ids
+        layer_ids = [layer_id for layer_id in layer_ids if layer_id in manifest_ids]
+        if not layer_ids:
+            return True
+        layer_dir = os.path.join(cachedir, "thin", "layers")
+        log.debug(
+            "Deploying %s of %s thin layers to %s",
+            len(layer_ids),
+            len(manifest_ids),
+            self.target["host"],
+        )
+        # One scp run for all the layers
         self.shell.send(
-            self.thin, os.path.join(self.thin_dir, "salt-thin.tgz"),
+            " ".join(
+                os.path.join(layer_dir, "{0}.tgz".format(layer_id))
+                for layer_id in layer_ids
+            ),
+            os.path.join(self.thin_dir, "layers") + "/",
         )
-        self.deploy_ext()
         return True
 
     def deploy_ext(self):
@@ -1132,6 +1276,9 @@ class Single(object):
             opts_pkg["extension_modules"] = self.opts["extension_modules"]
             opts_pkg["module_dirs"] = self.opts["module_dirs"]
             opts_pkg["_ssh_version"] = self.opts["_ssh_version"]
+            opts_pkg["ssh_control_persist"] = self.opts.get("ssh_control_persist", 0)
+            opts_pkg["ssh_thin_layers"] = self.opts.get("ssh_thin_layers", False)
+            opts_pkg["ssh_state_bundles"] = self.opts.get("ssh_state_bundles", False)
             opts_pkg["__master_opts__"] = self.context["master_opts"]
             if "known_hosts_file" in self.opts:
                 opts_pkg["known_hosts_file"] = self.opts["known_hosts_file"]
@@ -1277,17 +1424,32 @@ class Single(object):
             ret = salt.utils.json.dumps({"local": {"return": result}})
         return ret, retcode
 
+    def _thin_cachedir(self):
+        """
+        Return the cachedir holding the salt-thin bundle
+        """
+        if "_caller_cachedir" in self.opts:
+            return self.opts["_caller_cachedir"]
+        return self.opts["cachedir"]
+
     def _cmd_str(self):
         """
         Prepare the command string
         """
         sudo = "sudo" if self.target["sudo"] else ""
         sudo_user = self.target["sudo_user"]
-        if "_caller_cachedir" in self.opts:
-            cachedir = self.opts["_caller_cachedir"]
+        cachedir = self._thin_cachedir()
+        layers = []
+        if self.thin_layers:
+            manifest = salt.utils.thin.thin_manifest(cachedir)
+            thin_code_digest = "'{0}'".format(manifest.get("code_checksum", "0"))
+            thin_sum = ""
+            layers = [
+                [layer["id"], layer["sum"], layer["roots"]]
+                for layer in manifest.get("layers", [])
+            ]
         else:
-            cachedir = self.opts["cachedir"]
-        thin_code_digest, thin_sum = salt.utils.thin.thin_sum(cachedir, "sha1")
+            thin_code_digest, thin_sum = salt.utils.thin.thin_sum(cachedir, "sha1")
         debug = ""
         if not self.opts.get("log_level"):
             self.opts["log_level"] = "info"
@@ -1311,6 +1473,7 @@ OPTIONS.wipe = {wipe}
 OPTIONS.tty = {tty}
 OPTIONS.cmd_umask = {cmd_umask}
 OPTIONS.code_checksum = {code_checksum}
+OPTIONS.layers = {layers}
 ARGS = {arguments}\n'''.format(
             config=self.minion_config,
             delimeter=RSTR,
@@ -1323,6 +1486,7 @@ ARGS = {arguments}\n'''.format(
             tty=self.tty,
             cmd_umask=self.cmd_umask,
             code_checksum=thin_code_digest,
+            layers=salt.utils.json.dumps(layers),
             arguments=self.argv,
         )
         py_code = SSH_PY_SHIM.replace("#%%OPTS", arg_str)
@@ -1503,6 +1667,24 @@ ARGS = {arguments}\n'''.format(
                 else:
                     while re.search(RSTR_RE, stderr):
                         stderr = re.split(RSTR_RE, stderr, 1)[1].strip()
+            elif (
+                shim_command.startswith("layers ")
+                and retcode == salt.defaults.exitcodes.EX_THIN_LAYERS
+            ):
+                self.deploy_layers(shim_command.split()[1:])
+                stdout, stderr, retcode = self.shim_cmd(cmd_str)
+                if not re.search(RSTR_RE, stdout) or not re.search(RSTR_RE, stderr):
+                    # If RSTR is not seen in both stdout and stderr then there
+                    # was a thin deployment problem.
+                    return (
+                        "ERROR: Failure deploying thin layers: {0}".format(stdout),
+                        stderr,
+                        retcode,
+                    )
+                while re.search(RSTR_RE, stdout):
+                    stdout = re.split(RSTR_RE, stdout, 1)[1].strip()
+                while re.search(RSTR_RE, stderr):
+                    stderr = re.split(RSTR_RE, stderr, 1)[1].strip()
             elif "ext_mods" == shim_command:
                 self.deploy_ext()
                 stdout, stderr, retcode = self.shim_cmd(cmd_str)
@@ -201,6 +201,40 @@ class Shell(object):
     def _ssh_opts(self):
         return " ".join(["-o {0}".format(opt) for opt in self.ssh_options])
 
+    def _control_opts(self):
+        """
+        Return the options sharing one persistent connection per host between
+        the ssh and scp commands, when ssh_control_persist is set
+        """
+        persist = self.opts.get("ssh_control_persist", 0)
+        if not persist:
+            return ""
+        # The wrapper functions run with the opts of the target
+        cachedir = self.opts.get("_caller_cachedir", self.opts["cachedir"])
+        control_dir = os.path.join(cachedir, "ssh_control")
+        if not os.path.isdir(control_dir):
+            try:
+                os.makedirs(control_dir, 0o700)
+            except OSError as exc:
+                if not os.path.isdir(control_dir):
+                    log.warning(
+                        "Unable to create the ssh control directory %s: %s",
+                        control_dir,
+                        exc,
+                    )
+                    return ""
+        if self.opts.get("_ssh_version", (0,)) >= (6, 7):
+            # Hash of the connection, keeps the socket path short
+            control_path = os.path.join(control_dir, "%C")
+        else:
+            control_path = os.path.join(control_dir, "%r@%h:%p")
+        options = [
+            "ControlMaster=auto",
+            "ControlPath={0}".format(control_path),
+            "ControlPersist={0}".format(persist),
+        ]
+        return " ".join(["-o {0}".format(opt) for opt in options])
+
     def _copy_id_str_old(self):
         """
         Return the string to execute ssh-copy-id
@@ -273,6 +307,9 @@ class Shell(object):
             )
         if self.ssh_options:
             command.append(self._ssh_opts())
+        control_opts = self._control_opts()
+        if control_opts:
+            command.append(control_opts)
 
         command.append(cmd)
 
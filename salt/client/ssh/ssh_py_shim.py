@@ -20,6 +20,8 @@ import time
 
 THIN_ARCHIVE = "salt-thin.tgz"
 EXT_ARCHIVE = "salt-ext_mods.tgz"
+LAYERS_DIR = "layers"
+LAYERS_INDEX = ".layers"
 
 # Keep these in sync with salt/defaults/exitcodes.py
 EX_THIN_PYTHON_INVALID = 10
@@ -27,6 +29,7 @@ EX_THIN_DEPLOY = 11
 EX_THIN_CHECKSUM = 12
 EX_MOD_DEPLOY = 13
 EX_SCP_NOT_FOUND = 14
+EX_THIN_LAYERS = 15
 EX_CANTCREAT = 73
 
 
@@ -111,6 +114,8 @@ def need_deployment():
     old_umask = os.umask(0o077)  # pylint: disable=blacklisted-function
     try:
         os.makedirs(OPTIONS.saltdir)
+        if OPTIONS.layers:
+            os.makedirs(os.path.join(OPTIONS.saltdir, LAYERS_DIR))
     finally:
         os.umask(old_umask)  # pylint: disable=blacklisted-function
     # Verify perms on saltdir
@@ -179,6 +184,94 @@ def unpack_thin(thin_path):
     reset_time(OPTIONS.saltdir)
 
 
+def need_layers(missing):
+    """
+    Signal that the listed thin layers need to be deployed.
+    """
+    sys.stdout.write("{0}\nlayers {1}\n".format(OPTIONS.delimiter, " ".join(missing)))
+    sys.exit(EX_THIN_LAYERS)
+
+
+def _remove_layer_roots(roots):
+    """
+    Remove the paths a thin layer unpacked to.
+    """
+    saltdir = os.path.realpath(OPTIONS.saltdir)
+    for root in roots:
+        path = os.path.realpath(os.path.join(saltdir, root))
+        if not path.startswith(saltdir + os.sep):
+            continue
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        elif os.path.lexists(path):
+            os.unlink(path)
+
+
+def sync_layers():
+    """
+    Bring the unpacked thin in line with the layers of OPTIONS.layers. Layers
+    that are neither deployed nor unpacked yet are requested from the master,
+    the deployed ones replace the layers that are no longer listed.
+    """
+    layer_dir = os.path.join(OPTIONS.saltdir, LAYERS_DIR)
+    index_path = os.path.join(OPTIONS.saltdir, LAYERS_INDEX)
+    installed = {}
+    if os.path.isfile(index_path):
+        with open(index_path, "r") as ifile:
+            for line in ifile:
+                fields = line.split()
+                if fields:
+                    installed[fields[0]] = fields[1:]
+
+    missing = []
+    deployed = []
+    for layer_id, layer_sum, roots in OPTIONS.layers:
+        layer_path = os.path.join(layer_dir, layer_id + ".tgz")
+        if os.path.isfile(layer_path):
+            if get_hash(layer_path, OPTIONS.hashfunc) != layer_sum:
+                os.unlink(layer_path)
+                missing.append(layer_id)
+            else:
+                deployed.append((layer_id, layer_path, roots))
+        elif layer_id not in installed:
+            missing.append(layer_id)
+    if missing:
+        if not os.path.isdir(layer_dir):
+            old_umask = os.umask(0o077)  # pylint: disable=blacklisted-function
+            try:
+                os.makedirs(layer_dir)
+            finally:
+                os.umask(old_umask)  # pylint: disable=blacklisted-function
+        need_layers(missing)
+    if not deployed:
+        return
+
+    wanted = dict((layer[0], layer[2]) for layer in OPTIONS.layers)
+    fresh = set(layer[0] for layer in deployed)
+    keep = set()
+    for layer_id, roots in wanted.items():
+        if layer_id not in fresh:
+            keep.update(roots)
+    for layer_id, roots in installed.items():
+        if layer_id not in wanted:
+            _remove_layer_roots([root for root in roots if root not in keep])
+
+    old_umask = os.umask(0o077)  # pylint: disable=blacklisted-function
+    try:
+        for layer_id, layer_path, roots in deployed:
+            _remove_layer_roots(roots)
+            tfile = tarfile.TarFile.gzopen(layer_path)
+            tfile.extractall(path=OPTIONS.saltdir)
+            tfile.close()
+            os.unlink(layer_path)
+        with open(index_path, "w") as ofile:
+            for layer_id, layer_sum, roots in OPTIONS.layers:
+                ofile.write("{0} {1}\n".format(layer_id, " ".join(roots)))
+    finally:
+        os.umask(old_umask)  # pylint: disable=blacklisted-function
+    reset_time(OPTIONS.saltdir)
+
+
 def need_ext():
     """
     Signal that external modules need to be deployed.
@@ -271,7 +364,18 @@ def main(argv):  # pylint: disable=W0613
     Main program body
     """
     thin_path = os.path.join(OPTIONS.saltdir, THIN_ARCHIVE)
-    if os.path.isfile(thin_path):
+    if OPTIONS.layers:
+        if os.path.exists(OPTIONS.saltdir) and not os.path.isdir(OPTIONS.saltdir):
+            sys.stderr.write(
+                'ERROR: salt path "{0}" exists but is'
+                " not a directory\n".format(OPTIONS.saltdir)
+            )
+            sys.exit(EX_CANTCREAT)
+        if not os.path.exists(OPTIONS.saltdir):
+            need_deployment()
+        sync_layers()
+        # Salt thin is made of the listed layers - fall through and use it
+    elif os.path.isfile(thin_path):
         if OPTIONS.checksum != get_hash(thin_path, OPTIONS.hashfunc):
             need_deployment()
         unpack_thin(thin_path)
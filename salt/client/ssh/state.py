@@ -5,11 +5,12 @@ Create ssh executor system
 from __future__ import absolute_import, print_function
 
 # Import python libs
+import hashlib
+import io
 import logging
 import os
-import shutil
 import tarfile
-import tempfile
+import time
 from contextlib import closing
 
 import salt.client.ssh
@@ -33,6 +34,9 @@ from salt.ext import six
 
 log = logging.getLogger(__name__)
 
+# Seconds a state bundle is kept in the cachedir without being used
+BUNDLE_TTL = 86400
+
 
 class SSHState(salt.state.State):
     """
@@ -175,18 +179,12 @@ def salt_refs(data, ret=None):
     return ret
 
 
-def prep_trans_tar(
-    file_client, chunks, file_refs, pillar=None, id_=None, roster_grains=None
-):
+def _trans_tar_files(file_client, file_refs, id_=None):
     """
-    Generate the execution package from the saltenv file refs and a low state
-    data structure
+    Cache the files of the saltenv file refs and return a dict mapping their
+    path in the execution package to their cached location. Each saltenv
+    maps to None, it is packed as a directory even if it has no files.
     """
-    gendir = tempfile.mkdtemp()
-    trans_tar = salt.utils.files.mkstemp()
-    lowfn = os.path.join(gendir, "lowstate.json")
-    pillarfn = os.path.join(gendir, "pillar.json")
-    roster_grainsfn = os.path.join(gendir, "roster_grains.json")
     sync_refs = [
         [salt.utils.url.create("_modules")],
         [salt.utils.url.create("_states")],
@@ -196,15 +194,6 @@ def prep_trans_tar(
         [salt.utils.url.create("_output")],
         [salt.utils.url.create("_utils")],
     ]
-    with salt.utils.files.fopen(lowfn, "w+") as fp_:
-        salt.utils.json.dump(chunks, fp_)
-    if pillar:
-        with salt.utils.files.fopen(pillarfn, "w+") as fp_:
-            salt.utils.json.dump(pillar, fp_)
-    if roster_grains:
-        with salt.utils.files.fopen(roster_grainsfn, "w+") as fp_:
-            salt.utils.json.dump(roster_grains, fp_)
-
     if id_ is None:
         id_ = ""
     try:
@@ -213,13 +202,12 @@ def prep_trans_tar(
         # Minion ID should always be a str, but don't let an int break this
         cachedir = os.path.join("salt-ssh", six.text_type(id_)).rstrip(os.sep)
 
+    trans_files = {}
     for saltenv in file_refs:
         # Location where files in this saltenv will be cached
         cache_dest_root = os.path.join(cachedir, "files", saltenv)
         file_refs[saltenv].extend(sync_refs)
-        env_root = os.path.join(gendir, saltenv)
-        if not os.path.isdir(env_root):
-            os.makedirs(env_root)
+        trans_files[saltenv] = None
         for ref in file_refs[saltenv]:
             for name in ref:
                 short = salt.utils.url.parse(name)[0].lstrip("/")
@@ -229,11 +217,7 @@ def prep_trans_tar(
                 except IOError:
                     path = ""
                 if path:
-                    tgt = os.path.join(env_root, short)
-                    tgt_dir = os.path.dirname(tgt)
-                    if not os.path.isdir(tgt_dir):
-                        os.makedirs(tgt_dir)
-                    shutil.copy(path, tgt)
+                    trans_files[os.path.join(saltenv, short)] = path
                     continue
                 try:
                     files = file_client.cache_dir(name, saltenv, cachedir=cachedir)
@@ -244,24 +228,109 @@ def prep_trans_tar(
                         fn = filename[
                             len(file_client.get_cachedir(cache_dest)) :
                         ].strip("/")
-                        tgt = os.path.join(env_root, short, fn,)
-                        tgt_dir = os.path.dirname(tgt)
-                        if not os.path.isdir(tgt_dir):
-                            os.makedirs(tgt_dir)
-                        shutil.copy(filename, tgt)
+                        trans_files[os.path.join(saltenv, short, fn)] = filename
                     continue
-    try:
-        # cwd may not exist if it was removed but salt was run from it
-        cwd = os.getcwd()
-    except OSError:
-        cwd = None
-    os.chdir(gendir)
+    return trans_files
+
+
+def _trans_tar_data(chunks, pillar=None, roster_grains=None):
+    """
+    Return the per target data files of the execution package
+    """
+    data = {"lowstate.json": chunks}
+    if pillar:
+        data["pillar.json"] = pillar
+    if roster_grains:
+        data["roster_grains.json"] = roster_grains
+    return data
+
+
+def _write_trans_tar(trans_tar, trans_files, data=None):
+    """
+    Write the execution package from the files and the data to dump as json.
+    Names mapped to None are written as empty directories.
+    """
     with closing(tarfile.open(trans_tar, "w:gz")) as tfp:
-        for root, dirs, files in salt.utils.path.os_walk(gendir):
-            for name in files:
-                full = os.path.join(root, name)
-                tfp.add(full[len(gendir) :].lstrip(os.sep))
-    if cwd:
-        os.chdir(cwd)
-    shutil.rmtree(gendir)
+        for name in sorted(data or {}):
+            payload = salt.utils.stringutils.to_bytes(
+                salt.utils.json.dumps(data[name])
+            )
+            info = tarfile.TarInfo(name)
+            info.size = len(payload)
+            info.mtime = time.time()
+            tfp.addfile(info, io.BytesIO(payload))
+        for name in sorted(trans_files):
+            if trans_files[name] is None:
+                info = tarfile.TarInfo(name)
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                info.mtime = time.time()
+                tfp.addfile(info)
+                continue
+            tfp.add(trans_files[name], arcname=name)
     return trans_tar
+
+
+def prep_trans_tar(
+    file_client, chunks, file_refs, pillar=None, id_=None, roster_grains=None
+):
+    """
+    Generate the execution package from the saltenv file refs and a low state
+    data structure
+    """
+    trans_files = _trans_tar_files(file_client, file_refs, id_)
+    return _write_trans_tar(
+        salt.utils.files.mkstemp(),
+        trans_files,
+        _trans_tar_data(chunks, pillar, roster_grains),
+    )
+
+
+def prep_trans_bundle(
+    file_client, chunks, file_refs, pillar=None, id_=None, roster_grains=None
+):
+    """
+    Generate the execution package as a bundle of the saltenv files and an
+    overlay holding the low state data, pillar and roster grains.
+
+    The bundle is named after the digest of its files and kept in the
+    ``ssh_state_bundles`` directory of the cachedir, so targets referencing
+    the same files share it and it is only packed once. Bundles unused for a
+    day are removed.
+
+    Returns the path of the bundle and the path of the overlay.
+    """
+    trans_files = _trans_tar_files(file_client, file_refs, id_)
+    digest = hashlib.sha256()
+    for name in sorted(trans_files):
+        digest.update(salt.utils.stringutils.to_bytes(name))
+        if trans_files[name] is None:
+            continue
+        with salt.utils.files.fopen(trans_files[name], "rb") as ifile:
+            for chunk in iter(lambda: ifile.read(0x10000), b""):
+                digest.update(chunk)
+    bundle_dir = os.path.join(file_client.opts["cachedir"], "ssh_state_bundles")
+    if not os.path.isdir(bundle_dir):
+        os.makedirs(bundle_dir)
+    bundle = os.path.join(bundle_dir, "{0}.tgz".format(digest.hexdigest()))
+    if os.path.isfile(bundle):
+        log.debug("Reusing the salt-ssh state bundle %s", bundle)
+        os.utime(bundle, None)
+    else:
+        log.debug("Packing the salt-ssh state bundle %s", bundle)
+        tmp_bundle = salt.utils.files.mkstemp(dir=bundle_dir, suffix=".tmp")
+        _write_trans_tar(tmp_bundle, trans_files)
+        os.rename(tmp_bundle, bundle)
+        now = time.time()
+        for fname in os.listdir(bundle_dir):
+            path = os.path.join(bundle_dir, fname)
+            try:
+                if now - os.path.getmtime(path) > BUNDLE_TTL:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    trans_tar = _write_trans_tar(
+        salt.utils.files.mkstemp(), {}, _trans_tar_data(chunks, pillar, roster_grains)
+    )
+    return bundle, trans_tar
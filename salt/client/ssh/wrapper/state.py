@@ -36,6 +36,38 @@ __func_alias__ = {"apply_": "apply"}
 log = logging.getLogger(__name__)
 
 
+def _prep_trans_tar(opts, chunks, file_refs, id_, roster_grains=None):
+    """
+    Create the state package of a salt-ssh state run. With ``ssh_state_bundles``
+    the files are sent as a bundle shared between targets, next to a package
+    holding the per target data.
+
+    Returns the package, the ``state.pkg`` arguments and the ``(local, remote)``
+    pairs of the files to send
+    """
+    pkg_path = "{0}/salt_state.tgz".format(opts["thin_dir"])
+    trans_files = []
+    bundle_args = ""
+    if opts.get("ssh_state_bundles"):
+        bundle, trans_tar = salt.client.ssh.state.prep_trans_bundle(
+            __context__["fileclient"], chunks, file_refs, __pillar__, id_, roster_grains
+        )
+        bundle_path = "{0}/salt_state_bundle.tgz".format(opts["thin_dir"])
+        bundle_sum = salt.utils.hashutils.get_hash(bundle, opts["hash_type"])
+        trans_files.append((bundle, bundle_path))
+        bundle_args = " bundle_path={0} bundle_sum={1}".format(bundle_path, bundle_sum)
+    else:
+        trans_tar = salt.client.ssh.state.prep_trans_tar(
+            __context__["fileclient"], chunks, file_refs, __pillar__, id_, roster_grains
+        )
+    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, opts["hash_type"])
+    trans_files.append((trans_tar, pkg_path))
+    pkg_args = "{0} pkg_sum={1} hash_type={2}{3}".format(
+        pkg_path, trans_tar_sum, opts["hash_type"], bundle_args
+    )
+    return trans_tar, pkg_args, trans_files
+
+
 def _ssh_state(chunks, st_kwargs, kwargs, test=False):
     """
     Function to run a state with the given chunk via salt-ssh
@@ -47,13 +79,10 @@ def _ssh_state(chunks, st_kwargs, kwargs, test=False):
         ),
     )
     # Create the tar containing the state pkg and relevant files.
-    trans_tar = salt.client.ssh.state.prep_trans_tar(
-        __context__["fileclient"], chunks, file_refs, __pillar__, st_kwargs["id_"]
-    )
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, __opts__["hash_type"])
-    cmd = "state.pkg {0}/salt_state.tgz test={1} pkg_sum={2} hash_type={3}".format(
-        __opts__["thin_dir"], test, trans_tar_sum, __opts__["hash_type"]
+    trans_tar, pkg_args, trans_files = _prep_trans_tar(
+        __opts__, chunks, file_refs, st_kwargs["id_"]
     )
+    cmd = "state.pkg {0} test={1}".format(pkg_args, test)
     single = salt.client.ssh.Single(
         __opts__,
         cmd,
@@ -61,7 +90,8 @@ def _ssh_state(chunks, st_kwargs, kwargs, test=False):
         minion_opts=__salt__.minion_opts,
         **st_kwargs
     )
-    single.shell.send(trans_tar, "{0}/salt_state.tgz".format(__opts__["thin_dir"]))
+    for local, remote in trans_files:
+        single.shell.send(local, remote)
     stdout, stderr, _ = single.cmd_block()
 
     # Clean up our tar
@@ -217,18 +247,10 @@ def sls(mods, saltenv='base', test=None, exclude=None, **kwargs):
 
     # Create the tar containing the state pkg and relevant files.
     _cleanup_slsmod_low_data(chunks)
-    trans_tar = salt.client.ssh.state.prep_trans_tar(
-        __context__["fileclient"],
-        chunks,
-        file_refs,
-        __pillar__,
-        st_kwargs["id_"],
-        roster_grains,
-    )
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, opts["hash_type"])
-    cmd = "state.pkg {0}/salt_state.tgz test={1} pkg_sum={2} hash_type={3}".format(
-        opts["thin_dir"], test, trans_tar_sum, opts["hash_type"]
+    trans_tar, pkg_args, trans_files = _prep_trans_tar(
+        opts, chunks, file_refs, st_kwargs["id_"], roster_grains
     )
+    cmd = "state.pkg {0} test={1}".format(pkg_args, test)
     single = salt.client.ssh.Single(
         opts,
         cmd,
@@ -236,7 +258,8 @@ def sls(mods, saltenv='base', test=None, exclude=None, **kwargs):
         minion_opts=__salt__.minion_opts,
         **st_kwargs
     )
-    single.shell.send(trans_tar, "{0}/salt_state.tgz".format(opts["thin_dir"]))
+    for local, remote in trans_files:
+        single.shell.send(local, remote)
     stdout, stderr, _ = single.cmd_block()
 
     # Clean up our tar
@@ -359,18 +382,10 @@ def low(data, **kwargs):
     roster_grains = roster.opts["grains"]
 
     # Create the tar containing the state pkg and relevant files.
-    trans_tar = salt.client.ssh.state.prep_trans_tar(
-        __context__["fileclient"],
-        chunks,
-        file_refs,
-        __pillar__,
-        st_kwargs["id_"],
-        roster_grains,
-    )
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, __opts__["hash_type"])
-    cmd = "state.pkg {0}/salt_state.tgz pkg_sum={1} hash_type={2}".format(
-        __opts__["thin_dir"], trans_tar_sum, __opts__["hash_type"]
+    trans_tar, pkg_args, trans_files = _prep_trans_tar(
+        __opts__, chunks, file_refs, st_kwargs["id_"], roster_grains
     )
+    cmd = "state.pkg {0}".format(pkg_args)
     single = salt.client.ssh.Single(
         __opts__,
         cmd,
@@ -378,7 +393,8 @@ def low(data, **kwargs):
         minion_opts=__salt__.minion_opts,
         **st_kwargs
     )
-    single.shell.send(trans_tar, "{0}/salt_state.tgz".format(__opts__["thin_dir"]))
+    for local, remote in trans_files:
+        single.shell.send(local, remote)
     stdout, stderr, _ = single.cmd_block()
 
     # Clean up our tar
@@ -445,18 +461,10 @@ def high(data, **kwargs):
 
     # Create the tar containing the state pkg and relevant files.
     _cleanup_slsmod_low_data(chunks)
-    trans_tar = salt.client.ssh.state.prep_trans_tar(
-        __context__["fileclient"],
-        chunks,
-        file_refs,
-        __pillar__,
-        st_kwargs["id_"],
-        roster_grains,
-    )
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, opts["hash_type"])
-    cmd = "state.pkg {0}/salt_state.tgz pkg_sum={1} hash_type={2}".format(
-        opts["thin_dir"], trans_tar_sum, opts["hash_type"]
+    trans_tar, pkg_args, trans_files = _prep_trans_tar(
+        opts, chunks, file_refs, st_kwargs["id_"], roster_grains
     )
+    cmd = "state.pkg {0}".format(pkg_args)
     single = salt.client.ssh.Single(
         opts,
         cmd,
@@ -464,7 +472,8 @@ def high(data, **kwargs):
         minion_opts=__salt__.minion_opts,
         **st_kwargs
     )
-    single.shell.send(trans_tar, "{0}/salt_state.tgz".format(opts["thin_dir"]))
+    for local, remote in trans_files:
+        single.shell.send(local, remote)
     stdout, stderr, _ = single.cmd_block()
 
     # Clean up our tar
@@ -686,18 +695,10 @@ def highstate(test=None, **kwargs):
 
     # Create the tar containing the state pkg and relevant files.
     _cleanup_slsmod_low_data(chunks)
-    trans_tar = salt.client.ssh.state.prep_trans_tar(
-        __context__["fileclient"],
-        chunks,
-        file_refs,
-        __pillar__,
-        st_kwargs["id_"],
-        roster_grains,
-    )
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, opts["hash_type"])
-    cmd = "state.pkg {0}/salt_state.tgz test={1} pkg_sum={2} hash_type={3}".format(
-        opts["thin_dir"], test, trans_tar_sum, opts["hash_type"]
+    trans_tar, pkg_args, trans_files = _prep_trans_tar(
+        opts, chunks, file_refs, st_kwargs["id_"], roster_grains
     )
+    cmd = "state.pkg {0} test={1}".format(pkg_args, test)
     single = salt.client.ssh.Single(
         opts,
         cmd,
@@ -705,7 +706,8 @@ def highstate(test=None, **kwargs):
         minion_opts=__salt__.minion_opts,
         **st_kwargs
     )
-    single.shell.send(trans_tar, "{0}/salt_state.tgz".format(opts["thin_dir"]))
+    for local, remote in trans_files:
+        single.shell.send(local, remote)
     stdout, stderr, _ = single.cmd_block()
 
     # Clean up our tar
@@ -763,18 +765,10 @@ def top(topfn, test=None, **kwargs):
 
     # Create the tar containing the state pkg and relevant files.
     _cleanup_slsmod_low_data(chunks)
-    trans_tar = salt.client.ssh.state.prep_trans_tar(
-        __context__["fileclient"],
-        chunks,
-        file_refs,
-        __pillar__,
-        st_kwargs["id_"],
-        roster_grains,
-    )
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, opts["hash_type"])
-    cmd = "state.pkg {0}/salt_state.tgz test={1} pkg_sum={2} hash_type={3}".format(
-        opts["thin_dir"], test, trans_tar_sum, opts["hash_type"]
+    trans_tar, pkg_args, trans_files = _prep_trans_tar(
+        opts, chunks, file_refs, st_kwargs["id_"], roster_grains
     )
+    cmd = "state.pkg {0} test={1}".format(pkg_args, test)
     single = salt.client.ssh.Single(
         opts,
         cmd,
@@ -782,7 +776,8 @@ def top(topfn, test=None, **kwargs):
         minion_opts=__salt__.minion_opts,
         **st_kwargs
     )
-    single.shell.send(trans_tar, "{0}/salt_state.tgz".format(opts["thin_dir"]))
+    for local, remote in trans_files:
+        single.shell.send(local, remote)
     stdout, stderr, _ = single.cmd_block()
 
     # Clean up our tar
@@ -1103,22 +1098,12 @@ def single(fun, name, test=None, **kwargs):
     roster_grains = roster.opts["grains"]
 
     # Create the tar containing the state pkg and relevant files.
-    trans_tar = salt.client.ssh.state.prep_trans_tar(
-        __context__["fileclient"],
-        chunks,
-        file_refs,
-        __pillar__,
-        st_kwargs["id_"],
-        roster_grains,
+    trans_tar, pkg_args, trans_files = _prep_trans_tar(
+        opts, chunks, file_refs, st_kwargs["id_"], roster_grains
     )
 
-    # Create a hash so we can verify the tar on the target system
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, opts["hash_type"])
-
     # We use state.pkg to execute the "state package"
-    cmd = "state.pkg {0}/salt_state.tgz test={1} pkg_sum={2} hash_type={3}".format(
-        opts["thin_dir"], test, trans_tar_sum, opts["hash_type"]
-    )
+    cmd = "state.pkg {0} test={1}".format(pkg_args, test)
 
     # Create a salt-ssh Single object to actually do the ssh work
     single = salt.client.ssh.Single(
@@ -1130,7 +1115,8 @@ def single(fun, name, test=None, **kwargs):
     )
 
     # Copy the tar down
-    single.shell.send(trans_tar, "{0}/salt_state.tgz".format(opts["thin_dir"]))
+    for local, remote in trans_files:
+        single.shell.send(local, remote)
 
     # Run the state.pkg command on the target
     stdout, stderr, _ = single.cmd_block()
@@ -314,6 +314,15 @@ VALID_OPTS = immutabletypes.freeze({
     # Order of preference for optimized .pyc files (PY3 only)
     'optimization_order': list,
 
+    # Keep an on-disk index of the modules found in the loader directories
+    'loader_index': bool,
+
+    # Cache the outcome of the modules' __virtual__ functions on disk
+    'loader_virtual_cache': bool,
+
+    # Seconds after which a cached __virtual__ rejection is checked again
+    'loader_virtual_cache_ttl': int,
+
     # Refuse to load these modules
     'disable_modules': list,
 
@@ -360,10 +369,21 @@ VALID_OPTS = immutabletypes.freeze({
     # Maximum number of concurrently active processes at any given point in time
     'process_count_max': int,
 
-    # If the minion reaches process_count_max, how long should it sleep
-    # before trying to generate a new process.
+    # If the proxy minion reaches process_count_max, how long should it sleep
+    # before trying to generate a new process. The minion queues the jobs instead.
     'process_count_max_sleep_secs': int,
 
+    # Once process_count_max is reached, the priority of the queued jobs whose function
+    # matches these globs. Jobs with the lowest priority run first.
+    'job_queue_priorities': dict,
+
+    # The priority of the queued jobs not matched by job_queue_priorities
+    'job_queue_default_priority': int,
+
+    # The number of seconds between the heartbeat events the minion sends for the jobs
+    # it is running. Disabled when 0.
+    'job_heartbeat_interval': int,
+
     # Whether or not the salt minion should run scheduled mine updates
     'mine_enabled': bool,
 
@@ -547,6 +567,25 @@ VALID_OPTS = immutabletypes.freeze({
     'return_retry_timer': int,
     'return_retry_timer_max': int,
 
+    # Coalesce the returns of scheduled jobs, and of the functions matched by
+    # return_batch_functions, into a single _return_batch request to the master
+    'return_batch': bool,
+
+    # The number of seconds returns are held back before the batch is sent
+    'return_batch_interval': float,
+
+    # The maximum number of returns sent in one _return_batch request
+    'return_batch_size': int,
+
+    # Globs of functions whose returns are batched along with scheduled jobs
+    'return_batch_functions': list,
+
+    # The number of pre-forked processes running the minion jobs, 0 forks a new process per job
+    'job_pool_size': int,
+
+    # The number of jobs after which a job pool process is replaced, 0 never replaces it
+    'job_pool_max_jobs': int,
+
     # Specify one or more returners in which all events will be sent to. Requires that the returners
     # in question have an event_return(event) function!
     'event_return': (list, six.string_types),
@@ -560,6 +599,25 @@ VALID_OPTS = immutabletypes.freeze({
     # `event_return_queue` events won't get stale.
     'event_return_queue_max_seconds': int,
 
+    # The maximum number of events queued in memory for each event returner. Once it is
+    # reached, events are dropped or spilled to disk according to `event_return_overflow`.
+    'event_return_queue_max_size': int,
+
+    # What to do with events when an event returner falls behind: drop or spill
+    'event_return_overflow': six.string_types,
+
+    # The number of times a batch of events is retried when an event returner fails
+    'event_return_retries': int,
+
+    # The initial and the maximum delay between the retries of a batch of events, doubled
+    # on each attempt
+    'event_return_retry_backoff': float,
+    'event_return_retry_backoff_max': float,
+
+    # Fire events with the queue depth and lag of the event returners
+    'event_return_stats': bool,
+    'event_return_stats_event_iter': int,
+
     # Only forward events to an event returner if it matches one of the tags in this list
     'event_return_whitelist': list,
 
@@ -569,6 +627,10 @@ VALID_OPTS = immutabletypes.freeze({
     # default match type for filtering events tags: startswith, endswith, find, regex, fnmatch
     'event_match_type': six.string_types,
 
+    # Register the tags event subscribers are interested in with the event
+    # publisher, so that events nobody listens for are not sent to them
+    'event_publisher_filtering': bool,
+
     # This pidfile to write out to when a daemon starts
     'pidfile': six.string_types,
 
@@ -859,12 +921,22 @@ VALID_OPTS = immutabletypes.freeze({
     # Specify whether the master should store end times for jobs as returns come in
     'job_cache_store_endtime': bool,
 
+    # Keep an index of the job summaries of the local job cache for jobs.list_jobs
+    'job_cache_index': bool,
+
+    # Keep the jid dirs of the local job cache in hourly buckets
+    'job_cache_hour_buckets': bool,
+
     # The minion data cache is a cache of information about the minions stored on the master.
     # This information is primarily the pillar and grains data. The data is cached in the master
     # cachedir under the name of the minion and used to predetermine what minions are expected to
     # reply from executions.
     'minion_data_cache': bool,
 
+    # Target the connected minions of batch runs from the minion data cache instead of a
+    # test.ping round
+    'batch_use_minion_data_cache': bool,
+
     # The number of seconds between AES key rotations on the master
     'publish_session': int,
 
@@ -880,6 +952,12 @@ VALID_OPTS = immutabletypes.freeze({
     # The queue size for workers in the reactor
     'reactor_worker_hwm': int,
 
+    # The number of reactor shard processes, 0 runs a single reactor
+    'reactor_shards': int,
+
+    # The event field routing an event to its reactor shard
+    'reactor_shard_key': six.string_types,
+
     # Defines engines. See https://docs.saltstack.com/en/latest/topics/engines/
     'engines': list,
 
@@ -945,6 +1023,15 @@ VALID_OPTS = immutabletypes.freeze({
     # The number of minutes between the minion refreshing its cache of grains
     'grains_refresh_every': int,
 
+    # Reuse the results of grains functions which did not expire on refresh
+    'grains_refresh_incremental': bool,
+
+    # The number of seconds each grains volatility class is reused for
+    'grains_refresh_ttl': dict,
+
+    # The volatility class of grains functions which do not declare one
+    'grains_refresh_default_volatility': six.string_types,
+
     # Use lspci to gather system data for grains on a minion
     'enable_lspci': bool,
 
@@ -1029,6 +1116,17 @@ VALID_OPTS = immutabletypes.freeze({
     'ssh_log_file': six.string_types,
     'ssh_config_file': six.string_types,
     'ssh_merge_pillar': bool,
+    # Run the salt-ssh targets in threads spread over this many processes instead of one
+    # process per target
+    'ssh_pool_procs': int,
+    # Keep a persistent connection per host open for this many seconds, shared by the ssh
+    # and scp commands
+    'ssh_control_persist': int,
+    # Split the salt-thin bundle into content-addressed layers and only send the layers a
+    # target is missing
+    'ssh_thin_layers': bool,
+    # Send the files of the salt-ssh state runs as bundles shared between the targets
+    'ssh_state_bundles': bool,
 
     'cluster_mode': bool,
     'sqlite_queue_dir': six.string_types,
@@ -1052,6 +1150,13 @@ VALID_OPTS = immutabletypes.freeze({
     # Use zmq.SUSCRIBE to limit listening sockets to only process messages bound for them
     'zmq_filtering': bool,
 
+    # Use a multiplexing DEALER socket for the ZeroMQ ReqChannel so several
+    # requests to the master can be in flight on one connection
+    'zmq_req_multiplex': bool,
+
+    # The maximum number of outstanding requests per multiplexed connection
+    'zmq_req_max_inflight': int,
+
     # Connection caching. Can greatly speed up salt performance.
     'con_cache': bool,
     'rotate_aes_key': bool,
@@ -1149,6 +1254,12 @@ VALID_OPTS = immutabletypes.freeze({
     # to the master is attempted.
     'beacons_before_connect': bool,
 
+    # The number of threads running the beacons, 0 runs them in turn
+    'beacons_threads': int,
+
+    # Seconds after which a beacon running in a thread is considered hung
+    'beacons_timeout': int,
+
     # Controls whether the scheduler is set up before a connection
     # to the master is attempted.
     'scheduler_before_connect': bool,
@@ -1365,6 +1476,9 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'unique_jid': False,
     'hash_type': 'sha256',
     'optimization_order': [0, 1, 2],
+    'loader_index': False,
+    'loader_virtual_cache': False,
+    'loader_virtual_cache_ttl': 3600,
     'disable_modules': [],
     'disable_returners': [],
     'whitelist_modules': [],
@@ -1385,6 +1499,13 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'multiprocessing': True,
     'process_count_max': -1,
     'process_count_max_sleep_secs': 10,
+    'job_queue_priorities': {
+        'saltutil.*': 0,
+        'test.ping': 0,
+        'state.*': 20,
+    },
+    'job_queue_default_priority': 10,
+    'job_heartbeat_interval': 0,
     'mine_enabled': True,
     'mine_return_job': False,
     'mine_interval': 60,
@@ -1442,6 +1563,12 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'recon_randomize': True,
     'return_retry_timer': 5,
     'return_retry_timer_max': 10,
+    'return_batch': False,
+    'return_batch_interval': 0.5,
+    'return_batch_size': 100,
+    'return_batch_functions': [],
+    'job_pool_size': 0,
+    'job_pool_max_jobs': 100,
     'random_reauth_delay': 10,
     'winrepo_source_dir': 'salt://win/repo-ng/',
     'winrepo_dir': os.path.join(salt.syspaths.BASE_FILE_ROOTS_DIR, 'win', 'repo'),
@@ -1465,6 +1592,8 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'reactor_refresh_interval': 60,
     'reactor_worker_threads': 10,
     'reactor_worker_hwm': 10000,
+    'reactor_shards': 0,
+    'reactor_shard_key': 'data:id',
     'engines': [],
     'tcp_keepalive': True,
     'tcp_keepalive_idle': 300,
@@ -1472,6 +1601,9 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'tcp_keepalive_intvl': -1,
     'modules_max_memory': -1,
     'grains_refresh_every': 0,
+    'grains_refresh_incremental': False,
+    'grains_refresh_ttl': {'static': 86400, 'network': 0, 'runtime': 0},
+    'grains_refresh_default_volatility': 'runtime',
     'minion_id_caching': True,
     'minion_id_lowercase': False,
     'minion_id_remove_domain': False,
@@ -1490,6 +1622,8 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'password': None,
     'zmq_filtering': False,
     'zmq_monitor': False,
+    'zmq_req_multiplex': False,
+    'zmq_req_max_inflight': 16,
     'cache_sreqs': True,
     'cmd_safe': True,
     'sudo_user': '',
@@ -1497,6 +1631,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'http_request_timeout': 1 * 60 * 60.0,  # 1 hour
     'http_max_body': 100 * 1024 * 1024 * 1024,  # 100GB
     'event_match_type': 'startswith',
+    'event_publisher_filtering': False,
     'minion_restart_command': [],
     'pub_ret': True,
     'user_agent': '',
@@ -1508,6 +1643,8 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'ssl': None,
     'multifunc_ordered': False,
     'beacons_before_connect': False,
+    'beacons_threads': 0,
+    'beacons_timeout': 300,
     'scheduler_before_connect': False,
     'cache': 'localfs',
     'salt_cp_chunk_size': 65536,
@@ -1695,6 +1832,9 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'max_open_files': 100000,
     'hash_type': 'sha256',
     'optimization_order': [0, 1, 2],
+    'loader_index': False,
+    'loader_virtual_cache': False,
+    'loader_virtual_cache_ttl': 3600,
     'conf_file': os.path.join(salt.syspaths.CONFIG_DIR, 'master'),
     'open_mode': False,
     'auto_accept': False,
@@ -1711,7 +1851,10 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'ext_job_cache': '',
     'master_job_cache': 'local_cache',
     'job_cache_store_endtime': False,
+    'job_cache_index': True,
+    'job_cache_hour_buckets': False,
     'minion_data_cache': True,
+    'batch_use_minion_data_cache': False,
     'enforce_mine_cache': False,
     'ipc_mode': _DFLT_IPC_MODE,
     'ipc_write_buffer': _DFLT_IPC_WBUFFER,
@@ -1741,12 +1884,22 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'reactor_refresh_interval': 60,
     'reactor_worker_threads': 10,
     'reactor_worker_hwm': 10000,
+    'reactor_shards': 0,
+    'reactor_shard_key': 'data:id',
     'engines': [],
     'event_return': '',
     'event_return_queue': 0,
+    'event_return_queue_max_size': 10000,
+    'event_return_overflow': 'drop',
+    'event_return_retries': 3,
+    'event_return_retry_backoff': 1.0,
+    'event_return_retry_backoff_max': 60.0,
+    'event_return_stats': False,
+    'event_return_stats_event_iter': 60,
     'event_return_whitelist': [],
     'event_return_blacklist': [],
     'event_match_type': 'startswith',
+    'event_publisher_filtering': False,
     'runner_returns': True,
     'serial': 'msgpack',
     'test': False,
@@ -1812,6 +1965,10 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'ssh_identities_only': False,
     'ssh_log_file': os.path.join(salt.syspaths.LOGS_DIR, 'ssh'),
     'ssh_config_file': os.path.join(salt.syspaths.HOME_DIR, '.ssh', 'config'),
+    'ssh_pool_procs': 0,
+    'ssh_control_persist': 0,
+    'ssh_thin_layers': False,
+    'ssh_state_bundles': False,
     'cluster_mode': False,
     'sqlite_queue_dir': os.path.join(salt.syspaths.CACHE_DIR, 'master', 'queues'),
     'queue_dirs': [],
@@ -4157,6 +4314,14 @@ def apply_master_config(overrides=None, defaults=None):
         )
         opts["worker_threads"] = 3
 
+    if opts["event_return_overflow"] not in ("drop", "spill"):
+        log.warning(
+            "Invalid 'event_return_overflow' setting '%s', it must be either "
+            "'drop' or 'spill'. Resetting it to 'drop'.",
+            opts["event_return_overflow"],
+        )
+        opts["event_return_overflow"] = "drop"
+
     opts.setdefault("pillar_source_merging_strategy", "smart")
 
     # Make sure hash_type is lowercase
@@ -457,6 +457,7 @@ class RemoteFuncs(object):
         self.mminion = salt.minion.MasterMinion(self.opts, states=False, rend=False)
         self.__setup_fileserver()
         self.cache = salt.cache.factory(opts)
+        self.mine_cache = salt.utils.mine.MineCache()
 
     def __setup_fileserver(self):
         """
@@ -633,23 +634,42 @@ class RemoteFuncs(object):
         _res = checker.check_minions(load["tgt"], match_type, greedy=False)
         minions = _res["minions"]
         minion_side_acl = {}  # Cache minion-side ACL
+        # Versions of the entries the requester already holds, only the
+        # entries which changed since are sent back
+        known = load.get("mine_known")
+        versions = {}
         for minion in minions:
-            fdata = self.cache.fetch('minions/{0}'.format(minion), 'mine')
-
-            if not isinstance(fdata, dict):
+            if not self.mine_cache.refresh(self.cache, minion):
                 continue
 
-            if not _ret_dict and functions_allowed and functions_allowed[0] in fdata:
-                ret[minion] = fdata.get(functions_allowed[0])
+            if isinstance(known, dict):
+                versions[minion] = self.mine_cache.version(minion, functions_allowed)
+                if known.get(minion) == versions[minion]:
+                    continue
+
+            if (
+                not _ret_dict
+                and functions_allowed
+                and self.mine_cache.has(minion, functions_allowed[0])
+            ):
+                ret[minion] = self.mine_cache.get(minion, functions_allowed[0])
             elif _ret_dict:
-                for fun in list(set(functions_allowed) & set(fdata.keys())):
-                    ret.setdefault(fun, {})[minion] = fdata.get(fun)
+                for fun in set(functions_allowed):
+                    if self.mine_cache.has(minion, fun):
+                        ret.setdefault(fun, {})[minion] = self.mine_cache.get(
+                            minion, fun
+                        )
 
+        if isinstance(known, dict):
+            return {"mine_versions": versions, "mine_data": ret}
         return ret
 
     def _mine(self, load, skip_verify=False):
         """
         Store/update the mine data in cache.
+
+        If the minion sent the hashes of its mine entries along, reply with
+        the hashes of those the cache now holds the same value of.
         """
         if not skip_verify:
             if "id" not in load or "data" not in load:
@@ -659,12 +679,34 @@ class RemoteFuncs(object):
         ):
             cbank = "minions/{0}".format(load["id"])
             ckey = "mine"
-            new_data = load["data"]
-            if not load.get("clear", False):
-                data = self.cache.fetch(cbank, ckey)
-                if isinstance(data, dict):
-                    data.update(new_data)
-            self.cache.store(cbank, ckey, data)
+            hashes = load.get("mine_hashes")
+            data = load["data"]
+            if data or load.get("clear", False) or not isinstance(hashes, dict):
+                if not load.get("clear", False):
+                    old_data = self.cache.fetch(cbank, ckey)
+                    if isinstance(old_data, dict):
+                        old_data.update(data)
+                        data = old_data
+                self.cache.store(cbank, ckey, data)
+                self.mine_cache.forget(load["id"])
+                held = dict(
+                    (fun, salt.utils.mine.data_hash(data[fun]))
+                    for fun in hashes or ()
+                    if isinstance(data, dict) and fun in data
+                )
+            elif self.mine_cache.refresh(self.cache, load["id"]):
+                # Nothing changed on the minion, only check the cache
+                held = self.mine_cache.hashes[load["id"]]
+            else:
+                held = {}
+            if isinstance(hashes, dict):
+                return {
+                    "mine_hashes": dict(
+                        (fun, hash_)
+                        for fun, hash_ in six.iteritems(hashes)
+                        if held.get(fun) == hash_
+                    )
+                }
         return True
 
     def _mine_delete(self, load):
@@ -685,6 +727,7 @@ class RemoteFuncs(object):
                 if load["fun"] in data:
                     del data[load["fun"]]
                     self.cache.store(cbank, ckey, data)
+                    self.mine_cache.forget(load["id"])
             except OSError:
                 return False
         return True
@@ -698,6 +741,7 @@ class RemoteFuncs(object):
         if self.opts.get("minion_data_cache", False) or self.opts.get(
             "enforce_mine_cache", False
         ):
+            self.mine_cache.forget(load["id"])
             return self.cache.flush("minions/{0}".format(load["id"]), "mine")
         return True
 
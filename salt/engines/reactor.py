@@ -11,6 +11,7 @@ Example Config in Master or Minion config
           refresh_interval: 60
           worker_threads: 10
           worker_hwm: 10000
+          shards: 4
 
     reactor:
       - 'salt/cloud/*/destroyed':
@@ -24,12 +25,14 @@ from __future__ import absolute_import, print_function, unicode_literals
 import salt.utils.reactor
 
 
-def start(refresh_interval=None, worker_threads=None, worker_hwm=None):
+def start(refresh_interval=None, worker_threads=None, worker_hwm=None, shards=None):
     if refresh_interval is not None:
         __opts__["reactor_refresh_interval"] = refresh_interval
     if worker_threads is not None:
         __opts__["reactor_worker_threads"] = worker_threads
     if worker_hwm is not None:
         __opts__["reactor_worker_hwm"] = worker_hwm
+    if shards is not None:
+        __opts__["reactor_shards"] = shards
 
     salt.utils.reactor.Reactor(__opts__).run()
@@ -38,6 +38,7 @@ import salt.log
 import salt.modules.cmdmod
 import salt.modules.smbios
 import salt.utils.args
+import salt.utils.decorators
 import salt.utils.dns
 import salt.utils.files
 import salt.utils.network
@@ -2344,6 +2345,7 @@ def locale_info():
     return grains
 
 
+@salt.utils.decorators.grains_volatility("network")
 def hostname():
     """
     Return fqdn, hostname, domainname
@@ -2401,6 +2403,7 @@ def append_domain():
     return grain
 
 
+@salt.utils.decorators.grains_volatility("network")
 def fqdns():
     """
     Return all known FQDNs for the system by enumerating all interfaces and
@@ -2431,6 +2434,7 @@ def fqdns():
     return {"fqdns": sorted(list(fqdns))}
 
 
+@salt.utils.decorators.grains_volatility("network")
 def ip_fqdn():
     """
     Return ip address and FQDN grains
@@ -2469,6 +2473,7 @@ def ip_fqdn():
     return ret
 
 
+@salt.utils.decorators.grains_volatility("network")
 def ip_interfaces():
     """
     Provide a dict of the connected interfaces and their ip addresses
@@ -2497,6 +2502,7 @@ def ip_interfaces():
     return {"ip_interfaces": ret}
 
 
+@salt.utils.decorators.grains_volatility("network")
 def ip4_interfaces():
     """
     Provide a dict of the connected interfaces and their ip4 addresses
@@ -2522,6 +2528,7 @@ def ip4_interfaces():
     return {"ip4_interfaces": ret}
 
 
+@salt.utils.decorators.grains_volatility("network")
 def ip6_interfaces():
     """
     Provide a dict of the connected interfaces and their ip6 addresses
@@ -2547,6 +2554,7 @@ def ip6_interfaces():
     return {"ip6_interfaces": ret}
 
 
+@salt.utils.decorators.grains_volatility("network")
 def hwaddr_interfaces():
     """
     Provide a dict of the connected interfaces and their
@@ -2562,6 +2570,7 @@ def hwaddr_interfaces():
     return {"hwaddr_interfaces": ret}
 
 
+@salt.utils.decorators.grains_volatility("network")
 def dns():
     """
     Parse the resolver configuration file
@@ -3057,6 +3066,7 @@ def get_master():
     return {"master": __opts__.get("master", "")}
 
 
+@salt.utils.decorators.grains_volatility("network")
 def default_gateway():
     """
     Populates grains which describe whether a server has a default gateway
@@ -3103,6 +3113,7 @@ def default_gateway():
     return grains
 
 
+@salt.utils.decorators.grains_volatility("static")
 def kernelparams():
     '''
     Return the kernel boot parameters
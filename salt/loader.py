@@ -8,7 +8,9 @@ plugin interfaces used by Salt.
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
 
+import copy
 import functools
+import hashlib
 import inspect
 import logging
 import os
@@ -27,19 +29,23 @@ from zipimport import zipimporter
 import salt.config
 import salt.defaults.events
 import salt.defaults.exitcodes
+import salt.payload
 import salt.syspaths
 import salt.utils.args
+import salt.utils.atomicfile
 import salt.utils.context
 import salt.utils.data
 import salt.utils.dictupdate
 import salt.utils.event
 import salt.utils.files
+import salt.utils.json
 import salt.utils.lazy
 import salt.utils.odict
 import salt.utils.platform
 import salt.utils.stringutils
 import salt.utils.versions
 import salt.utils.stringutils
+import salt.version
 from salt.exceptions import LoaderError
 from salt.template import check_render_pipe_str
 from salt.utils.decorators import Depends
@@ -76,8 +82,45 @@ try:
 except ImportError:
     HAS_PKG_RESOURCES = False
 
+try:
+    import salt.utils.psutil_compat as psutil
+
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
 log = logging.getLogger(__name__)
 
+
+def _path_mtime(path):
+    """
+    Return the mtime of a file or directory, or None if it does not exist
+    """
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _virtual_cache_default(obj):
+    """
+    Serialize the grain values which are not JSON types into the key of the
+    cache of __virtual__ outcomes. Objects are reduced to their type, their
+    repr would change with every process.
+    """
+    if isinstance(obj, ThreadLocalProxy):
+        return ThreadLocalProxy.unproxy(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=repr)
+    if isinstance(obj, MutableMapping):
+        return dict(obj)
+    return "<{0}>".format(type(obj).__name__)
+
+
+# Number of __virtual__ caches kept per loader tag, older ones are pruned
+VIRTUAL_CACHE_KEEP = 3
+
+
 SALT_BASE_PATH = os.path.abspath(salt.syspaths.INSTALL_DIR)
 LOADED_BASE_NAME = "salt.loaded"
 
@@ -724,6 +767,111 @@ def _load_cached_grains(opts, cfn):
         return None
 
 
+# Seconds spent in each grains function during the last grains load
+GRAINS_TIMINGS = {}
+
+
+def _grains_boot_id():
+    """
+    Return an identifier of the current boot, so that the per-function grains
+    cache does not outlive a reboot, or None if it cannot be determined
+    """
+    try:
+        with salt.utils.files.fopen("/proc/sys/kernel/random/boot_id", "r") as fp_:
+            return fp_.read().strip()
+    except (IOError, OSError):
+        pass
+    # Not Linux, identify the boot by the boot time instead
+    if HAS_PSUTIL:
+        try:
+            return "boot-time-{0}".format(int(round(psutil.boot_time())))
+        except Exception:  # pylint: disable=broad-except
+            pass
+    return None
+
+
+def _grains_func_ttl(opts, func):
+    """
+    Return how many seconds the result of a grains function can be reused,
+    None if it never expires.
+    """
+    volatility = getattr(func, "__grains_volatility__", None)
+    if volatility is None:
+        volatility = opts.get("grains_refresh_default_volatility", "runtime")
+    if isinstance(volatility, six.integer_types):
+        return volatility
+    return opts.get("grains_refresh_ttl", {}).get(volatility, 0)
+
+
+def _grains_func_mtime(func):
+    """
+    Return the mtime of the file a grains function was loaded from
+    """
+    return _path_mtime(getattr(func, "__globals__", {}).get("__file__") or "")
+
+
+def _load_grains_funcs_cache(opts, cfn):
+    """
+    Return the per-function grains cache stored in cfn, dropping it when it
+    was written during a previous boot.
+    """
+    try:
+        with salt.utils.files.fopen(cfn, "rb") as fp_:
+            cached = salt.payload.Serial(opts).load(fp_)
+    except Exception:  # pylint: disable=broad-except
+        # Missing, unreadable or corrupted cache, start over
+        return {}
+    boot_id = _grains_boot_id()
+    if boot_id is None or not isinstance(cached, dict):
+        return {}
+    if cached.get("boot_id") != boot_id:
+        return {}
+    return cached.get("funcs") or {}
+
+
+def _write_grains_funcs_cache(opts, cfn, funcs_cache):
+    """
+    Store the per-function grains cache in cfn
+    """
+    try:
+        with salt.utils.files.set_umask(0o077):
+            with salt.utils.atomicfile.atomic_open(cfn, "wb") as fp_:
+                salt.payload.Serial(opts).dump(
+                    {"boot_id": _grains_boot_id(), "funcs": funcs_cache}, fp_
+                )
+    except Exception as exc:  # pylint: disable=broad-except
+        log.error("Unable to write the grains functions cache %s: %s", cfn, exc)
+
+
+def _call_grains_func(opts, key, func, kwargs, funcs_cache, new_cache, now):
+    """
+    Run a grains function and record how long it took. When the incremental
+    refresh is enabled, its previous result is reused instead until it expires.
+    """
+    if funcs_cache is not None:
+        entry = funcs_cache.get(key)
+        if entry is not None and entry.get("mtime") == _grains_func_mtime(func):
+            ttl = _grains_func_ttl(opts, func)
+            if ttl is None or now - entry["time"] < ttl:
+                log.trace("Using cached %s grain", key)
+                new_cache[key] = entry
+                GRAINS_TIMINGS[key] = entry["duration"]
+                return copy.deepcopy(entry["ret"])
+    start = time.time()
+    ret = func(**kwargs)
+    duration = time.time() - start
+    GRAINS_TIMINGS[key] = duration
+    log.profile("Grains function %s took %.6f seconds to execute", key, duration)
+    if funcs_cache is not None and isinstance(ret, dict):
+        new_cache[key] = {
+            "time": now,
+            "duration": duration,
+            "mtime": _grains_func_mtime(func),
+            "ret": copy.deepcopy(ret),
+        }
+    return ret
+
+
 def grains(opts, force_refresh=False, proxy=None):
     """
     Return the functions for the dynamic grains and the values for the static
@@ -789,12 +937,28 @@ def grains(opts, force_refresh=False, proxy=None):
     funcs = grain_funcs(opts, proxy=proxy)
     if force_refresh:  # if we refresh, lets reload grain modules
         funcs.clear()
+    GRAINS_TIMINGS.clear()
+    funcs_cfn = os.path.join(opts["cachedir"], "grains.funcs.p")
+    funcs_cache = new_funcs_cache = None
+    if opts.get("grains_refresh_incremental", False) and proxy is None:
+        if _grains_boot_id() is None:
+            # The cached results could then outlive a reboot
+            log.debug(
+                "Unable to identify the current boot, not reusing the results "
+                "of the grains functions"
+            )
+        else:
+            funcs_cache = _load_grains_funcs_cache(opts, funcs_cfn)
+            new_funcs_cache = {}
+    now = time.time()
     # Run core grains
     for key in funcs:
         if not key.startswith("core."):
             continue
         log.trace("Loading %s grain", key)
-        ret = funcs[key]()
+        ret = _call_grains_func(
+            opts, key, funcs[key], {}, funcs_cache, new_funcs_cache, now
+        )
         if not isinstance(ret, dict):
             continue
         if blist:
@@ -828,7 +992,9 @@ def grains(opts, force_refresh=False, proxy=None):
                 kwargs["proxy"] = proxy
             if "grains" in parameters:
                 kwargs["grains"] = grains_data
-            ret = funcs[key](**kwargs)
+            ret = _call_grains_func(
+                opts, key, funcs[key], kwargs, funcs_cache, new_funcs_cache, now
+            )
         except Exception:  # pylint: disable=broad-except
             if salt.utils.platform.is_proxy():
                 log.info(
@@ -879,6 +1045,9 @@ def grains(opts, force_refresh=False, proxy=None):
         except KeyError:
             pass
 
+    if new_funcs_cache is not None:
+        _write_grains_funcs_cache(opts, funcs_cfn, new_funcs_cache)
+
     grains_data.update(opts["grains"])
     # Write cache if enabled
     if opts.get("grains_cache", False):
@@ -1295,6 +1464,10 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             self.suffix_order.append(suffix)
 
         self._lock = threading.RLock()
+        # Cached __virtual__ outcomes, loaded on first use
+        self._virtual_cache = None
+        self._virtual_cache_file = None
+        self._virtual_cache_dirty = False
         self._refresh_file_mapping()
 
         super(LazyLoader, self).__init__()  # late init the lazy loader
@@ -1390,9 +1563,29 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         else:
             self.suffix_map[""] = ("", "", imp.PKG_DIRECTORY)
 
+        index_path = self._file_mapping_index_path()
+        file_mapping = None
+        if index_path is not None:
+            file_mapping = self._read_file_mapping_index(index_path)
+        if file_mapping is not None:
+            self.file_mapping = file_mapping
+        else:
+            scanned_dirs = self._scan_file_mapping()
+            if index_path is not None:
+                self._write_file_mapping_index(index_path, scanned_dirs)
+        for smod in self.static_modules:
+            f_noext = smod.split(".")[-1]
+            self.file_mapping[f_noext] = (smod, ".o", 0)
+
+    def _scan_file_mapping(self):
+        """
+        Build the file mapping from the module dirs. Returns the directories
+        which were listed, along with their mtimes.
+        """
         # create mapping of filename (without suffix) to (path, suffix)
         # The files are added in order of priority, so order *must* be retained.
         self.file_mapping = salt.utils.odict.OrderedDict()
+        scanned_dirs = []
 
         opt_match = []
 
@@ -1407,6 +1600,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             return ""
 
         for mod_dir in self.module_dirs:
+            scanned_dirs.append((mod_dir, _path_mtime(mod_dir)))
             try:
                 # Make sure we have a sorted listdir in order to have
                 # expectable override results
@@ -1414,12 +1608,12 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             except OSError:
                 continue  # Next mod_dir
             if six.PY3:
+                pycache_dir = os.path.join(mod_dir, "__pycache__")
+                scanned_dirs.append((pycache_dir, _path_mtime(pycache_dir)))
                 try:
                     pycache_files = [
                         os.path.join("__pycache__", x)
-                        for x in sorted(
-                            os.listdir(os.path.join(mod_dir, "__pycache__"))
-                        )
+                        for x in sorted(os.listdir(pycache_dir))
                     ]
                 except OSError:
                     pass
@@ -1471,6 +1665,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # if its a directory, lets allow us to load that
                     if ext == "":
                         # is there something __init__?
+                        scanned_dirs.append((fpath, _path_mtime(fpath)))
                         subfiles = os.listdir(fpath)
                         for suffix in self.suffix_order:
                             if "" == suffix:
@@ -1518,9 +1713,76 @@ class LazyLoader(salt.utils.lazy.LazyDict):
 
                 except OSError:
                     continue
-        for smod in self.static_modules:
-            f_noext = smod.split(".")[-1]
-            self.file_mapping[f_noext] = (smod, ".o", 0)
+        return scanned_dirs
+
+    def _file_mapping_index_path(self):
+        """
+        Return the path of the on-disk index of the file mapping, or None if
+        ``loader_index`` is disabled.
+
+        The index file is keyed on everything, other than the contents of the
+        module dirs, which goes into the file mapping.
+        """
+        if not self.opts.get("loader_index", False) or not self.opts.get("cachedir"):
+            return None
+        key = hashlib.sha256(
+            salt.utils.stringutils.to_bytes(
+                repr(
+                    (
+                        salt.version.__version__,
+                        tuple(sys.version_info[:2]),
+                        self.tag,
+                        list(self.module_dirs),
+                        sorted(self.disabled),
+                        sorted(self.suffix_map),
+                        self.opts.get("optimization_order"),
+                    )
+                )
+            )
+        ).hexdigest()
+        return os.path.join(
+            self.opts["cachedir"],
+            "loader_index",
+            "{0}-{1}.p".format(self.tag, key[:16]),
+        )
+
+    def _read_file_mapping_index(self, path):
+        """
+        Return the file mapping stored in the index, or None if there is no
+        index or if any of the indexed directories changed since it was written
+        """
+        try:
+            with salt.utils.files.fopen(path, "rb") as fp_:
+                index = salt.payload.Serial("msgpack").load(fp_)
+            for dirname, mtime in index["dirs"]:
+                if _path_mtime(dirname) != mtime:
+                    log.trace("Loader index %s is stale, %s changed", path, dirname)
+                    return None
+            return salt.utils.odict.OrderedDict(
+                (name, tuple(entry)) for name, entry in index["file_mapping"]
+            )
+        except Exception:  # pylint: disable=broad-except
+            # Missing, unreadable or corrupted index, just rescan
+            return None
+
+    def _write_file_mapping_index(self, path, scanned_dirs):
+        """
+        Store the file mapping along with the mtimes of the directories it
+        was built from
+        """
+        index = {
+            "dirs": scanned_dirs,
+            "file_mapping": [
+                (name, list(entry)) for name, entry in six.iteritems(self.file_mapping)
+            ],
+        }
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with salt.utils.atomicfile.atomic_open(path, "wb") as fp_:
+                salt.payload.Serial("msgpack").dump(index, fp_)
+        except (IOError, OSError) as exc:
+            log.debug("Unable to write the loader index %s: %s", path, exc)
 
     def clear(self):
         """
@@ -1570,6 +1832,10 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         """
         Iterate over all file_mapping files in order of closeness to mod_name
         """
+        # do we already know which files load under that name?
+        for name in self._virtual_cache_lookup(mod_name):
+            yield name
+
         # do we have an exact match?
         if mod_name in self.file_mapping:
             yield mod_name
@@ -1602,6 +1868,14 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         mod = None
         fpath, suffix = self.file_mapping[name][:2]
         self.loaded_files.add(name)
+        cached = self._virtual_cache_get(name)
+        if cached is not None and not cached["loaded"]:
+            # __virtual__ is known to reject this module, don't import it
+            log.trace("Skipping %s.%s, its __virtual__ returned False", self.tag, name)
+            for mod_name in cached["names"]:
+                self.missing_modules[mod_name] = cached["error"]
+            self.missing_modules[name] = cached["error"]
+            return False
         fpath_dirname = os.path.dirname(fpath)
         try:
             sys.path.append(fpath_dirname)
@@ -1796,6 +2070,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # If a module has information about why it could not be loaded, record it
                     self.missing_modules[module_name] = virtual_err
                     self.missing_modules[name] = virtual_err
+                    self._virtual_cache_set(name, False, [module_name], virtual_err)
                     return False
         else:
             virtual_aliases = ()
@@ -1873,8 +2148,177 @@ class LazyLoader(salt.utils.lazy.LazyDict):
 
         for tgt_mod in mod_names:
             self.loaded_modules[tgt_mod] = mod_dict[tgt_mod]
+        if self.virtual_enable:
+            self._virtual_cache_set(name, True, mod_names)
         return True
 
+    def _virtual_cache_path(self):
+        """
+        Return the path of the cache of __virtual__ outcomes, or None if
+        ``loader_virtual_cache`` is disabled.
+
+        The cache is keyed on what __virtual__ functions commonly depend on:
+        the grains, the proxy type and the module directories.
+        """
+        if (
+            not self.virtual_enable
+            or not self.opts.get("loader_virtual_cache", False)
+            or not self.opts.get("cachedir")
+        ):
+            return None
+        proxy = self.opts.get("proxy")
+        try:
+            key = hashlib.sha256(
+                salt.utils.stringutils.to_bytes(
+                    salt.utils.json.dumps(
+                        [
+                            salt.version.__version__,
+                            list(sys.version_info[:2]),
+                            self.tag,
+                            self.virtual_funcs,
+                            self.opts.get("grains") or {},
+                            proxy.get("proxytype")
+                            if isinstance(proxy, MutableMapping)
+                            else None,
+                            list(self.module_dirs),
+                        ],
+                        sort_keys=True,
+                        default=_virtual_cache_default,
+                    )
+                )
+            ).hexdigest()
+        except (TypeError, ValueError) as exc:
+            log.debug("Not caching the __virtual__ outcomes of %s: %s", self.tag, exc)
+            return None
+        return os.path.join(
+            self.opts["cachedir"],
+            "loader_index",
+            "virtual-{0}-{1}.p".format(self.tag, key[:16]),
+        )
+
+    def _read_virtual_cache(self):
+        if self._virtual_cache is not None:
+            return self._virtual_cache
+        self._virtual_cache = {}
+        self._virtual_cache_file = self._virtual_cache_path()
+        if self._virtual_cache_file is not None:
+            try:
+                with salt.utils.files.fopen(self._virtual_cache_file, "rb") as fp_:
+                    self._virtual_cache = salt.payload.Serial("msgpack").load(fp_) or {}
+            except Exception:  # pylint: disable=broad-except
+                # Missing, unreadable or corrupted cache, start over
+                pass
+        return self._virtual_cache
+
+    def _virtual_cache_get(self, name):
+        """
+        Return the cached __virtual__ outcome of a file in the file mapping,
+        if the file did not change since it was recorded
+        """
+        cached = self._read_virtual_cache().get(name)
+        if cached is None:
+            return None
+        fpath = self.file_mapping.get(name, (None,))[0]
+        if cached["path"] != fpath or _path_mtime(fpath) != cached["mtime"]:
+            return None
+        if not cached["loaded"]:
+            # A rejection may depend on something outside of the cache key,
+            # such as an installed binary, run __virtual__ again once expired
+            ttl = self.opts.get("loader_virtual_cache_ttl", 3600)
+            if ttl and time.time() - cached.get("time", 0) > ttl:
+                return None
+        return cached
+
+    def _virtual_cache_set(self, name, loaded, names, error=None):
+        """
+        Record the __virtual__ outcome of a file in the file mapping
+        """
+        self._read_virtual_cache()
+        if self._virtual_cache_file is None:
+            return
+        fpath, suffix = self.file_mapping[name][:2]
+        if suffix == ".o":
+            # Static modules have no file on disk to check against
+            return
+        self._virtual_cache[name] = {
+            "path": fpath,
+            "mtime": _path_mtime(fpath),
+            "loaded": loaded,
+            "names": list(names),
+            "error": None if error is None else six.text_type(error),
+            "time": time.time(),
+        }
+        self._virtual_cache_dirty = True
+
+    def _virtual_cache_lookup(self, mod_name):
+        """
+        Return the files known to load under the name ``mod_name``
+        """
+        return [
+            name
+            for name, cached in six.iteritems(self._read_virtual_cache())
+            if cached["loaded"]
+            and mod_name in cached["names"]
+            and name in self.file_mapping
+            and self._virtual_cache_get(name) is not None
+        ]
+
+    def _write_virtual_cache(self):
+        """
+        Persist the __virtual__ outcomes recorded by this loader, merged with
+        the ones recorded meanwhile by other processes
+        """
+        if not self._virtual_cache_dirty or self._virtual_cache_file is None:
+            return
+        self._virtual_cache_dirty = False
+        serial = salt.payload.Serial("msgpack")
+        cache = {}
+        try:
+            with salt.utils.files.fopen(self._virtual_cache_file, "rb") as fp_:
+                cache = serial.load(fp_) or {}
+        except Exception:  # pylint: disable=broad-except
+            pass
+        cache.update(self._virtual_cache)
+        try:
+            if not os.path.isdir(os.path.dirname(self._virtual_cache_file)):
+                os.makedirs(os.path.dirname(self._virtual_cache_file))
+            with salt.utils.atomicfile.atomic_open(
+                self._virtual_cache_file, "wb"
+            ) as fp_:
+                serial.dump(cache, fp_)
+        except (IOError, OSError) as exc:
+            log.debug(
+                "Unable to write the loader virtual cache %s: %s",
+                self._virtual_cache_file,
+                exc,
+            )
+            return
+        self._prune_virtual_cache()
+
+    def _prune_virtual_cache(self):
+        """
+        Remove the __virtual__ caches of this tag recorded under other keys,
+        such as previous grains, keeping the most recently written ones
+        """
+        cache_dir = os.path.dirname(self._virtual_cache_file)
+        prefix = "virtual-{0}-".format(self.tag)
+        try:
+            paths = [
+                os.path.join(cache_dir, fn_)
+                for fn_ in os.listdir(cache_dir)
+                if fn_.startswith(prefix) and fn_.endswith(".p")
+            ]
+        except OSError:
+            return
+        paths.sort(key=lambda path: _path_mtime(path) or 0, reverse=True)
+        for path in paths[VIRTUAL_CACHE_KEEP:]:
+            if path == self._virtual_cache_file:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
     def _load(self, key):
         """
         Load a single item if you have it
@@ -1928,6 +2372,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                         self._refresh_file_mapping()
                         reloaded = True
                     continue
+            self._write_virtual_cache()
 
         return ret
 
@@ -1942,6 +2387,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                 self._load_module(name)
 
             self.loaded = True
+            self._write_virtual_cache()
 
     def reload_modules(self):
         with self._lock:
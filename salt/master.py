@@ -1232,6 +1232,7 @@ class AESFuncs(TransportMethods):
         "_minion_event",
         "_handle_minion_event",
         "_return",
+        "_return_batch",
         "_syndic_return",
         "_minion_runner",
         "pub_ret",
@@ -1506,8 +1507,9 @@ class AESFuncs(TransportMethods):
 
         :param dict load: A payload received from a minion
 
-        :rtype: bool
-        :return: True if the data has been stored in the mine
+        :rtype: bool or dict
+        :return: True if the data has been stored in the mine, or the hashes
+            of the entries the mine holds if the minion sent hashes along
         """
         load = self.__verify_load(load, ("id", "data", "tok"))
         if load is False:
@@ -1703,48 +1705,70 @@ class AESFuncs(TransportMethods):
                         "Could not add minion(s) %s for job %s: %s", minions, jid, exc
                     )
 
-    def _return(self, load):
+    def __verify_load_sig(self, load, caller):
         """
-        Handle the return data sent from the minions.
-
-        Takes the return, verifies it and fires it on the master event bus.
-        Typically, this event is consumed by the Salt CLI waiting on the other
-        end of the event bus but could be heard by any listener on the bus.
+        Verify the signature of a minion payload, as required by
+        ``require_minion_sign_messages`` and ``drop_messages_signature_fail``.
+        The signature is kept in the load.
 
         :param dict load: The minion payload
+        :param str caller: The name of the function handling the payload
+
+        :rtype: bool
+        :return: Whether the payload is accepted
         """
         if self.opts["require_minion_sign_messages"] and "sig" not in load:
             log.critical(
-                "_return: Master is requiring minions to sign their "
+                "%s: Master is requiring minions to sign their "
                 "messages, but there is no signature in this payload from "
                 "%s.",
+                caller,
                 load["id"],
             )
             return False
 
         if "sig" in load:
-            log.trace("Verifying signed event publish from minion")
+            log.trace("Verifying signed payload from minion for %s", caller)
             sig = load.pop("sig")
-            this_minion_pubkey = os.path.join(
-                self.opts["pki_dir"], "minions/{0}".format(load["id"])
-            )
-            serialized_load = salt.serializers.msgpack.serialize(load)
-            if not salt.crypt.verify_signature(
-                this_minion_pubkey, serialized_load, sig
-            ):
-                log.info("Failed to verify event signature from minion %s.", load["id"])
-                if self.opts["drop_messages_signature_fail"]:
-                    log.critical(
-                        "drop_messages_signature_fail is enabled, dropping "
-                        "message from %s",
-                        load["id"],
-                    )
-                    return False
-                else:
+            try:
+                this_minion_pubkey = os.path.join(
+                    self.opts["pki_dir"], "minions/{0}".format(load["id"])
+                )
+                serialized_load = salt.serializers.msgpack.serialize(load)
+                if not salt.crypt.verify_signature(
+                    this_minion_pubkey, serialized_load, sig
+                ):
                     log.info(
-                        "But 'drop_message_signature_fail' is disabled, so message is still accepted."
+                        "Failed to verify event signature from minion %s.",
+                        load["id"],
                     )
-            load["sig"] = sig
+                    if self.opts["drop_messages_signature_fail"]:
+                        log.critical(
+                            "drop_messages_signature_fail is enabled, dropping "
+                            "message from %s",
+                            load["id"],
+                        )
+                        return False
+                    else:
+                        log.info(
+                            "But 'drop_message_signature_fail' is disabled, so message is still accepted."
+                        )
+            finally:
+                load["sig"] = sig
+        return True
+
+    def _return(self, load):
+        """
+        Handle the return data sent from the minions.
+
+        Takes the return, verifies it and fires it on the master event bus.
+        Typically, this event is consumed by the Salt CLI waiting on the other
+        end of the event bus but could be heard by any listener on the bus.
+
+        :param dict load: The minion payload
+        """
+        if not self.__verify_load_sig(load, "_return"):
+            return False
 
         try:
             salt.utils.job.store_job(
@@ -1753,6 +1777,37 @@ class AESFuncs(TransportMethods):
         except salt.exceptions.SaltCacheError:
             log.error("Could not store job information for load: %s", load)
 
+    def _return_batch(self, load):
+        """
+        Handle a batch of job returns sent by a minion with ``return_batch``
+        enabled. Each return is stored and fired on the event bus just as if
+        it had been sent through ``_return``.
+
+        :param dict load: The minion payload, carrying the list of returns
+                          under ``load``
+        """
+        if not self.__verify_load_sig(load, "_return_batch"):
+            return False
+
+        rets = load.get("load")
+        if not isinstance(rets, list):
+            log.error("Invalid batch of returns from minion %s", load["id"])
+            return False
+        loads = []
+        for ret in rets:
+            if not isinstance(ret, dict):
+                continue
+            # A minion can only return for itself
+            ret["id"] = load["id"]
+            loads.append(ret)
+        log.debug("Got a batch of %s returns from %s", len(loads), load["id"])
+        try:
+            salt.utils.job.store_jobs(
+                self.opts, loads, event=self.event, mminion=self.mminion
+            )
+        except salt.exceptions.SaltCacheError:
+            log.error("Could not store batched job returns from %s", load["id"])
+
     def _syndic_return(self, load):
         """
         Receive a syndic minion return and format it to look like returns from
@@ -1966,7 +2021,7 @@ class AESFuncs(TransportMethods):
             return False, {"fun": "send"}
         # Don't encrypt the return value for the _return func
         # (we don't care about the return value, so why encrypt it?)
-        if func == "_return":
+        if func in ("_return", "_return_batch"):
             return ret, {"fun": "send"}
         if func == "_pillar" and "id" in load:
             if load.get("ver") != "2" and self.opts["pillar_version"] == 1:
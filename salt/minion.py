@@ -7,7 +7,10 @@ from __future__ import absolute_import, print_function, unicode_literals, with_s
 
 import contextlib
 import copy
+import fnmatch
 import functools
+import heapq
+import itertools
 import logging
 import multiprocessing
 import os
@@ -94,6 +97,7 @@ import salt.utils.error
 import salt.utils.event
 import salt.utils.files
 import salt.utils.jid
+import salt.utils.mine
 import salt.utils.minion
 import salt.utils.minions
 import salt.utils.network
@@ -1290,6 +1294,193 @@ class MinionManager(MinionBase):
             minion.destroy()
 
 
+class MinionJobWorker(SignalHandlingProcess):
+    """
+    A pre-forked process running the jobs it is handed by the MinionJobPool,
+    with the modules loaded and the return channel set up once
+    """
+
+    def __init__(self, minion, conn, max_jobs=0, **kwargs):
+        super(MinionJobWorker, self).__init__(**kwargs)
+        self.minion = minion
+        self.conn = conn
+        self.max_jobs = max_jobs
+
+    def run(self):
+        salt.utils.process.appendproctitle(self.__class__.__name__)
+        minion = self.minion
+        minion._job_pool_worker = True
+        # The pool belongs to the minion process
+        minion.job_pool = None
+        minion._req_channel = salt.transport.client.ReqChannel.factory(minion.opts)
+        jobs = 0
+        try:
+            while True:
+                try:
+                    data = self.conn.recv()
+                except (EOFError, IOError, OSError):
+                    break
+                if data is None:
+                    break
+                try:
+                    Minion._target(minion, minion.opts, data, minion.connected)
+                except Exception:  # pylint: disable=broad-except
+                    log.error(
+                        "Job %s failed in the job pool worker",
+                        data.get("jid"),
+                        exc_info=True,
+                    )
+                finally:
+                    # The worker outlives the job, so clear its proc file
+                    try:
+                        os.remove(os.path.join(minion.proc_dir, data["jid"]))
+                    except (OSError, IOError):
+                        pass
+                jobs += 1
+                if self.max_jobs and jobs >= self.max_jobs:
+                    # Recycle the worker, the pool replaces it
+                    self.conn.send("exit")
+                    break
+                self.conn.send("done")
+        finally:
+            minion._req_channel.close()
+
+
+class MinionJobPool(object):
+    """
+    A pool of pre-forked MinionJobWorker processes.
+
+    The workers are forked from the minion, so they start with its loaded
+    modules. Each job still runs with a fresh copy of the loader context
+    dicts, like a forked job. Module-level state which a job leaves behind
+    is cleared by recycling workers after ``job_pool_max_jobs`` jobs, and
+    the whole pool is restarted whenever the minion reloads its modules or
+    its pillar.
+    """
+
+    def __init__(self, minion, size, max_jobs=0, io_loop=None, on_done=None):
+        self.minion = minion
+        self.size = size
+        self.max_jobs = max_jobs
+        # When given an io_loop, on_done is called as soon as a worker is done
+        self.io_loop = io_loop
+        self.on_done = on_done
+        self.workers = []
+        self.retired = []
+
+    def start(self):
+        """
+        Fork workers until the pool is full
+        """
+        while len(self.workers) < self.size:
+            self._spawn()
+
+    def _spawn(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        with default_signals(signal.SIGINT, signal.SIGTERM):
+            process = MinionJobWorker(
+                self.minion, child_conn, self.max_jobs, name="MinionJobWorker"
+            )
+            process._after_fork_methods.append(
+                (salt.utils.crypt.reinit_crypto, [], {})
+            )
+            process.start()
+        child_conn.close()
+        worker = {"process": process, "conn": parent_conn, "busy": False, "jid": None}
+        self.workers.append(worker)
+        if self.io_loop is not None:
+            self.io_loop.add_handler(
+                parent_conn.fileno(),
+                functools.partial(self._handle_worker_readable, worker),
+                self.io_loop.READ,
+            )
+
+    def _handle_worker_readable(self, worker, fd, events):
+        self.reap()
+        if self.on_done is not None:
+            self.on_done()
+
+    def reap(self):
+        """
+        Collect finished jobs, and replace recycled or dead workers
+        """
+        for worker in list(self.workers):
+            if worker["busy"] and worker["conn"].poll():
+                try:
+                    msg = worker["conn"].recv()
+                except (EOFError, IOError, OSError):
+                    msg = "exit"
+                worker["busy"] = False
+                worker["jid"] = None
+                if msg == "exit":
+                    self._retire(worker)
+                    continue
+            if not worker["process"].is_alive():
+                if worker["busy"]:
+                    log.warning(
+                        "Job pool worker %s died while running a job",
+                        worker["process"].pid,
+                    )
+                self._retire(worker)
+        self.retired = [proc for proc in self.retired if proc.is_alive()]
+        self.start()
+
+    def _retire(self, worker):
+        self.workers.remove(worker)
+        self._close_conn(worker)
+        self.retired.append(worker["process"])
+
+    def _close_conn(self, worker):
+        if self.io_loop is not None:
+            self.io_loop.remove_handler(worker["conn"].fileno())
+        worker["conn"].close()
+
+    def running_jids(self):
+        """
+        Return the jids of the jobs the workers are running
+        """
+        self.reap()
+        return set(worker["jid"] for worker in self.workers if worker["busy"])
+
+    def submit(self, data):
+        """
+        Hand a job to an idle worker. Returns False if every worker is busy.
+        """
+        self.reap()
+        for worker in self.workers:
+            if worker["busy"]:
+                continue
+            try:
+                worker["conn"].send(data)
+            except (IOError, OSError):
+                self._retire(worker)
+                continue
+            worker["busy"] = True
+            worker["jid"] = data.get("jid")
+            return True
+        return False
+
+    def stop(self):
+        """
+        Ask the workers to exit once they are done with their current job
+        """
+        for worker in self.workers:
+            try:
+                worker["conn"].send(None)
+            except (IOError, OSError):
+                pass
+            self._close_conn(worker)
+            self.retired.append(worker["process"])
+        self.workers = []
+
+    def restart(self):
+        """
+        Replace the workers with fresh forks of the minion
+        """
+        self.stop()
+        self.start()
+
+
 class Minion(MinionBase):
     """
     This class instantiates a minion, runs connections for a minion,
@@ -1324,6 +1515,15 @@ class Minion(MinionBase):
         self.ready = False
         self.jid_queue = [] if jid_queue is None else jid_queue
         self.periodic_callbacks = {}
+        # Job returns waiting to be sent to the master with return_batch
+        self._return_batch = []
+        self._return_batch_lock = threading.Lock()
+        self._return_batch_pid = None
+        self.job_pool = None
+        # In-memory admission of jobs past process_count_max
+        self._running_jobs = {}
+        self._job_queue = []
+        self._job_queue_seq = itertools.count()
 
         if io_loop is None:
             install_zmq()
@@ -1645,6 +1845,9 @@ class Minion(MinionBase):
             )
             load["sig"] = sig
 
+        if getattr(self, "_req_channel", None) is not None:
+            # Job pool workers keep their channel open across jobs
+            return self._req_channel.send(load, timeout=timeout)
         with salt.transport.client.ReqChannel.factory(self.opts) as channel:
             return channel.send(load, timeout=timeout)
 
@@ -1772,19 +1975,28 @@ class Minion(MinionBase):
                 ) = self._load_modules()
                 self.schedule.functions = self.functions
                 self.schedule.returners = self.returners
+                self._restart_job_pool()
 
-        process_count_max = self.opts.get('process_count_max')
-        process_count_max_sleep_secs = self.opts.get('process_count_max_sleep_secs')
-        if process_count_max > 0:
-            process_count = len(salt.utils.minion.running(self.opts))
-            while process_count >= process_count_max:
-                log.warning('Maximum number of processes (%s) reached while '
-                            'executing jid %s, waiting %s seconds...',
-                            process_count_max,
-                            data['jid'],
-                            process_count_max_sleep_secs)
-                yield tornado.gen.sleep(process_count_max_sleep_secs)
-                process_count = len(salt.utils.minion.running(self.opts))
+        process_count_max = self.opts.get("process_count_max")
+        if process_count_max > 0 and self._running_job_count() >= process_count_max:
+            log.warning(
+                "Maximum number of processes (%s) reached while executing "
+                "jid %s, queueing it",
+                process_count_max,
+                data["jid"],
+            )
+            self._queue_job(data)
+            return
+        self._run_job(data)
+
+    def _run_job(self, data):
+        """
+        Start the execution of a job
+        """
+        if self.job_pool is not None and self.job_pool.submit(data):
+            # An idle pre-forked worker took the job
+            self._running_jobs[data["jid"]] = self.job_pool
+            return
 
         # We stash an instance references to allow for the socket
         # communication in Windows. You can't pickle functions, and thus
@@ -1808,7 +2020,7 @@ class Minion(MinionBase):
                 )
         else:
             process = threading.Thread(
-                target=self._target,
+                target=self._thread_target,
                 args=(instance, self.opts, data, self.connected),
                 name=data["jid"],
             )
@@ -1821,13 +2033,146 @@ class Minion(MinionBase):
         else:
             process.start()
 
+        self._running_jobs[data["jid"]] = process
+
         # TODO: remove the windows specific check?
         if multiprocessing_enabled and not salt.utils.platform.is_windows():
             # we only want to join() immediately if we are daemonizing a process
             process.join()
+            self._job_done(data["jid"])
         elif salt.utils.platform.is_windows():
             self.win_proc.append(process)
 
+    def _thread_target(self, minion_instance, opts, data, connected):
+        """
+        Run a job in a thread, and let the minion know once it is done
+        """
+        try:
+            self._target(minion_instance, opts, data, connected)
+        finally:
+            self.io_loop.add_callback(self._job_done, data["jid"])
+
+    def _job_priority(self, data):
+        """
+        Return the admission priority of a job, lower runs first
+        """
+        funs = data["fun"] if isinstance(data["fun"], (list, tuple)) else [data["fun"]]
+        priorities = self.opts.get("job_queue_priorities", {})
+        matched = [
+            prio
+            for glob, prio in six.iteritems(priorities)
+            for fun in funs
+            if fnmatch.fnmatch(fun, glob)
+        ]
+        if matched:
+            return min(matched)
+        return self.opts.get("job_queue_default_priority", 10)
+
+    def _queue_job(self, data):
+        """
+        Queue a job until a process slot frees up
+        """
+        heapq.heappush(
+            self._job_queue,
+            (self._job_priority(data), next(self._job_queue_seq), time.time(), data),
+        )
+        self._write_job_queue()
+
+    def _running_jids(self):
+        """
+        Return the jids of the running jobs published to the minion,
+        forgetting about the finished ones
+        """
+        for jid, handle in list(self._running_jobs.items()):
+            if handle is self.job_pool:
+                if jid not in self.job_pool.running_jids():
+                    del self._running_jobs[jid]
+            elif handle is None or not handle.is_alive():
+                del self._running_jobs[jid]
+        return set(self._running_jobs)
+
+    def _running_job_count(self):
+        """
+        Return the number of running jobs, including the scheduled ones which
+        are only known through their proc file
+        """
+        jids = self._running_jids()
+        jids.update(job["jid"] for job in salt.utils.minion.running(self.opts))
+        return len(jids)
+
+    def _job_done(self, jid=None):
+        """
+        Called when a job finished, start the next queued jobs
+        """
+        if jid is not None:
+            self._running_jobs.pop(jid, None)
+        self._dispatch_queued_jobs()
+
+    def _dispatch_queued_jobs(self):
+        """
+        Start queued jobs, by priority, while there are free process slots
+        """
+        if not self._job_queue:
+            return
+        process_count_max = self.opts.get("process_count_max")
+        started = False
+        while self._job_queue and (
+            process_count_max <= 0 or self._running_job_count() < process_count_max
+        ):
+            data = heapq.heappop(self._job_queue)[-1]
+            log.debug("Starting queued job %s", data["jid"])
+            started = True
+            self._run_job(data)
+        if started:
+            self._write_job_queue()
+
+    def _send_job_heartbeats(self):
+        """
+        Let the master know which jobs are still running or queued, so that
+        the clients waiting on them do not have to ask with saltutil.find_job
+        """
+        if not self.connected:
+            return
+        queued = set(entry[-1]["jid"] for entry in self._job_queue)
+        jids = self._running_jids() | queued
+        if not jids:
+            return
+        events = [
+            {
+                "tag": tagify([jid, "heartbeat", self.opts["id"]], "job"),
+                "data": {
+                    "id": self.opts["id"],
+                    "jid": jid,
+                    "heartbeat": self.opts["job_heartbeat_interval"],
+                    "queued": jid in queued,
+                },
+            }
+            for jid in sorted(jids)
+        ]
+        self._fire_master(events=events, sync=False)
+
+    def _write_job_queue(self):
+        """
+        Publish the queued jobs for saltutil.running
+        """
+        queued = []
+        for position, (prio, _, queued_at, data) in enumerate(sorted(self._job_queue)):
+            queued.append(
+                {
+                    "jid": data["jid"],
+                    "fun": data["fun"],
+                    "arg": data.get("arg", []),
+                    "tgt": data.get("tgt"),
+                    "user": data.get("user"),
+                    "priority": prio,
+                    "queued": True,
+                    "queue_position": position,
+                    "queued_since": queued_at,
+                    "pid": None,
+                }
+            )
+        salt.utils.minion.write_job_queue(self.opts, queued)
+
     def ctx(self):
         """
         Return a single context manager for the minion's data
@@ -1885,7 +2230,9 @@ class Minion(MinionBase):
         This method should be used as a threading target, start the actual
         minion side execution.
         """
-        minion_instance.gen_modules()
+        if not getattr(minion_instance, "_job_pool_worker", False):
+            # Job pool workers are restarted when the modules are refreshed
+            minion_instance.gen_modules()
         fn_ = os.path.join(minion_instance.proc_dir, data["jid"])
 
         salt.utils.process.appendproctitle(
@@ -2133,7 +2480,9 @@ class Minion(MinionBase):
         This method should be used as a threading target, start the actual
         minion side execution.
         """
-        minion_instance.gen_modules()
+        if not getattr(minion_instance, "_job_pool_worker", False):
+            # Job pool workers are restarted when the modules are refreshed
+            minion_instance.gen_modules()
         fn_ = os.path.join(minion_instance.proc_dir, data["jid"])
 
         salt.utils.process.appendproctitle(
@@ -2304,6 +2653,10 @@ class Minion(MinionBase):
         if not self.opts["pub_ret"]:
             return ""
 
+        if ret_cmd == "_return" and self._batch_return_eligible(ret):
+            self._queue_return(load)
+            return ""
+
         def timeout_handler(*_):
             log.warning(
                 "The minion failed to return the job information for job %s. "
@@ -2331,6 +2684,124 @@ class Minion(MinionBase):
         log.trace("ret_val = %s", ret_val)  # pylint: disable=no-member
         return ret_val
 
+    def _batch_return_eligible(self, ret):
+        """
+        Return True if the return should be coalesced with others into a
+        single ``_return_batch`` request instead of being sent on its own
+        """
+        if not self.opts.get("return_batch", False):
+            return False
+        if self._return_batch_pid is None:
+            # The batch is not being flushed by this minion
+            return False
+        if ret.get("schedule"):
+            return True
+        fun = ret.get("fun", ret.get("__fun__"))
+        if not isinstance(fun, six.string_types):
+            return False
+        return any(
+            fnmatch.fnmatch(fun, pattern)
+            for pattern in self.opts.get("return_batch_functions", [])
+        )
+
+    def _queue_return(self, load):
+        """
+        Queue a return load until the next flush of the return batch
+        """
+        if self._return_batch_pid != os.getpid():
+            # We are in a job process, hand the return to the minion process
+            # which owns the batch
+            with salt.utils.event.get_event(
+                "minion", opts=self.opts, listen=False
+            ) as event:
+                event.fire_event(load, "__return_batch")
+            return
+        with self._return_batch_lock:
+            self._return_batch.append(load)
+            full = len(self._return_batch) >= self.opts["return_batch_size"]
+        if full:
+            self.io_loop.add_callback(self._flush_return_batch)
+
+    def _flush_return_batch(self):
+        """
+        Send the queued job returns to the master, ``return_batch_size`` at a
+        time
+        """
+        with self._return_batch_lock:
+            loads, self._return_batch = self._return_batch, []
+        if not loads:
+            return
+        batch_size = self.opts["return_batch_size"]
+        for idx in range(0, len(loads), batch_size):
+            load = {
+                "cmd": "_return_batch",
+                "id": self.opts["id"],
+                "load": loads[idx : idx + batch_size],
+            }
+            jids = [ret.get("jid") for ret in load["load"]]
+
+            def timeout_handler(typ, value, tb, jids=jids):
+                log.warning(
+                    "The minion failed to return the job information for "
+                    "jobs %s. This is often due to the master being shut down "
+                    "or overloaded. If the master is running, consider "
+                    "increasing the worker_threads value.",
+                    ", ".join(six.text_type(jid) for jid in jids),
+                )
+                return True
+
+            log.debug("Returning a batch of %s job returns", len(jids))
+            with salt.ext.tornado.stack_context.ExceptionStackContext(timeout_handler):
+                # pylint: disable=unexpected-keyword-arg
+                self._send_req_async(
+                    load, timeout=self._return_retry_timer(), callback=lambda f: None
+                )
+                # pylint: enable=unexpected-keyword-arg
+
+    def setup_return_batch(self):
+        """
+        Set up the periodic flush of batched job returns.
+        This is safe to call multiple times.
+        """
+        if not self.opts.get("return_batch", False):
+            return
+        self._return_batch_pid = os.getpid()
+        self.add_periodic_callback(
+            "return_batch",
+            self._flush_return_batch,
+            self.opts["return_batch_interval"],
+        )
+
+    def setup_job_pool(self):
+        """
+        Start the pool of pre-forked job workers, if configured.
+        This is safe to call multiple times.
+        """
+        if self.job_pool is not None or not self.opts.get("job_pool_size", 0):
+            return
+        if not self.opts.get("multiprocessing", True) or salt.utils.platform.is_windows():
+            log.warning(
+                "job_pool_size is only supported with multiprocessing enabled, "
+                "and not on Windows. Jobs will run in new processes."
+            )
+            return
+        self.job_pool = MinionJobPool(
+            self,
+            self.opts["job_pool_size"],
+            self.opts["job_pool_max_jobs"],
+            io_loop=self.io_loop,
+            on_done=self._job_done,
+        )
+        self.job_pool.start()
+
+    def _restart_job_pool(self):
+        """
+        Restart the job pool workers so that they pick up refreshed modules
+        and pillar
+        """
+        if self.job_pool is not None:
+            self.job_pool.restart()
+
     def _return_pub_multi(self, rets, ret_cmd="_return", timeout=60, sync=True):
         """
         Return the data from the executed command to the master server
@@ -2498,6 +2969,7 @@ class Minion(MinionBase):
 
         self.schedule.functions = self.functions
         self.schedule.returners = self.returners
+        self._restart_job_pool()
 
     def beacons_refresh(self):
         """
@@ -2506,6 +2978,8 @@ class Minion(MinionBase):
         if not self.beacons_leader:
             return
         log.debug("Refreshing beacons.")
+        if getattr(self, "beacons", None) is not None:
+            self.beacons.destroy()
         self.beacons = salt.beacons.Beacon(self.opts, self.functions)
 
     def matchers_refresh(self):
@@ -2682,6 +3156,7 @@ class Minion(MinionBase):
         '''
         channel = salt.transport.client.ReqChannel.factory(self.opts)
         data['tok'] = self.tok
+        ret = None
         try:
             ret = channel.send(data)
             return ret
@@ -2690,6 +3165,7 @@ class Minion(MinionBase):
             return None
         finally:
             channel.close()
+            salt.utils.mine.ack_hashes(self.opts, data, ret)
 
     def _handle_tag_module_refresh(self, tag, data):
         '''
@@ -2921,6 +3397,12 @@ class Minion(MinionBase):
                 )
         self._return_pub(data, ret_cmd='_return', sync=False)
 
+    def _handle_tag_return_batch(self, tag, data):
+        '''
+        Handle a __return_batch event, a return handed over by a job process
+        '''
+        self._queue_return(data)
+
     def _handle_tag_salt_error(self, tag, data):
         '''
         Handle a _salt_error event
@@ -2966,6 +3448,7 @@ class Minion(MinionBase):
                          'salt/auth/creds': self._handle_tag_salt_auth_creds,
                          '_salt_error': self._handle_tag_salt_error,
                          '__schedule_return': self._handle_tag_schedule_return,
+                         '__return_batch': self._handle_tag_return_batch,
                          master_event(type='disconnected'): self._handle_tag_master_disconnected_failback,
                          master_event(type='failback'): self._handle_tag_master_disconnected_failback,
                          master_event(type='connected'): self._handle_tag_master_connected,
@@ -2983,6 +3466,11 @@ class Minion(MinionBase):
         # Add an extra fallback in case a forked process leaks through
         multiprocessing.active_children()
         self.subprocess_list.cleanup()
+        if getattr(self, "job_pool", None) is not None:
+            self.job_pool.reap()
+        if getattr(self, "_job_queue", None):
+            # Catch the jobs whose end was not reported
+            self._dispatch_queued_jobs()
         if self.schedule:
             self.schedule.cleanup_subprocesses()
 
@@ -3145,7 +3633,16 @@ class Minion(MinionBase):
 
         self.setup_beacons()
         self.setup_scheduler()
+        self.setup_return_batch()
+        self.setup_job_pool()
+        # Clear the queue left behind by a previous run
+        self._write_job_queue()
         self.add_periodic_callback("cleanup", self.cleanup_subprocesses)
+        job_heartbeat_interval = self.opts.get("job_heartbeat_interval", 0)
+        if job_heartbeat_interval > 0:
+            self.add_periodic_callback(
+                "job_heartbeat", self._send_job_heartbeats, job_heartbeat_interval
+            )
 
         # schedule the stuff that runs every interval
         ping_interval = self.opts.get("ping_interval", 0) * 60
@@ -3261,6 +3758,9 @@ class Minion(MinionBase):
             return
 
         self._running = False
+        if getattr(self, "job_pool", None) is not None:
+            self.job_pool.stop()
+            self.job_pool = None
         if hasattr(self, "schedule"):
             del self.schedule
         if hasattr(self, "pub_channel") and self.pub_channel is not None:
@@ -29,6 +29,7 @@ __func_alias__ = {"list_": "list", "reload_": "reload"}
 def list_(return_yaml=True,
           include_pillar=True,
           include_opts=True,
+          include_stats=False,
           **kwargs):
     '''
     List the beacons currently configured on the minion.
@@ -46,6 +47,12 @@ def list_(return_yaml=True,
             Whether to include beacons that are configured in opts, default is
             ``True``.
 
+        include_stats (bool):
+            Whether to include how many times each beacon ran, when it last
+            ran and how long that took, default is ``False``.
+
+            .. versionadded:: Magnesium
+
     Returns:
         list: List of currently configured Beacons.
 
@@ -54,9 +61,11 @@ def list_(return_yaml=True,
     .. code-block:: bash
 
         salt '*' beacons.list
+        salt '*' beacons.list include_stats=True
 
     """
     beacons = None
+    stats = {}
 
     try:
         with salt.utils.event.get_event('minion', opts=__opts__, listen=True) as event_bus:
@@ -72,6 +81,7 @@ def list_(return_yaml=True,
                 log.debug('event_ret %s', event_ret)
                 if event_ret and event_ret['complete']:
                     beacons = event_ret['beacons']
+                    stats = event_ret.get('stats', {})
     except KeyError:
         # Effectively a no-op, since we can't really return without an event
         # system
@@ -80,11 +90,14 @@ def list_(return_yaml=True,
         return ret
 
     if beacons:
-        if return_yaml:
+        if include_stats:
+            tmp = {"beacons": beacons, "stats": stats}
+        else:
             tmp = {"beacons": beacons}
+        if return_yaml:
             return salt.utils.yaml.safe_dump(tmp, default_flow_style=False)
         else:
-            return beacons
+            return tmp if include_stats else beacons
     else:
         return {"beacons": {}}
 
@@ -88,9 +88,10 @@ def __virtual__():
     return True
 
 
-def _get_instance(hosts=None, profile=None):
+def _get_instance(hosts=None, profile=None, reuse=True):
     """
-    Return the elasticsearch instance
+    Return the elasticsearch instance. An instance for the same settings is
+    kept in the context and reused unless ``reuse`` is False.
     """
     es = None
     proxies = None
@@ -126,6 +127,12 @@ def _get_instance(hosts=None, profile=None):
         hosts = ["127.0.0.1:9200"]
     if isinstance(hosts, six.string_types):
         hosts = [hosts]
+    key = repr(
+        (hosts, proxies, use_ssl, ca_certs, verify_certs, http_auth, timeout)
+    )
+    instances = __context__.setdefault("elasticsearch.instances", {})
+    if reuse and key in instances:
+        return instances[key]
     try:
         if proxies:
             # Custom connection class to use requests module with proxies
@@ -163,6 +170,7 @@ def _get_instance(hosts=None, profile=None):
                 hosts, err
             )
         )
+    instances[key] = es
     return es
 
 
@@ -181,7 +189,7 @@ def ping(allow_failure=False, hosts=None, profile=None):
         salt myminion elasticsearch.ping profile=elasticsearch-extra
     """
     try:
-        _get_instance(hosts, profile)
+        _get_instance(hosts, profile, reuse=False)
     except CommandExecutionError as e:
         if allow_failure:
             six.reraise(*sys.exc_info())
@@ -521,6 +529,38 @@ def document_create(
         )
 
 
+def document_bulk(body, index=None, doc_type=None, hosts=None, profile=None):
+    """
+    .. versionadded:: Magnesium
+
+    Send several index, create, update or delete actions in one request to the
+    ``_bulk`` endpoint. The result holds the outcome of each action under
+    ``items``, in the order of the actions.
+
+    body
+        The actions, as newline delimited JSON action and document lines
+    index
+        Default index for the actions not naming one
+    doc_type
+        Default type for the actions not naming one
+
+    CLI example::
+
+        salt myminion elasticsearch.document_bulk '{"index": {"_index": "testindex", "_type": "doctype1"}}
+        {"key": "value"}
+        '
+    """
+    es = _get_instance(hosts, profile)
+    try:
+        return es.bulk(body=body, index=index, doc_type=doc_type)
+    except elasticsearch.TransportError as e:
+        raise CommandExecutionError(
+            "Cannot send bulk request, server returned code {0} with message {1}".format(
+                e.status_code, e.error
+            )
+        )
+
+
 def document_delete(index, doc_type, id, hosts=None, profile=None):
     """
     Delete a document from an index
@@ -21,6 +21,7 @@ import os
 import random
 from functools import reduce  # pylint: disable=redefined-builtin
 
+import salt.loader
 import salt.utils.compat
 import salt.utils.data
 import salt.utils.files
@@ -475,6 +476,33 @@ def ls():  # pylint: disable=C0103
     return sorted(__grains__)
 
 
+def timings():
+    """
+    .. versionadded:: Magnesium
+
+    Return the number of seconds each grains function took the last time the
+    grains were loaded, slowest first. With
+    :conf_minion:`grains_refresh_incremental` enabled, reused results report
+    the time taken when they were computed.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' grains.timings
+    """
+    durations = dict(salt.loader.GRAINS_TIMINGS)
+    if __opts__.get("grains_refresh_incremental", False):
+        cfn = os.path.join(__opts__["cachedir"], "grains.funcs.p")
+        funcs_cache = salt.loader._load_grains_funcs_cache(__opts__, cfn)
+        durations.update(
+            (key, entry["duration"]) for key, entry in six.iteritems(funcs_cache)
+        )
+    return collections.OrderedDict(
+        sorted(six.iteritems(durations), key=operator.itemgetter(1), reverse=True)
+    )
+
+
 def filter_by(lookup_dict, grain="os_family", merge=None, default="default", base=None):
     """
     .. versionadded:: 0.17.0
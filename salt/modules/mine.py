@@ -6,6 +6,7 @@ The function cache system allows for data to be stored on the master so it can b
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
 
+import copy
 import logging
 import time
 import traceback
@@ -88,7 +89,44 @@ def _mine_get(load, opts):
         return channel.send(load)
 
 
-def _mine_store(mine_data, clear=False):
+def _mine_merge(cached, reply, known, multi):
+    """
+    Helper function to merge a versioned ``_mine_get`` reply into the
+    result of a previous identical request.
+
+    :param dict cached: The result of the previous request.
+    :param dict reply: The reply of the master, holding the versions of all
+        targeted minions and the data of the minions which changed.
+    :param dict known: The versions sent along with the request.
+    :param bool multi: Whether the result is keyed by function first.
+
+    :rtype: dict
+    :return: The complete result of the request.
+    """
+    unchanged = set(
+        minion
+        for minion, version in six.iteritems(reply["mine_versions"])
+        if known.get(minion) == version
+    )
+    if multi:
+        ret = {}
+        for fun, entries in six.iteritems(cached):
+            for minion, value in six.iteritems(entries):
+                if minion in unchanged:
+                    ret.setdefault(fun, {})[minion] = value
+        for fun, entries in six.iteritems(reply["mine_data"]):
+            ret.setdefault(fun, {}).update(entries)
+    else:
+        ret = dict(
+            (minion, value)
+            for minion, value in six.iteritems(cached)
+            if minion in unchanged
+        )
+        ret.update(reply["mine_data"])
+    return ret
+
+
+def _mine_store(mine_data, clear=False, hashes=None):
     """
     Helper function to store the provided mine data.
     This will store either locally in the cache (for masterless setups), or in
@@ -97,6 +135,10 @@ def _mine_store(mine_data, clear=False):
     :param dict mine_data: Dictionary with function_name: function_data to store.
     :param bool clear: Whether or not to clear (`True`) the mine data for the
         function names present in ``mine_data``, or update it (`False`).
+    :param dict hashes: Dictionary with function_name: hash of all functions
+        of the update, including those left out of ``mine_data`` because the
+        master already holds them. The master replies with the hashes of the
+        entries it holds.
     """
     # Store in the salt-minion's local cache
     if __opts__["file_client"] == "local":
@@ -113,6 +155,8 @@ def _mine_store(mine_data, clear=False):
         "id": __opts__["id"],
         "clear": clear,
     }
+    if hashes is not None:
+        load["mine_hashes"] = hashes
     return _mine_send(load, __opts__)
 
 
@@ -163,6 +207,11 @@ def update(clear=False, mine_functions=None):
     The function cache will be populated with information from executing these
     functions
 
+    .. versionchanged:: Magnesium
+
+        Only the functions whose result changed since the master last
+        acknowledged storing it are sent to the master.
+
     CLI Example:
 
     .. code-block:: bash
@@ -211,7 +260,22 @@ def update(clear=False, mine_functions=None):
             )
         else:
             mine_data[function_alias] = res
-    return _mine_store(mine_data, clear)
+    if __opts__["file_client"] == "local":
+        return _mine_store(mine_data, clear)
+    # Only send the entries whose value changed since the master last
+    # acknowledged them, along with the hashes of all entries.
+    hashes = dict(
+        (fun, salt.utils.mine.data_hash(value))
+        for fun, value in six.iteritems(mine_data)
+    )
+    if not clear:
+        acked = salt.utils.mine.read_hashes(__opts__)
+        mine_data = dict(
+            (fun, value)
+            for fun, value in six.iteritems(mine_data)
+            if acked.get(fun) != hashes[fun]
+        )
+    return _mine_store(mine_data, clear, hashes=hashes)
 
 
 def send(name, *args, **kwargs):
@@ -360,7 +424,23 @@ def get(tgt, fun, tgt_type="glob", exclude_minion=False):
         "fun": fun,
         "tgt_type": tgt_type,
     }
+    # Send the versions of the entries received for the same request before,
+    # the master then only sends back the entries which changed. The last
+    # result is kept in the cachedir, as each job runs in its own process.
+    cache_key = repr((tgt, fun, tgt_type))
+    if cache_key in __context__.setdefault("mine.get", {}):
+        known, cached = __context__["mine.get"][cache_key]
+    else:
+        known, cached = salt.utils.mine.read_get_cache(__opts__, cache_key)
+    load["mine_known"] = known
     ret = _mine_get(load, __opts__)
+    if isinstance(ret, dict) and "mine_versions" in ret:
+        multi = isinstance(fun, list) or len(set(fun.split(","))) > 1
+        versions = ret["mine_versions"]
+        ret = _mine_merge(cached, ret, known, multi)
+        __context__["mine.get"][cache_key] = (versions, ret)
+        salt.utils.mine.write_get_cache(__opts__, cache_key, versions, ret)
+        ret = copy.deepcopy(ret)
     if exclude_minion and __opts__["id"] in ret:
         del ret[__opts__["id"]]
     return ret
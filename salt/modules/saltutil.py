@@ -1215,13 +1215,17 @@ def running():
     """
     Return the data on all running salt processes on the minion
 
+    Jobs which the minion queued because :conf_minion:`process_count_max` was
+    reached are returned as well, with ``queued`` set to ``True`` and their
+    ``queue_position``.
+
     CLI Example:
 
     .. code-block:: bash
 
         salt '*' saltutil.running
     """
-    return salt.utils.minion.running(__opts__)
+    return salt.utils.minion.running(__opts__) + salt.utils.minion.queued(__opts__)
 
 
 def clear_cache(days=-1):
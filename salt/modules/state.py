@@ -2212,12 +2212,46 @@ def clear_cache():
     return ret
 
 
-def pkg(pkg_path, pkg_sum, hash_type, test=None, **kwargs):
+def _extract_pkg(pkg_path, root):
+    """
+    Extract a state package tarball into root, refusing tarballs with members
+    outside of it
+    """
+    s_pkg = tarfile.open(pkg_path, "r:gz")
+    # Verify that the tarball does not extract outside of the intended root
+    members = s_pkg.getmembers()
+    for member in members:
+        if salt.utils.stringutils.to_unicode(member.path).startswith(
+            (os.sep, "..{0}".format(os.sep))
+        ):
+            return False
+        elif "..{0}".format(os.sep) in salt.utils.stringutils.to_unicode(member.path):
+            return False
+    s_pkg.extractall(root)
+    s_pkg.close()
+    return True
+
+
+def pkg(
+    pkg_path, pkg_sum, hash_type, test=None, bundle_path=None, bundle_sum=None, **kwargs
+):
     """
     Execute a packaged state run, the packaged state run will exist in a
     tarball available locally. This packaged state
     can be generated using salt-ssh.
 
+    bundle_path
+        .. versionadded:: Magnesium
+
+        A tarball with the files of the state run, extracted before the
+        package. salt-ssh sends it apart from the package when
+        :conf_master:`ssh_state_bundles` is enabled.
+
+    bundle_sum
+        .. versionadded:: Magnesium
+
+        The checksum of ``bundle_path``
+
     CLI Example:
 
     .. code-block:: bash
@@ -2230,19 +2264,16 @@ def pkg(pkg_path, pkg_sum, hash_type, test=None, **kwargs):
         return {}
     if not salt.utils.hashutils.get_hash(pkg_path, hash_type) == pkg_sum:
         return {}
-    root = tempfile.mkdtemp()
-    s_pkg = tarfile.open(pkg_path, "r:gz")
-    # Verify that the tarball does not extract outside of the intended root
-    members = s_pkg.getmembers()
-    for member in members:
-        if salt.utils.stringutils.to_unicode(member.path).startswith(
-            (os.sep, "..{0}".format(os.sep))
-        ):
+    if bundle_path is not None:
+        if not os.path.isfile(bundle_path):
             return {}
-        elif "..{0}".format(os.sep) in salt.utils.stringutils.to_unicode(member.path):
+        if not salt.utils.hashutils.get_hash(bundle_path, hash_type) == bundle_sum:
             return {}
-    s_pkg.extractall(root)
-    s_pkg.close()
+    root = tempfile.mkdtemp()
+    if bundle_path is not None and not _extract_pkg(bundle_path, root):
+        return {}
+    if not _extract_pkg(pkg_path, root):
+        return {}
     lowstate_json = os.path.join(root, "lowstate.json")
     with salt.utils.files.fopen(lowstate_json, "r") as fp_:
         lowstate = salt.utils.json.load(fp_)
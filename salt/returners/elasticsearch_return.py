@@ -62,6 +62,25 @@ Minion configuration:
     number_of_replicas: 0
         Number of replicas to use for the indexes
 
+    bulk: False
+        .. versionadded:: Magnesium
+
+        On the master, collect the job returns and send them together through
+        the ``_bulk`` endpoint. Master events are always sent with one bulk
+        request per batch handed over by the event returner, which retries or
+        spills the batch when Elasticsearch fails to index it.
+
+    bulk_size: 500
+        Send the collected documents once there are this many
+
+    bulk_interval: 5
+        Send the collected documents at the latest this many seconds after the
+        first of them was collected
+
+    bulk_retries: 3
+        Number of times a document the server failed to index, because it was
+        overloaded or had an error, is sent again with a later batch
+
     NOTE: The following options are valid for 'state.apply', 'state.sls' and 'state.highstate' functions only.
 
     states_count: False
@@ -99,13 +118,19 @@ from __future__ import absolute_import, print_function, unicode_literals
 
 import datetime
 import logging
+import multiprocessing.util
+import os
+import threading
+import time
 import uuid
 from datetime import timedelta, tzinfo
 
 # Import Salt libs
 import salt.returners
+from salt.exceptions import CommandExecutionError
 import salt.utils.jid
 import salt.utils.json
+import salt.utils.stringutils
 
 # Import 3rd-party libs
 from salt.ext import six
@@ -120,6 +145,10 @@ STATE_FUNCTIONS = {
     "state.sls": "state_apply",
 }
 
+# The documents waiting for a bulk request, shared by the threads of the process
+_BULK = {"actions": [], "first": None, "timer": None, "options": None, "pid": None}
+_BULK_LOCK = threading.Lock()
+
 
 def __virtual__():
     return __virtualname__
@@ -144,6 +173,10 @@ def _get_options(ret=None):
         "states_order_output": False,
         "states_count": False,
         "states_single_index": False,
+        "bulk": False,
+        "bulk_size": 500,
+        "bulk_interval": 5,
+        "bulk_retries": 3,
     }
 
     attrs = {
@@ -160,6 +193,10 @@ def _get_options(ret=None):
         "states_count": "states_count",
         "states_order_output": "states_order_output",
         "states_single_index": "states_single_index",
+        "bulk": "bulk",
+        "bulk_size": "bulk_size",
+        "bulk_interval": "bulk_interval",
+        "bulk_retries": "bulk_retries",
     }
 
     _options = salt.returners.get_returner_options(
@@ -174,7 +211,12 @@ def _get_options(ret=None):
 
 
 def _ensure_index(index):
+    # Only ask the server once per process for each index
+    known = __context__.setdefault("elasticsearch_return.indexes", set())
+    if index in known:
+        return
     index_exists = __salt__["elasticsearch.index_exists"](index)
+    known.add(index)
     if not index_exists:
         options = _get_options()
 
@@ -188,6 +230,129 @@ def _ensure_index(index):
         __salt__["elasticsearch.alias_create"]("{0}-v1".format(index), index)
 
 
+def _bulk_action(index, doc_type, data, id_=None):
+    """
+    Return a bulk index action for the document
+    """
+    meta = {"_index": index, "_type": doc_type}
+    if id_ is not None:
+        meta["_id"] = id_
+    return {"meta": meta, "doc": data, "tries": 0}
+
+
+def _send_bulk(actions, retries):
+    """
+    Send the actions with one bulk request, and return the actions failing
+    because the server was overloaded or had an error, to be sent again
+    """
+    body = "".join(
+        "{0}\n{1}\n".format(
+            salt.utils.json.dumps({"index": action["meta"]}),
+            salt.utils.json.dumps(action["doc"]),
+        )
+        for action in actions
+    )
+    try:
+        result = __salt__["elasticsearch.document_bulk"](body=body)
+    except CommandExecutionError as exc:
+        log.error("Failed to send %d documents to Elasticsearch: %s", len(actions), exc)
+        failed = list(actions)
+    else:
+        if not result.get("errors"):
+            return []
+        failed = []
+        for action, item in zip(actions, result.get("items", [])):
+            status = next(six.itervalues(item), {}).get("status", 500)
+            if status == 429 or status >= 500:
+                failed.append(action)
+            elif status >= 300:
+                log.error(
+                    "Elasticsearch refused a document for index %s: %s",
+                    action["meta"]["_index"],
+                    next(six.itervalues(item), {}).get("error"),
+                )
+
+    retry = []
+    for action in failed:
+        action["tries"] += 1
+        if action["tries"] > retries:
+            log.error(
+                "Dropping a document for index %s after %d tries",
+                action["meta"]["_index"],
+                action["tries"],
+            )
+        else:
+            retry.append(action)
+    return retry
+
+
+def _start_bulk_timer():
+    """
+    Flush the collected documents once the interval is over. Call with the
+    lock held.
+    """
+    if _BULK["timer"] is None:
+        _BULK["timer"] = threading.Timer(
+            float(_BULK["options"]["bulk_interval"]), _flush_bulk
+        )
+        _BULK["timer"].daemon = True
+        _BULK["timer"].start()
+
+
+def _queue_bulk(actions, options):
+    """
+    Collect the actions, and send the collected actions once there are enough
+    of them or the first of them waited long enough
+    """
+    with _BULK_LOCK:
+        if _BULK["pid"] != os.getpid():
+            # The documents and the timer of a parent process are not ours.
+            # The master processes exit through os._exit(), which skips the
+            # atexit hooks but still runs the multiprocessing finalizers.
+            _BULK.update(actions=[], first=None, timer=None, pid=os.getpid())
+            multiprocessing.util.Finalize(None, _flush_bulk, exitpriority=10)
+        _BULK["options"] = options
+        _BULK["actions"].extend(actions)
+        if _BULK["first"] is None:
+            _BULK["first"] = time.time()
+        due = len(_BULK["actions"]) >= int(options["bulk_size"]) or (
+            time.time() - _BULK["first"] >= float(options["bulk_interval"])
+        )
+        if not due:
+            _start_bulk_timer()
+    if due:
+        _flush_bulk()
+
+
+def _flush_bulk():
+    """
+    Send the collected actions, keeping the ones to send again
+    """
+    with _BULK_LOCK:
+        actions = _BULK["actions"]
+        options = _BULK["options"]
+        _BULK["actions"] = []
+        _BULK["first"] = None
+        if _BULK["timer"] is not None:
+            _BULK["timer"].cancel()
+            _BULK["timer"] = None
+    if not actions:
+        return
+
+    size = max(int(options["bulk_size"]), 1)
+    retry = []
+    for start in range(0, len(actions), size):
+        retry.extend(
+            _send_bulk(actions[start : start + size], int(options["bulk_retries"]))
+        )
+    if retry:
+        with _BULK_LOCK:
+            _BULK["actions"][:0] = retry
+            if _BULK["first"] is None:
+                _BULK["first"] = time.time()
+            _start_bulk_timer()
+
+
 def _convert_keys(data):
     if isinstance(data, dict):
         new_data = {}
@@ -327,7 +492,10 @@ def returner(ret):
     if options["debug_returner_payload"]:
         log.debug("elasicsearch payload: %s", data)
 
-    # Post the payload
+    # Post the payload, the master collects them for a bulk request
+    if options["bulk"] and __opts__.get("__role") == "master":
+        _queue_bulk([_bulk_action(index, options["doc_type"], data)], options)
+        return
     ret = __salt__["elasticsearch.document_create"](
         index=index, doc_type=options["doc_type"], body=salt.utils.json.dumps(data)
     )
@@ -349,15 +517,28 @@ def event_return(events):
 
     _ensure_index(index)
 
+    actions = []
     for event in events:
-        data = {"tag": event.get("tag", ""), "data": event.get("data", "")}
-
-    ret = __salt__["elasticsearch.document_create"](
-        index=index,
-        doc_type=doc_type,
-        id=uuid.uuid4(),
-        body=salt.utils.json.dumps(data),
-    )
+        doc = {"tag": event.get("tag", ""), "data": event.get("data", "")}
+        # The id is derived from the event, so sending a batch again does not
+        # index its events twice
+        id_ = uuid.uuid5(
+            uuid.NAMESPACE_URL,
+            salt.utils.stringutils.to_str(
+                salt.utils.json.dumps(doc, sort_keys=True, default=six.text_type)
+            ),
+        )
+        actions.append(_bulk_action(index, doc_type, doc, six.text_type(id_)))
+    if not actions:
+        return
+    # Sent right away, the event returner retries or spills the failed batches
+    failed = _send_bulk(actions, 1)
+    if failed:
+        raise CommandExecutionError(
+            "Elasticsearch failed to index {0} of {1} events".format(
+                len(failed), len(actions)
+            )
+        )
 
 
 def prep_jid(nocache=False, passed_jid=None):  # pylint: disable=unused-argument
@@ -6,6 +6,7 @@ Return data to local job cache
 from __future__ import absolute_import, print_function, unicode_literals
 
 import bisect
+import calendar
 
 # Import python libs
 import errno
@@ -22,6 +23,7 @@ import salt.payload
 import salt.utils.atomicfile
 import salt.utils.files
 import salt.utils.jid
+import salt.utils.json
 import salt.utils.minions
 import salt.utils.msgpack
 import salt.utils.stringutils
@@ -46,6 +48,8 @@ RETURN_P = "return.p"
 OUT_P = "out.p"
 # endtime is the end time for a job, not stored as msgpack
 ENDTIME = "endtime"
+# marks the job index as holding the jobs cached before it was kept
+INDEX_COMPLETE = ".complete"
 
 
 def _job_dir():
@@ -55,15 +59,204 @@ def _job_dir():
     return os.path.join(__opts__["cachedir"], "jobs")
 
 
-def _walk_through(job_dir):
+def _jid_bucket(jid):
     """
-    Walk though the jid dir and look for jobs
+    Return the hour bucket the jid belongs to, taken from the time in the jid
     """
-    serial = salt.payload.Serial(__opts__)
+    jid = six.text_type(jid)
+    if len(jid) >= 10 and jid[:10].isdigit():
+        return jid[:10]
+    return "other"
 
+
+def _is_bucket(name):
+    """
+    Return True if the name is that of an hour bucket of the job cache, and not
+    the first part of a jid hash
+    """
+    return name == "other" or (len(name) == 10 and name.isdigit())
+
+
+def _bucket_expired(bucket):
+    """
+    Return True if the jobs of the hour bucket are all older than keep_jobs
+    """
+    try:
+        start = time.strptime(bucket, "%Y%m%d%H")
+    except ValueError:
+        return False
+    if __opts__.get("utc_jid", False):
+        start = calendar.timegm(start)
+    else:
+        start = time.mktime(start)
+    return (time.time() - start - 3600) / 3600.0 > __opts__["keep_jobs"]
+
+
+def _jid_dir(jid):
+    """
+    Return the directory of the jid in the job cache. With
+    job_cache_hour_buckets the jid directories are kept in the hour bucket of
+    the jid, jobs cached before that are still found in their old place.
+    """
+    hashed = salt.utils.jid.jid_dir(jid, _job_dir(), __opts__["hash_type"])
+    if not __opts__.get("job_cache_hour_buckets", False):
+        return hashed
+    bucketed = salt.utils.jid.jid_dir(
+        jid, os.path.join(_job_dir(), _jid_bucket(jid)), __opts__["hash_type"]
+    )
+    if not os.path.isdir(bucketed) and os.path.isdir(hashed):
+        return hashed
+    return bucketed
+
+
+def _index_dir():
+    """
+    Return the directory of the job index. The index holds one file of job
+    summaries per hour the jobs were started in.
+    """
+    return os.path.join(__opts__["cachedir"], "job_index")
+
+
+def _index_entry(jid, load, minions=None):
+    """
+    Return the job summary kept in the job index
+    """
+    entry = salt.utils.jid.format_job_instance(load)
+    entry.pop("Arguments", None)
+    entry["JID"] = jid
+    entry["MinionCount"] = len(minions) if minions is not None else None
+    return entry
+
+
+def _append_index(entries):
+    """
+    Append the job summaries to the job index
+    """
+    buckets = {}
+    for entry in entries:
+        buckets.setdefault(_jid_bucket(entry["JID"]), []).append(
+            salt.utils.json.dumps(entry) + "\n"
+        )
+    index_dir = _index_dir()
+    try:
+        if not os.path.isdir(index_dir):
+            os.makedirs(index_dir)
+    except OSError as exc:
+        if exc.errno != errno.EEXIST:
+            log.warning("Could not create the job index: %s", exc)
+            return
+    for bucket, lines in six.iteritems(buckets):
+        # A single appending write, so the lines of concurrent writers do not
+        # interleave
+        try:
+            fd_ = os.open(
+                os.path.join(index_dir, bucket),
+                os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                0o600,
+            )
+            try:
+                os.write(fd_, salt.utils.stringutils.to_bytes("".join(lines)))
+            finally:
+                os.close(fd_)
+        except OSError as exc:
+            log.warning("Could not write to the job index: %s", exc)
+
+
+def _build_index():
+    """
+    Add the jobs already in the job cache to the job index
+    """
+    entries = []
+    if os.path.isdir(_job_dir()):
+        for jid, job, _, _ in _walk_through(_job_dir()):
+            entries.append(_index_entry(jid, job, get_load(jid).get("Minions")))
+    _append_index(entries)
+    complete = os.path.join(_index_dir(), INDEX_COMPLETE)
+    try:
+        with salt.utils.files.fopen(complete, "w"):
+            pass
+    except (IOError, OSError) as exc:
+        log.warning("Could not write to the job index: %s", exc)
+
+
+def _clean_index():
+    """
+    Remove the hour buckets of the job index older than keep_jobs
+    """
+    index_dir = _index_dir()
+    if not os.path.isdir(index_dir):
+        return
+    for bucket in os.listdir(index_dir):
+        if _bucket_expired(bucket):
+            try:
+                os.remove(os.path.join(index_dir, bucket))
+            except OSError as err:
+                log.error("Unable to remove %s: %s", bucket, err)
+
+
+def get_jids_index():
+    """
+    .. versionadded:: Magnesium
+
+    Return a dict mapping the job ids to the job summaries of the job index:
+    the function, target, user, metadata, start time and number of targeted
+    minions of each job, without reading the job cache itself
+    """
+    index_dir = _index_dir()
+    if not os.path.isfile(os.path.join(index_dir, INDEX_COMPLETE)):
+        _build_index()
+    ret = {}
+    if not os.path.isdir(index_dir):
+        return ret
+    for bucket in sorted(os.listdir(index_dir)):
+        if bucket.startswith("."):
+            continue
+        bucket_path = os.path.join(index_dir, bucket)
+        try:
+            with salt.utils.files.fopen(bucket_path, "r") as fh_:
+                for line in fh_:
+                    try:
+                        entry = salt.utils.json.loads(line)
+                    except ValueError:
+                        # A line being written
+                        continue
+                    jid = entry.pop("JID")
+                    entry["StartTime"] = salt.utils.jid.jid_to_time(jid)
+                    ret[jid] = entry
+        except (IOError, OSError) as exc:
+            # The bucket may just have been cleaned
+            salt.utils.files.process_read_exception(
+                exc, bucket_path, ignore=errno.ENOENT
+            )
+    return ret
+
+
+def _hash_dirs(job_dir):
+    """
+    Return the directories named after the first part of the jid hashes, both
+    in the job dir and in its hour buckets
+    """
+    ret = []
     for top in os.listdir(job_dir):
         t_path = os.path.join(job_dir, top)
+        if _is_bucket(top):
+            try:
+                ret.extend(os.path.join(t_path, sub) for sub in os.listdir(t_path))
+            except OSError:
+                # The bucket was just cleaned
+                continue
+        else:
+            ret.append(t_path)
+    return ret
+
 
+def _walk_through(job_dir):
+    """
+    Walk though the jid dir and look for jobs
+    """
+    serial = salt.payload.Serial(__opts__)
+
+    for t_path in _hash_dirs(job_dir):
         if not os.path.exists(t_path):
             continue
 
@@ -107,7 +300,7 @@ def prep_jid(nocache=False, passed_jid=None, recurse_count=0):
     else:
         jid = passed_jid
 
-    jid_dir = salt.utils.jid.jid_dir(jid, _job_dir(), __opts__["hash_type"])
+    jid_dir = _jid_dir(jid)
 
     # Make sure we create the jid dir, otherwise someone else is using it,
     # meaning we need a new jid.
@@ -145,7 +338,7 @@ def returner(load):
     if load["jid"] == "req":
         load["jid"] = prep_jid(nocache=load.get("nocache", False))
 
-    jid_dir = salt.utils.jid.jid_dir(load["jid"], _job_dir(), __opts__["hash_type"])
+    jid_dir = _jid_dir(load["jid"])
     if os.path.exists(os.path.join(jid_dir, "nocache")):
         return
 
@@ -204,7 +397,7 @@ def save_load(jid, clear_load, minions=None, recurse_count=0):
         log.error(err)
         raise salt.exceptions.SaltCacheError(err)
 
-    jid_dir = salt.utils.jid.jid_dir(jid, _job_dir(), __opts__["hash_type"])
+    jid_dir = _jid_dir(jid)
 
     serial = salt.payload.Serial(__opts__)
 
@@ -241,6 +434,9 @@ def save_load(jid, clear_load, minions=None, recurse_count=0):
         # save the minions to a cache so we can see in the UI
         save_minions(jid, minions)
 
+    if __opts__.get("job_cache_index", True):
+        _append_index([_index_entry(jid, clear_load, minions)])
+
 
 def save_minions(jid, minions, syndic_id=None):
     """
@@ -257,7 +453,7 @@ def save_minions(jid, minions, syndic_id=None):
     )
     serial = salt.payload.Serial(__opts__)
 
-    jid_dir = salt.utils.jid.jid_dir(jid, _job_dir(), __opts__["hash_type"])
+    jid_dir = _jid_dir(jid)
 
     try:
         if not os.path.exists(jid_dir):
@@ -296,7 +492,7 @@ def get_load(jid):
     """
     Return the load data that marks a specified jid
     """
-    jid_dir = salt.utils.jid.jid_dir(jid, _job_dir(), __opts__["hash_type"])
+    jid_dir = _jid_dir(jid)
     load_fn = os.path.join(jid_dir, LOAD_P)
     if not os.path.exists(jid_dir) or not os.path.exists(load_fn):
         return {}
@@ -338,7 +534,7 @@ def get_jid(jid):
     """
     Return the information returned when the specified job id was executed
     """
-    jid_dir = salt.utils.jid.jid_dir(jid, _job_dir(), __opts__["hash_type"])
+    jid_dir = _jid_dir(jid)
     serial = salt.payload.Serial(__opts__)
 
     ret = {}
@@ -416,6 +612,8 @@ def clean_old_jobs():
     Clean out the old jobs from the job cache
     """
     if __opts__["keep_jobs"] != 0:
+        _clean_index()
+
         jid_root = _job_dir()
 
         if not os.path.exists(jid_root):
@@ -424,9 +622,22 @@ def clean_old_jobs():
         # Keep track of any empty t_path dirs that need to be removed later
         dirs_to_remove = set()
 
+        # Expired hour buckets are removed whole, the jobs of the others are
+        # all new enough to be kept
+        t_paths = []
         for top in os.listdir(jid_root):
             t_path = os.path.join(jid_root, top)
+            if not _is_bucket(top):
+                t_paths.append(t_path)
+            elif _bucket_expired(top):
+                try:
+                    shutil.rmtree(t_path)
+                except OSError as err:
+                    log.error("Unable to remove %s: %s", t_path, err)
+            elif top == "other":
+                t_paths.extend(_hash_dirs(t_path))
 
+        for t_path in t_paths:
             if not os.path.exists(t_path):
                 continue
 
@@ -475,7 +686,7 @@ def update_endtime(jid, time):
 
     Endtime is stored as a plain text string
     """
-    jid_dir = salt.utils.jid.jid_dir(jid, _job_dir(), __opts__["hash_type"])
+    jid_dir = _jid_dir(jid)
     try:
         if not os.path.exists(jid_dir):
             os.makedirs(jid_dir)
@@ -491,7 +702,7 @@ def get_endtime(jid):
 
     Returns False if no endtime is present
     """
-    jid_dir = salt.utils.jid.jid_dir(jid, _job_dir(), __opts__["hash_type"])
+    jid_dir = _jid_dir(jid)
     etpath = os.path.join(jid_dir, ENDTIME)
     if not os.path.exists(etpath):
         return False
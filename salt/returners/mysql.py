@@ -341,13 +341,21 @@ def event_return(events):
     Requires that configuration be enabled via 'event_return'
     option in master config.
     """
+    if not events:
+        return
+    rows = [
+        (
+            event.get("tag", ""),
+            salt.utils.json.dumps(event.get("data", "")),
+            __opts__["id"],
+        )
+        for event in events
+    ]
     with _get_serv(events, commit=True) as cur:
-        for event in events:
-            tag = event.get("tag", "")
-            data = event.get("data", "")
-            sql = """INSERT INTO `salt_events` (`tag`, `data`, `master_id`)
-                     VALUES (%s, %s, %s)"""
-            cur.execute(sql, (tag, salt.utils.json.dumps(data), __opts__["id"]))
+        # executemany sends the rows as one multi-row INSERT
+        sql = """INSERT INTO `salt_events` (`tag`, `data`, `master_id`)
+                 VALUES (%s, %s, %s)"""
+        cur.executemany(sql, rows)
 
 
 def save_load(jid, load, minions=None):
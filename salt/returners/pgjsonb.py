@@ -245,26 +245,36 @@ def _get_options(ret=None):
     return _options
 
 
-@contextmanager
-def _get_serv(ret=None, commit=False):
+def _get_conn(options):
     """
-    Return a Pg cursor
+    Return a connection to the Pg server. The connections are kept in the
+    context of the process and reused for the same connection options.
     """
-    _options = _get_options(ret)
+    key = tuple(sorted((k, six.text_type(v)) for k, v in six.iteritems(options)))
+    conns = {}
+    try:
+        conns = __context__.setdefault("pgjsonb_returner_conn", {})
+    except (AttributeError, TypeError, NameError):
+        pass
+    conn = conns.get(key)
+    if conn is not None and not conn.closed:
+        log.debug("Reusing pgjsonb returner connection")
+        return conn
+
     try:
         # An empty ssl_options dictionary passed to MySQLdb.connect will
         # effectively connect w/o SSL.
         ssl_options = {
             k: v
-            for k, v in six.iteritems(_options)
+            for k, v in six.iteritems(options)
             if k in ["sslmode", "sslcert", "sslkey", "sslrootcert", "sslcrl"]
         }
         conn = psycopg2.connect(
-            host=_options.get("host"),
-            port=_options.get("port"),
-            dbname=_options.get("db"),
-            user=_options.get("user"),
-            password=_options.get("pass"),
+            host=options.get("host"),
+            port=options.get("port"),
+            dbname=options.get("db"),
+            user=options.get("user"),
+            password=options.get("pass"),
             **ssl_options
         )
     except psycopg2.OperationalError as exc:
@@ -280,22 +290,42 @@ def _get_serv(ret=None, commit=False):
                               ON CONFLICT (jid) DO UPDATE
                               SET load=%(load)s"""
 
+    conns[key] = conn
+    return conn
+
+
+@contextmanager
+def _get_serv(ret=None, commit=False):
+    """
+    Return a Pg cursor
+    """
+    conn = _get_conn(_get_options(ret))
     cursor = conn.cursor()
 
     try:
         yield cursor
-    except psycopg2.DatabaseError as err:
-        error = err.args
-        sys.stderr.write(six.text_type(error))
-        cursor.execute("ROLLBACK")
-        six.reraise(*sys.exc_info())
+    except Exception as err:  # pylint: disable=broad-except
+        # Any error leaves the transaction open on the reused connection,
+        # roll it back so the next call does not commit the half-done work
+        exc_info = sys.exc_info()
+        if isinstance(err, psycopg2.DatabaseError):
+            sys.stderr.write(six.text_type(err.args))
+        if isinstance(err, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+            # The connection is gone, the next call connects again
+            conn.close()
+        else:
+            try:
+                cursor.execute("ROLLBACK")
+            except Exception:  # pylint: disable=broad-except
+                conn.close()
+        six.reraise(*exc_info)
     else:
         if commit:
             cursor.execute("COMMIT")
         else:
             cursor.execute("ROLLBACK")
     finally:
-        conn.close()
+        cursor.close()
 
 
 def returner(ret):
@@ -333,15 +363,25 @@ def event_return(events):
     Requires that configuration be enabled via 'event_return'
     option in master config.
     """
+    if not events:
+        return
+    now = time.time()
+    rows = [
+        (
+            event.get("tag", ""),
+            psycopg2.extras.Json(event.get("data", "")),
+            __opts__["id"],
+            now,
+        )
+        for event in events
+    ]
     with _get_serv(events, commit=True) as cur:
-        for event in events:
-            tag = event.get("tag", "")
-            data = event.get("data", "")
-            sql = """INSERT INTO salt_events (tag, data, master_id, alter_time)
-                     VALUES (%s, %s, %s, to_timestamp(%s))"""
-            cur.execute(
-                sql, (tag, psycopg2.extras.Json(data), __opts__["id"], time.time())
-            )
+        # One multi-row INSERT per page of events instead of one per event
+        sql = """INSERT INTO salt_events (tag, data, master_id, alter_time)
+                 VALUES %s"""
+        psycopg2.extras.execute_values(
+            cur, sql, rows, template="(%s, %s, %s, to_timestamp(%s))"
+        )
 
 
 def save_load(jid, load, minions=None):
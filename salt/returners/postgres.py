@@ -146,6 +146,7 @@ from salt.ext import six
 
 try:
     import psycopg2
+    import psycopg2.extras
 
     HAS_POSTGRES = True
 except ImportError:
@@ -196,19 +197,29 @@ def _get_options(ret=None):
     return _options
 
 
-@contextmanager
-def _get_serv(ret=None, commit=False):
+def _get_conn(options):
     """
-    Return a Pg cursor
+    Return a connection to the Pg server. The connections are kept in the
+    context of the process and reused for the same connection options.
     """
-    _options = _get_options(ret)
+    key = tuple(sorted((k, six.text_type(v)) for k, v in six.iteritems(options)))
+    conns = {}
+    try:
+        conns = __context__.setdefault("postgres_returner_conn", {})
+    except (AttributeError, TypeError, NameError):
+        pass
+    conn = conns.get(key)
+    if conn is not None and not conn.closed:
+        log.debug("Reusing postgres returner connection")
+        return conn
+
     try:
         conn = psycopg2.connect(
-            host=_options.get("host"),
-            user=_options.get("user"),
-            password=_options.get("passwd"),
-            database=_options.get("db"),
-            port=_options.get("port"),
+            host=options.get("host"),
+            user=options.get("user"),
+            password=options.get("passwd"),
+            database=options.get("db"),
+            port=options.get("port"),
         )
 
     except psycopg2.OperationalError as exc:
@@ -216,22 +227,42 @@ def _get_serv(ret=None, commit=False):
             "postgres returner could not connect to database: {exc}".format(exc=exc)
         )
 
+    conns[key] = conn
+    return conn
+
+
+@contextmanager
+def _get_serv(ret=None, commit=False):
+    """
+    Return a Pg cursor
+    """
+    conn = _get_conn(_get_options(ret))
     cursor = conn.cursor()
 
     try:
         yield cursor
-    except psycopg2.DatabaseError as err:
-        error = err.args
-        sys.stderr.write(six.text_type(error))
-        cursor.execute("ROLLBACK")
-        six.reraise(*sys.exc_info())
+    except Exception as err:  # pylint: disable=broad-except
+        # Any error leaves the transaction open on the reused connection,
+        # roll it back so the next call does not commit the half-done work
+        exc_info = sys.exc_info()
+        if isinstance(err, psycopg2.DatabaseError):
+            sys.stderr.write(six.text_type(err.args))
+        if isinstance(err, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+            # The connection is gone, the next call connects again
+            conn.close()
+        else:
+            try:
+                cursor.execute("ROLLBACK")
+            except Exception:  # pylint: disable=broad-except
+                conn.close()
+        six.reraise(*exc_info)
     else:
         if commit:
             cursor.execute("COMMIT")
         else:
             cursor.execute("ROLLBACK")
     finally:
-        conn.close()
+        cursor.close()
 
 
 def returner(ret):
@@ -267,13 +298,21 @@ def event_return(events):
     Requires that configuration be enabled via 'event_return'
     option in master config.
     """
+    if not events:
+        return
+    rows = [
+        (
+            event.get("tag", ""),
+            salt.utils.json.dumps(event.get("data", "")),
+            __opts__["id"],
+        )
+        for event in events
+    ]
     with _get_serv(events, commit=True) as cur:
-        for event in events:
-            tag = event.get("tag", "")
-            data = event.get("data", "")
-            sql = """INSERT INTO salt_events (tag, data, master_id)
-                     VALUES (%s, %s, %s)"""
-            cur.execute(sql, (tag, salt.utils.json.dumps(data), __opts__["id"]))
+        # One multi-row INSERT per page of events instead of one per event
+        sql = """INSERT INTO salt_events (tag, data, master_id)
+                 VALUES %s"""
+        psycopg2.extras.execute_values(cur, sql, rows)
 
 
 def save_load(jid, load, minions=None):  # pylint: disable=unused-argument
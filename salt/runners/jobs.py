@@ -309,69 +309,29 @@ def list_jobs(
         )
     mminion = salt.minion.MasterMinion(__opts__)
 
-    ret = mminion.returners["{0}.get_jids".format(returner)]()
-
-    mret = {}
-    for item in ret:
-        _match = True
-        if search_metadata:
-            _match = False
-            if "Metadata" in ret[item]:
-                if isinstance(search_metadata, dict):
-                    for key in search_metadata:
-                        if key in ret[item]["Metadata"]:
-                            if ret[item]["Metadata"][key] == search_metadata[key]:
-                                _match = True
-                else:
-                    log.info(
-                        "The search_metadata parameter must be specified"
-                        " as a dictionary.  Ignoring."
-                    )
-        if search_target and _match:
-            _match = False
-            if "Target" in ret[item]:
-                targets = ret[item]["Target"]
-                if isinstance(targets, six.string_types):
-                    targets = [targets]
-                for target in targets:
-                    for key in salt.utils.args.split_input(search_target):
-                        if fnmatch.fnmatch(target, key):
-                            _match = True
-
-        if search_function and _match:
-            _match = False
-            if "Function" in ret[item]:
-                for key in salt.utils.args.split_input(search_function):
-                    if fnmatch.fnmatch(ret[item]["Function"], key):
-                        _match = True
-
-        if start_time and _match:
-            _match = False
-            if DATEUTIL_SUPPORT:
-                parsed_start_time = dateutil_parser.parse(start_time)
-                _start_time = dateutil_parser.parse(ret[item]["StartTime"])
-                if _start_time >= parsed_start_time:
-                    _match = True
-            else:
-                log.error(
-                    "'dateutil' library not available, skipping start_time "
-                    "comparison."
-                )
-
-        if end_time and _match:
-            _match = False
-            if DATEUTIL_SUPPORT:
-                parsed_end_time = dateutil_parser.parse(end_time)
-                _start_time = dateutil_parser.parse(ret[item]["StartTime"])
-                if _start_time <= parsed_end_time:
-                    _match = True
-            else:
-                log.error(
-                    "'dateutil' library not available, skipping end_time " "comparison."
-                )
-
-        if _match:
-            mret[item] = ret[item]
+    search = {
+        "search_metadata": search_metadata,
+        "search_function": search_function,
+        "search_target": search_target,
+        "start_time": start_time,
+        "end_time": end_time,
+    }
+    if _has_jids_index(mminion, returner):
+        # Filter the job summaries of the index, and only read the matching
+        # jobs from the job cache
+        mret = {}
+        for jid, job in six.iteritems(
+            mminion.returners["{0}.get_jids_index".format(returner)]()
+        ):
+            if _match_job(job, **search):
+                job = _get_indexed_job(mminion, returner, jid)
+                if job:
+                    mret[jid] = job
+    else:
+        ret = mminion.returners["{0}.get_jids".format(returner)]()
+        mret = dict(
+            (item, ret[item]) for item in ret if _match_job(ret[item], **search)
+        )
 
     if outputter:
         return {"outputter": outputter, "data": mret}
@@ -517,6 +477,26 @@ def last_run(
             log.info("The metadata parameter must be specified as a dictionary")
             return False
 
+    returner = _get_returner(
+        (__opts__["ext_job_cache"], ext_source, __opts__["master_job_cache"])
+    )
+    mminion = salt.minion.MasterMinion(__opts__)
+    if _has_jids_index(mminion, returner):
+        # Go through the job summaries of the index from the newest, the job
+        # cache is only read for the last job
+        jobs = mminion.returners["{0}.get_jids_index".format(returner)]()
+        for jid in sorted(jobs, reverse=True):
+            if not _match_job(
+                jobs[jid],
+                search_metadata=metadata,
+                search_function=function,
+                search_target=target,
+            ):
+                continue
+            if _get_indexed_job(mminion, returner, jid):
+                return print_job(jid, ext_source)
+        return False
+
     _all_jobs = list_jobs(
         ext_source=ext_source,
         outputter=outputter,
@@ -532,6 +512,103 @@ def last_run(
         return False
 
 
+def _has_jids_index(mminion, returner):
+    """
+    Return True if the returner keeps an index of the job summaries
+    """
+    return __opts__.get("job_cache_index", True) and (
+        "{0}.get_jids_index".format(returner) in mminion.returners
+    )
+
+
+def _get_indexed_job(mminion, returner, jid):
+    """
+    Return the job of the index the way get_jids formats it, or an empty dict
+    if it was removed from the job cache
+    """
+    load = mminion.returners["{0}.get_load".format(returner)](jid)
+    if not load:
+        return {}
+    job = salt.utils.jid.format_jid_instance(jid, load)
+    if __opts__.get("job_cache_store_endtime"):
+        endtime_fun = "{0}.get_endtime".format(returner)
+        if endtime_fun in mminion.returners:
+            endtime = mminion.returners[endtime_fun](jid)
+            if endtime:
+                job["EndTime"] = endtime
+    return job
+
+
+def _match_job(
+    job,
+    search_metadata=None,
+    search_function=None,
+    search_target=None,
+    start_time=None,
+    end_time=None,
+):
+    """
+    Return True if the formatted job matches all of the filters
+    """
+    _match = True
+    if search_metadata:
+        _match = False
+        if "Metadata" in job:
+            if isinstance(search_metadata, dict):
+                for key in search_metadata:
+                    if key in job["Metadata"]:
+                        if job["Metadata"][key] == search_metadata[key]:
+                            _match = True
+            else:
+                log.info(
+                    "The search_metadata parameter must be specified"
+                    " as a dictionary.  Ignoring."
+                )
+    if search_target and _match:
+        _match = False
+        if "Target" in job:
+            targets = job["Target"]
+            if isinstance(targets, six.string_types):
+                targets = [targets]
+            for target in targets:
+                for key in salt.utils.args.split_input(search_target):
+                    if fnmatch.fnmatch(target, key):
+                        _match = True
+
+    if search_function and _match:
+        _match = False
+        if "Function" in job:
+            for key in salt.utils.args.split_input(search_function):
+                if fnmatch.fnmatch(job["Function"], key):
+                    _match = True
+
+    if start_time and _match:
+        _match = False
+        if DATEUTIL_SUPPORT:
+            parsed_start_time = dateutil_parser.parse(start_time)
+            _start_time = dateutil_parser.parse(job["StartTime"])
+            if _start_time >= parsed_start_time:
+                _match = True
+        else:
+            log.error(
+                "'dateutil' library not available, skipping start_time "
+                "comparison."
+            )
+
+    if end_time and _match:
+        _match = False
+        if DATEUTIL_SUPPORT:
+            parsed_end_time = dateutil_parser.parse(end_time)
+            _start_time = dateutil_parser.parse(job["StartTime"])
+            if _start_time <= parsed_end_time:
+                _match = True
+        else:
+            log.error(
+                "'dateutil' library not available, skipping end_time " "comparison."
+            )
+    return _match
+
+
 def _get_returner(returner_types):
     """
     Helper to iterate over returner_types and pick the first one
@@ -36,15 +36,22 @@ __func_alias__ = {
 }
 
 
-def list_(saltenv="base", test=None):
+def list_(saltenv="base", test=None, shards=False):
     """
     List currently configured reactors
 
+    shards
+        .. versionadded:: Magnesium
+
+        Also return the queue depth of each reactor shard, see
+        :conf_master:`reactor_shards`.
+
     CLI Example:
 
     .. code-block:: bash
 
         salt-run reactor.list
+        salt-run reactor.list shards=True
     """
     sevent = salt.utils.event.get_event(
         "master",
@@ -62,6 +69,8 @@ def list_(saltenv="base", test=None):
 
     results = sevent.get_event(wait=30, tag="salt/reactors/manage/list-results")
     reactors = results["reactors"]
+    if shards:
+        return {"reactors": reactors, "shards": results.get("shards", [])}
     return reactors
 
 
@@ -7,6 +7,7 @@ IPC transport classes
 from __future__ import absolute_import, print_function, unicode_literals
 
 import errno
+import fnmatch
 import logging
 import socket
 import sys
@@ -502,6 +503,9 @@ class IPCMessagePublisher(object):
         self.io_loop = io_loop or IOLoop.current()
         self._closing = False
         self.streams = set()
+        # mapping of stream -> list of [match_type, pattern] filters sent by
+        # the subscriber. Streams without an entry receive every message.
+        self.stream_filters = {}
 
     def start(self):
         """
@@ -545,18 +549,86 @@ class IPCMessagePublisher(object):
                 stream.close()
             self.streams.discard(stream)
 
-    def publish(self, msg):
+    @staticmethod
+    def _match_filters(tag, filters):
+        """
+        Return True if the tag matches any of a subscriber's filters
+        """
+        for match_type, pattern in filters:
+            if match_type == "startswith":
+                if tag.startswith(pattern):
+                    return True
+            elif match_type == "fnmatch":
+                if fnmatch.fnmatch(tag, pattern):
+                    return True
+            else:
+                # Unknown match type, err on the side of delivering
+                return True
+        return False
+
+    def publish(self, msg, tag=None):
         """
         Send message to all connected sockets
-        '''
+
+        :param str tag: The tag of the message. When passed, subscribers which
+                        registered filters only receive the message if the
+                        tag matches one of them.
+        """
         if not self.streams:
             return
 
         pack = salt.transport.frame.frame_msg_ipc(msg, raw_body=True)
 
         for stream in self.streams:
+            if tag is not None:
+                filters = self.stream_filters.get(stream)
+                if filters is not None and not self._match_filters(tag, filters):
+                    continue
             self.io_loop.spawn_callback(self._write, stream, pack)
 
+    @salt.ext.tornado.gen.coroutine
+    def _read_filters(self, stream):
+        """
+        Read the filter registrations a subscriber sends on its stream and
+        acknowledge each of them
+        """
+        # msgpack deprecated `encoding` starting with version 0.5.2
+        if salt.utils.msgpack.version >= (0, 5, 2):
+            # Under Py2 we still want raw to be set to True
+            msgpack_kwargs = {"raw": six.PY2}
+        else:
+            if six.PY2:
+                msgpack_kwargs = {"encoding": None}
+            else:
+                msgpack_kwargs = {"encoding": "utf-8"}
+        unpacker = salt.utils.msgpack.Unpacker(**msgpack_kwargs)
+        while not stream.closed():
+            try:
+                wire_bytes = yield stream.read_bytes(4096, partial=True)
+                unpacker.feed(wire_bytes)
+                for framed_msg in unpacker:
+                    header = framed_msg.get("head") or {}
+                    if "filter" not in header:
+                        continue
+                    filters = framed_msg["body"]
+                    if filters is None:
+                        self.stream_filters.pop(stream, None)
+                    else:
+                        self.stream_filters[stream] = [
+                            (match_type, pattern) for match_type, pattern in filters
+                        ]
+                    log.trace("IPC subscriber registered filters: %s", filters)
+                    ack = salt.transport.frame.frame_msg_ipc(
+                        None, header={"filter_ack": header["filter"]}
+                    )
+                    self.io_loop.spawn_callback(self._write, stream, ack)
+            except StreamClosedError:
+                break
+            except Exception as exc:  # pylint: disable=broad-except
+                log.error("Exception occurred while reading subscriber filters: %s", exc)
+                break
+        self.stream_filters.pop(stream, None)
+
     def handle_connection(self, connection, address):
         log.trace("IPCServer: Handling connection to address: %s", address)
         try:
@@ -573,8 +645,10 @@ class IPCMessagePublisher(object):
 
             def discard_after_closed():
                 self.streams.discard(stream)
+                self.stream_filters.pop(stream, None)
 
             stream.set_close_callback(discard_after_closed)
+            self.io_loop.spawn_callback(self._read_filters, stream)
         except Exception as exc:  # pylint: disable=broad-except
             log.error("IPC streaming error: %s", exc)
 
@@ -590,6 +664,7 @@ class IPCMessagePublisher(object):
         for stream in self.streams:
             stream.close()
         self.streams.clear()
+        self.stream_filters.clear()
         if hasattr(self.sock, "close"):
             self.sock.close()
 
@@ -643,9 +718,89 @@ class IPCMessageSubscriber(IPCClient):
         self._saved_data = []
         self._read_in_progress = Lock()
         self.callbacks = set()
+        self._filters = None
+        self._filter_seq = 0
+        # mapping of filter sequence number -> future completed on ack
+        self._filter_acks = {}
+
+    def connect(self, callback=None, timeout=None):
+        """
+        Connect to the IPC socket, registering the filters again once the
+        connection is up since a new publisher stream starts unfiltered
+        """
+        future = super(IPCMessageSubscriber, self).connect(
+            callback=callback, timeout=timeout
+        )
+        if self._filters is not None:
+
+            def resend_filters(future):
+                if future.exception() is None:
+                    self.io_loop.spawn_callback(self._send_filters)
+
+            future.add_done_callback(resend_filters)
+        return future
 
     @salt.ext.tornado.gen.coroutine
-    def _read(self, timeout, callback=None):
+    def _send_filters(self):
+        self._filter_seq += 1
+        seq = self._filter_seq
+        ack = salt.ext.tornado.concurrent.Future()
+        self._filter_acks[seq] = ack
+        pack = salt.transport.frame.frame_msg_ipc(
+            self._filters, header={"filter": seq}
+        )
+        try:
+            yield self.stream.write(pack)
+        except Exception:  # pylint: disable=broad-except
+            self._filter_acks.pop(seq, None)
+            raise salt.ext.tornado.gen.Return(None)
+        raise salt.ext.tornado.gen.Return(ack)
+
+    @salt.ext.tornado.gen.coroutine
+    def set_filters(self, filters, timeout=None):
+        """
+        Register filters with the publisher, so that it only sends this
+        subscriber the messages whose tag matches one of them. Pass None to
+        receive every message again.
+
+        When the subscriber is connected this waits, up to ``timeout``
+        seconds, for the publisher to acknowledge the new filters. Messages
+        read in the meantime are kept for the next read.
+
+        :param list filters: A list of ``[match_type, pattern]`` pairs, where
+                             match_type is ``startswith`` or ``fnmatch``
+        """
+        self._filters = filters
+        if not self.connected():
+            # They will be sent when the connection is established
+            raise salt.ext.tornado.gen.Return(False)
+        ack = yield self._send_filters()
+        if ack is None:
+            raise salt.ext.tornado.gen.Return(False)
+        timeout_at = None if timeout is None else time.time() + timeout
+        while not ack.done():
+            wait = None if timeout_at is None else timeout_at - time.time()
+            if wait is not None and wait <= 0:
+                break
+            if self._read_in_progress.locked():
+                # Somebody else is reading, they will process the ack
+                try:
+                    yield FutureWithTimeout(self.io_loop, ack, wait or 1)
+                except TornadoTimeoutError:
+                    pass
+                continue
+            msg = yield self._read(wait, filter_ack_breaks=True)
+            if msg is not None:
+                self._saved_data.append(msg)
+        raise salt.ext.tornado.gen.Return(ack.done())
+
+    def _handle_filter_ack(self, header):
+        ack = self._filter_acks.pop(header["filter_ack"], None)
+        if ack is not None and not ack.done():
+            ack.set_result(True)
+
+    @salt.ext.tornado.gen.coroutine
+    def _read(self, timeout, callback=None, filter_ack_breaks=False):
         try:
             yield self._read_in_progress.acquire(timeout=0.00000001)
         except salt.ext.tornado.gen.TimeoutError:
@@ -675,7 +830,12 @@ class IPCMessageSubscriber(IPCClient):
 
                 self.unpacker.feed(wire_bytes)
                 first_sync_msg = True
+                got_filter_ack = False
                 for framed_msg in self.unpacker:
+                    if "filter_ack" in (framed_msg.get("head") or {}):
+                        self._handle_filter_ack(framed_msg["head"])
+                        got_filter_ack = True
+                        continue
                     if callback:
                         self.io_loop.spawn_callback(callback, framed_msg["body"])
                     elif first_sync_msg:
@@ -686,6 +846,8 @@ class IPCMessageSubscriber(IPCClient):
                 if not first_sync_msg:
                     # We read at least one piece of data and we're on sync run
                     break
+                if got_filter_ack and filter_ack_breaks:
+                    break
         except TornadoTimeoutError:
             # In the timeout case, just return None.
             # Keep 'self._read_stream_future' alive.
@@ -1142,8 +1142,12 @@ class AsyncReqMessageClientPool(salt.transport.MessageClientPool):
     """
 
     def __init__(self, opts, args=None, kwargs=None):
+        if opts.get("zmq_req_multiplex", False):
+            message_client_class = AsyncMuxReqMessageClient
+        else:
+            message_client_class = AsyncReqMessageClient
         super(AsyncReqMessageClientPool, self).__init__(
-            AsyncReqMessageClient, opts, args=args, kwargs=kwargs
+            message_client_class, opts, args=args, kwargs=kwargs
         )
         self._closing = False
 
@@ -1157,7 +1161,10 @@ class AsyncReqMessageClientPool(salt.transport.MessageClientPool):
         self.message_clients = []
 
     def send(self, *args, **kwargs):
-        message_clients = sorted(self.message_clients, key=lambda x: len(x.send_queue))
+        message_clients = sorted(
+            self.message_clients,
+            key=lambda x: len(x.send_queue) + len(getattr(x, "inflight", ())),
+        )
         return message_clients[0].send(*args, **kwargs)
 
     def destroy(self):
@@ -1394,6 +1401,189 @@ class AsyncReqMessageClient(object):
         return future
 
 
+class AsyncMuxReqMessageClient(AsyncReqMessageClient):
+    """
+    A multiplexing variant of :class:`AsyncReqMessageClient`.
+
+    Instead of a REQ socket, which only allows a single request in flight,
+    this client uses a DEALER socket and tags every message with a request
+    id. Up to ``zmq_req_max_inflight`` requests are sent without waiting for
+    the previous reply and the replies are matched back to their futures by
+    id, in whatever order the master workers answer them.
+
+    The master side needs no changes: the request id is sent in front of the
+    empty delimiter frame, so the ROUTER/REP pair on the master treats it as
+    part of the routing envelope and hands it back untouched with the reply.
+    """
+
+    def __init__(self, opts, addr, linger=0, io_loop=None):
+        self.max_inflight = opts.get("zmq_req_max_inflight", 16)
+        if self.max_inflight < 1:
+            log.warning(
+                "zmq_req_max_inflight is not correctly set, the option should be "
+                "greater than 0 but is instead %s",
+                self.max_inflight,
+            )
+            self.max_inflight = 1
+        # mapping of request id -> future, for messages on the wire
+        self.inflight = {}
+        self._request_id = 0
+        super(AsyncMuxReqMessageClient, self).__init__(
+            opts, addr, linger=linger, io_loop=io_loop
+        )
+
+    def close(self):
+        try:
+            if self._closing:
+                return
+        except AttributeError:
+            # We must have been called from __del__
+            return
+        super(AsyncMuxReqMessageClient, self).close()
+        for future in list(self.inflight.values()) + [
+            future for _, future in self.send_queue
+        ]:
+            self.remove_message_timeout(future)
+            if not future.done():
+                future.set_exception(SaltReqTimeoutError("Message client closed"))
+        self.inflight = {}
+        self.send_queue = []
+
+    def _init_socket(self):
+        if hasattr(self, "stream"):
+            self.stream.close()  # pylint: disable=E0203
+            self.socket.close()  # pylint: disable=E0203
+            del self.stream
+            del self.socket
+
+        self.socket = self.context.socket(zmq.DEALER)
+
+        # socket options
+        if hasattr(zmq, "RECONNECT_IVL_MAX"):
+            self.socket.setsockopt(zmq.RECONNECT_IVL_MAX, 5000)
+
+        _set_tcp_keepalive(self.socket, self.opts)
+        if self.addr.startswith("tcp://["):
+            # Hint PF type if bracket enclosed IPv6 address
+            if hasattr(zmq, "IPV6"):
+                self.socket.setsockopt(zmq.IPV6, 1)
+            elif hasattr(zmq, "IPV4ONLY"):
+                self.socket.setsockopt(zmq.IPV4ONLY, 0)
+        self.socket.linger = self.linger
+        log.debug("Trying to connect to: %s", self.addr)
+        self.socket.connect(self.addr)
+        self.stream = zmq.eventloop.zmqstream.ZMQStream(
+            self.socket, io_loop=self.io_loop
+        )
+        self.stream.on_recv(self._handle_reply)
+
+    def _next_request_id(self):
+        self._request_id += 1
+        return salt.utils.stringutils.to_bytes("{0:x}".format(self._request_id))
+
+    def _dispatch(self):
+        """
+        Put queued messages on the wire until the in-flight window is full
+        """
+        while self.send_queue and len(self.inflight) < self.max_inflight:
+            message, future = self.send_queue.pop(0)
+            if future.done():
+                # Timed out while it was still queued
+                continue
+            request_id = self._next_request_id()
+            future.request_id = request_id
+            self.inflight[request_id] = future
+            self.stream.send_multipart([request_id, b"", message])
+
+    def _handle_reply(self, frames):
+        """
+        Match a reply from the master to its in-flight request
+        """
+        if len(frames) < 3 or frames[-2] != b"":
+            log.error("Discarding malformed reply on multiplexed ReqChannel")
+            return
+        future = self.inflight.pop(frames[0], None)
+        if future is None:
+            # The request timed out and may have been re-sent under a new id
+            log.debug("Discarding reply to unknown request id %s", frames[0])
+        else:
+            self.remove_message_timeout(future)
+            if not future.done():
+                try:
+                    future.set_result(self.serial.loads(frames[-1]))
+                except Exception as exc:  # pylint: disable=broad-except
+                    future.set_exception(exc)
+        self._dispatch()
+
+    def remove_message_timeout(self, message):
+        # Timeouts are tracked per future here, messages are not unique keys
+        timeout = self.send_timeout_map.pop(message, None)
+        if timeout is not None:
+            self.io_loop.remove_timeout(timeout)
+
+    def timeout_message(self, message):
+        """
+        Handle a request timeout by forgetting its request id and either
+        re-sending it or informing the caller
+
+        :raises: SaltReqTimeoutError
+        """
+        future = message
+        self.send_timeout_map.pop(future, None)
+        self.inflight.pop(getattr(future, "request_id", None), None)
+        self.send_queue = [item for item in self.send_queue if item[1] is not future]
+        if not future.done():
+            if future.attempts < future.tries:
+                future.attempts += 1
+                log.debug(
+                    "SaltReqTimeoutError, retrying. (%s/%s)",
+                    future.attempts,
+                    future.tries,
+                )
+                self.send(
+                    future.message,
+                    timeout=future.timeout,
+                    tries=future.tries,
+                    future=future,
+                )
+            else:
+                future.set_exception(SaltReqTimeoutError("Message timed out"))
+        self._dispatch()
+
+    def send(
+        self, message, timeout=None, tries=3, future=None, callback=None, raw=False
+    ):
+        """
+        Return a future which will be completed when the message has a response
+        """
+        if future is None:
+            future = salt.ext.tornado.concurrent.Future()
+            future.tries = tries
+            future.attempts = 0
+            future.timeout = timeout
+            # if a future wasn't passed in, we need to serialize the message
+            future.message = self.serial.dumps(message)
+            if callback is not None:
+
+                def handle_future(future):
+                    response = future.result()
+                    self.io_loop.add_callback(callback, response)
+
+                future.add_done_callback(handle_future)
+
+        if self.opts.get("detect_mode") is True:
+            timeout = 1
+
+        if timeout is not None:
+            self.send_timeout_map[future] = self.io_loop.call_later(
+                timeout, self.timeout_message, future
+            )
+
+        self.send_queue.append((future.message, future))
+        self._dispatch()
+        return future
+
+
 class ZeroMQSocketMonitor(object):
     __EVENT_MAP = None
 
@@ -276,6 +276,29 @@ def timing(function):
     return wrapped
 
 
+def grains_volatility(volatility):
+    """
+    Declare how long the result of a grains function stays valid when
+    :conf_minion:`grains_refresh_incremental` is enabled. ``volatility`` is
+    either a class name looked up in :conf_minion:`grains_refresh_ttl`
+    (``static``, ``network`` or ``runtime``) or a number of seconds.
+
+    .. versionadded:: Magnesium
+
+    .. code-block:: python
+
+        @salt.utils.decorators.grains_volatility("network")
+        def my_interfaces():
+            ...
+    """
+
+    def _grains_volatility(function):
+        function.__grains_volatility__ = volatility
+        return function
+
+    return _grains_volatility
+
+
 def memoize(func):
     """
     Memoize aka cache the return output of a function
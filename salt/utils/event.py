@@ -52,6 +52,7 @@ Namespaced tag
 
 from __future__ import absolute_import, print_function, unicode_literals
 
+import collections
 import datetime
 import fnmatch
 import hashlib
@@ -59,12 +60,14 @@ import logging
 
 # Import python libs
 import os
+import threading
 import time
 from multiprocessing.util import Finalize
 
 # Import salt libs
 import salt.config
 import salt.defaults.exitcodes
+import salt.ext.tornado.gen
 import salt.ext.tornado.ioloop
 import salt.ext.tornado.iostream
 import salt.log.setup
@@ -72,6 +75,7 @@ import salt.payload
 import salt.transport.client
 import salt.transport.ipc
 import salt.utils.asynchronous
+import salt.utils.atomicfile
 import salt.utils.cache
 import salt.utils.dicttrim
 import salt.utils.files
@@ -184,6 +188,19 @@ def fire_args(opts, jid, tag_data, prefix=""):
             )
 
 
+def _package_tag(package):
+    """
+    Return the tag of a packed event without unpacking its data
+    """
+    if not package:
+        return None
+    if isinstance(package, six.binary_type):
+        tag = package.partition(salt.utils.stringutils.to_bytes(TAGEND))[0]
+    else:
+        tag = package.partition(TAGEND)[0]
+    return salt.utils.stringutils.to_unicode(tag, errors="replace")
+
+
 def tagify(suffix="", prefix="", base=SALT):
     """
     convenience function to build a namespaced event tag string
@@ -295,6 +312,9 @@ class SaltEvent(object):
         self.puburi, self.pulluri = self.__load_uri(sock_dir, node)
         self.pending_tags = []
         self.pending_events = []
+        self._current_tag = None
+        self._publisher_filters = None
+        self._publisher_filters_future = None
         self.__load_cache_regex()
         if listen and not self.cpub:
             # Only connect to the publisher at initialization time if
@@ -357,11 +377,16 @@ class SaltEvent(object):
         jobs are outstanding it is important to subscribe to prevent one call
         to get_event from discarding a response required by a subsequent call
         to get_event.
+
+        In asynchronous mode with ``event_publisher_filtering`` enabled, this
+        may return a future to wait on before relying on the subscription,
+        see _update_publisher_filters.
         """
         if tag is None:
-            return
+            return None
         match_func = self._get_match_func(match_type)
         self.pending_tags.append([tag, match_func])
+        return self._update_publisher_filters()
 
     def unsubscribe(self, tag, match_type=None):
         """
@@ -380,6 +405,124 @@ class SaltEvent(object):
                 pmatch_func(evt["tag"], ptag) for ptag, pmatch_func in self.pending_tags
             ):
                 self.pending_events.append(evt)
+        self._update_publisher_filters()
+
+    def _publisher_filter(self, tag, match_func):
+        """
+        Translate a subscription into a filter the event publisher can apply,
+        or None if the publisher cannot express it
+        """
+        if match_func == self._match_tag_startswith:
+            if tag:
+                return ["startswith", tag]
+        elif match_func == self._match_tag_fnmatch:
+            if tag.strip("*"):
+                return ["fnmatch", tag]
+        return None
+
+    def _publisher_filter_list(self):
+        """
+        Return the filters matching the subscribed tags, plus the tag
+        currently waited on, or None to receive every event
+        """
+        if not self.pending_tags:
+            return None
+        filters = []
+        for ptag, pmatch_func in self.pending_tags:
+            pfilter = self._publisher_filter(ptag, pmatch_func)
+            if pfilter is None:
+                return None
+            if pfilter not in filters:
+                filters.append(pfilter)
+        if self._current_tag is not None:
+            pfilter = self._publisher_filter(*self._current_tag)
+            if pfilter is None:
+                return None
+            # Waiting on a subscribed tag is the common case, don't register
+            # a filter for it again
+            if not any(
+                pfilter == other
+                or (
+                    pfilter[0] == other[0] == "startswith"
+                    and pfilter[1].startswith(other[1])
+                )
+                for other in filters
+            ):
+                filters.append(pfilter)
+        return filters
+
+    def _update_publisher_filters(self):
+        """
+        With ``event_publisher_filtering`` enabled, register the subscribed
+        tags, plus the tag currently waited on, with the event publisher so
+        that events which would be discarded here are never sent over the
+        IPC socket.
+
+        Filters are only registered once something has been subscribed to,
+        a plain listener keeps receiving every event. Narrowing the filters
+        never loses a wanted event and is not waited on. Events matching a
+        new filter would be dropped until the publisher applies it, so when
+        the filters widen, the publisher is first told to send every event
+        and the subscription is only active once it acknowledged.
+
+        In asynchronous mode, return a future resolved once the publisher
+        acknowledged the widened filters.
+        """
+        if not self.opts.get("event_publisher_filtering", False):
+            return None
+        if self.subscriber is None:
+            return None
+        if self._publisher_filters_future is not None:
+            # The filters are narrowed to the current subscriptions once the
+            # publisher acknowledged that it sends every event
+            return self._publisher_filters_future
+        filters = self._publisher_filter_list()
+        if filters == self._publisher_filters:
+            return None
+        widen = self._publisher_filters is not None and (
+            filters is None
+            or any(pfilter not in self._publisher_filters for pfilter in filters)
+        )
+        if not self._run_io_loop_sync:
+            if widen:
+                self._publisher_filters = None
+                future = self._widen_publisher_filters()
+                if not future.done():
+                    self._publisher_filters_future = future
+                return future
+            log.trace("Narrowing event publisher filters: %s", filters)
+            self._publisher_filters = filters
+            self.io_loop.spawn_callback(self.subscriber.set_filters, filters, 0)
+            return None
+        log.trace("Registering event publisher filters: %s", filters)
+        self._publisher_filters = filters
+        with salt.utils.asynchronous.current_ioloop(self.io_loop):
+            try:
+                self.io_loop.run_sync(
+                    lambda: self.subscriber.set_filters(
+                        filters, timeout=1 if widen else 0
+                    )
+                )
+            except Exception:  # pylint: disable=broad-except
+                log.debug("Failed to register event publisher filters")
+        return None
+
+    @salt.ext.tornado.gen.coroutine
+    def _widen_publisher_filters(self):
+        """
+        Have the publisher send every event, wait for its acknowledgement,
+        then narrow the filters to the subscriptions made meanwhile
+        """
+        log.trace("Widening event publisher filters")
+        acked = False
+        try:
+            acked = yield self.subscriber.set_filters(None, timeout=1)
+        except Exception:  # pylint: disable=broad-except
+            log.debug("Failed to widen event publisher filters")
+        finally:
+            self._publisher_filters_future = None
+        self._update_publisher_filters()
+        raise salt.ext.tornado.gen.Return(acked)
 
     def connect_pub(self, timeout=None):
         """
@@ -410,6 +553,8 @@ class SaltEvent(object):
             # For the asynchronous case, the connect will be defered to when
             # set_event_handler() is invoked.
             self.cpub = True
+        if self.cpub:
+            self._update_publisher_filters()
         return self.cpub
 
     def close_pub(self):
@@ -422,6 +567,7 @@ class SaltEvent(object):
         self.subscriber.close()
         self.subscriber = None
         self.pending_events = []
+        self._publisher_filters = None
         self.cpub = False
 
     def connect_pull(self, timeout=1):
@@ -466,23 +612,39 @@ class SaltEvent(object):
 
     @classmethod
     def unpack(cls, raw, serial=None):
+        mtag = cls.unpack_tag(raw)
+        return mtag, cls.unpack_data(raw, serial=serial)
+
+    @staticmethod
+    def unpack_tag(raw):
+        """
+        Return the tag of a packed event. The tag is framed ahead of the
+        msgpack body, so this does not decode any of the event data.
+        """
+        if six.PY2:
+            return raw.partition(TAGEND)[0]
+        return salt.utils.stringutils.to_str(
+            raw.partition(salt.utils.stringutils.to_bytes(TAGEND))[0]
+        )
+
+    @staticmethod
+    def unpack_data(raw, serial=None):
+        """
+        Decode the data of a packed event
+        """
         if serial is None:
             serial = salt.payload.Serial({"serial": "msgpack"})
-
         if six.PY2:
-            mtag, sep, mdata = raw.partition(TAGEND)  # split tag from data
-            data = serial.loads(mdata, encoding="utf-8")
+            mdata = raw.partition(TAGEND)[2]
         else:
-            mtag, sep, mdata = raw.partition(
-                salt.utils.stringutils.to_bytes(TAGEND)
-            )  # split tag from data
-            mtag = salt.utils.stringutils.to_str(mtag)
-            data = serial.loads(mdata, encoding="utf-8")
-        return mtag, data
+            mdata = raw.partition(salt.utils.stringutils.to_bytes(TAGEND))[2]
+        return serial.loads(mdata, encoding="utf-8")
 
     def _get_match_func(self, match_type=None):
         if match_type is None:
             match_type = self.opts["event_match_type"]
+        if callable(match_type):
+            return match_type
         return getattr(self, "_match_tag_{0}".format(match_type), None)
 
     def _check_pending(self, tag, match_func=None):
@@ -563,6 +725,9 @@ class SaltEvent(object):
     def _get_event(self, wait, tag, match_func=None, no_block=False):
         if match_func is None:
             match_func = self._get_match_func()
+        if self._current_tag != [tag, match_func]:
+            self._current_tag = [tag, match_func]
+            self._update_publisher_filters()
         start = time.time()
         timeout_at = start + wait
         run_once = False
@@ -586,8 +751,16 @@ class SaltEvent(object):
                 raw = self.subscriber.read_sync(timeout=wait)
                 if raw is None:
                     break
-                mtag, data = self.unpack(raw, self.serial)
-                ret = {"data": data, "tag": mtag}
+                mtag = self.unpack_tag(raw)
+                if not match_func(mtag, tag) and not any(
+                    pmatch_func(mtag, ptag) for ptag, pmatch_func in self.pending_tags
+                ):
+                    # Nobody wants this event, don't pay for decoding it
+                    log.trace("get_event() discarding unwanted event tag = %s", mtag)
+                    if wait:  # only update the wait timeout if we had one
+                        wait = timeout_at - time.time()
+                    continue
+                ret = {"data": self.unpack_data(raw, self.serial), "tag": mtag}
             except KeyboardInterrupt:
                 return {"tag": "salt/event/exit", "data": {}}
             except salt.ext.tornado.iostream.StreamClosedError:
@@ -647,6 +820,11 @@ class SaltEvent(object):
              - 'fnmatch' : fnmatch tag event tags matching
             Default is opts['event_match_type'] or 'startswith'
 
+            A callable taking the event tag and the search tag may also be
+            passed. Events are matched on their tag before their data is
+            decoded, so events rejected by the match function are never
+            deserialized.
+
             .. versionadded:: 2015.8.0
 
         no_block
@@ -1091,7 +1269,7 @@ class AsyncEventPublisher(object):
         Get something from epull, publish it out epub, and return the package (or None)
         """
         try:
-            self.publisher.publish(package)
+            self.publisher.publish(package, tag=_package_tag(package))
             return package
         # Add an extra fallback in case a forked process leeks through
         except Exception:  # pylint: disable=broad-except
@@ -1191,7 +1369,7 @@ class EventPublisher(salt.utils.process.SignalHandlingProcess):
         Get something from epull, publish it out epub, and return the package (or None)
         """
         try:
-            self.publisher.publish(package)
+            self.publisher.publish(package, tag=_package_tag(package))
             return package
         # Add an extra fallback in case a forked process leeks through
         except Exception:  # pylint: disable=broad-except
@@ -1220,6 +1398,256 @@ class EventPublisher(salt.utils.process.SignalHandlingProcess):
     # pylint: enable=W1701
 
 
+class EventReturnWorker(threading.Thread):
+    """
+    Deliver the events queued for a single event returner in batches.
+
+    Each configured returner gets its own worker thread, so a slow returner
+    only holds up its own events. The in-memory queue is bounded by
+    ``event_return_queue_max_size``; past that point events are either
+    dropped or written to disk in batches, depending on
+    ``event_return_overflow``. Failed batches are retried with exponential
+    backoff.
+    """
+
+    def __init__(self, opts, name, returner, serial=None):
+        super(EventReturnWorker, self).__init__(
+            name="EventReturnWorker({0})".format(name)
+        )
+        self.daemon = True
+        self.opts = opts
+        self.returner_name = name
+        self.returner = returner
+        self.serial = serial or salt.payload.Serial(opts)
+        self.batch_size = max(1, opts["event_return_queue"])
+        self.max_size = opts["event_return_queue_max_size"]
+        self.max_seconds = opts.get("event_return_queue_max_seconds", 0)
+        self.overflow = opts["event_return_overflow"]
+        self.spill_dir = os.path.join(opts["cachedir"], "event_return", name)
+        # Queued items are (enqueue time, event) tuples
+        self.queue = collections.deque()
+        self.cond = threading.Condition()
+        self.stopping = False
+        self._spill_count = 0
+        self.stats = {
+            "queued": 0,
+            "spilled": 0,
+            "delivered": 0,
+            "dropped": 0,
+            "failed": 0,
+            "retries": 0,
+            "lag": 0.0,
+            "max_lag": 0.0,
+        }
+
+    def put(self, event):
+        """
+        Queue an event for this returner, applying the overflow policy once
+        the queue reached its high-water mark
+        """
+        spilled = None
+        with self.cond:
+            if self.max_size and len(self.queue) >= self.max_size:
+                if self.overflow == "spill":
+                    # Move the oldest batch to disk to make room, it is
+                    # written once the lock is released
+                    spilled = [
+                        self.queue.popleft()[1]
+                        for _ in range(min(self.batch_size, len(self.queue)))
+                    ]
+                else:
+                    self.stats["dropped"] += 1
+                    log.warning(
+                        "Event returner %s is falling behind, dropping event %s",
+                        self.returner_name,
+                        event["tag"],
+                    )
+                    return
+            self.queue.append((time.time(), event))
+            if len(self.queue) >= self.batch_size:
+                self.cond.notify()
+        if spilled:
+            self._spill(spilled)
+
+    def stop(self):
+        """
+        Deliver what is left in the queue and stop the worker
+        """
+        with self.cond:
+            self.stopping = True
+            self.cond.notify()
+
+    def get_stats(self):
+        """
+        Return the delivery metrics of this worker
+        """
+        with self.cond:
+            stats = dict(self.stats)
+            stats["queued"] = len(self.queue)
+            stats["spill_pending"] = len(self._spill_files())
+            if self.queue:
+                stats["oldest"] = time.time() - self.queue[0][0]
+            else:
+                stats["oldest"] = 0.0
+        return stats
+
+    def _spill_files(self):
+        try:
+            return sorted(
+                fn for fn in os.listdir(self.spill_dir) if fn.endswith(".p")
+            )
+        except OSError:
+            return []
+
+    def _spill(self, batch):
+        """
+        Write a batch of events to the spill directory. Called without the
+        lock held, the file only shows up in the directory once complete.
+        """
+        with self.cond:
+            self._spill_count += 1
+            path = os.path.join(
+                self.spill_dir,
+                "{0:.6f}_{1}_{2}.p".format(
+                    time.time(), os.getpid(), self._spill_count
+                ),
+            )
+        try:
+            if not os.path.isdir(self.spill_dir):
+                os.makedirs(self.spill_dir)
+            with salt.utils.atomicfile.atomic_open(path, "w+b") as fp_:
+                fp_.write(self.serial.dumps(batch))
+        except (IOError, OSError) as exc:
+            with self.cond:
+                self.stats["dropped"] += len(batch)
+            log.error(
+                "Could not spill %s events for returner %s to %s: %s",
+                len(batch),
+                self.returner_name,
+                path,
+                exc,
+            )
+            return
+        with self.cond:
+            self.stats["spilled"] += len(batch)
+
+    def _unspill(self, spill_files):
+        """
+        Load the oldest spilled batch out of ``spill_files``, or return None
+        """
+        for fn_ in spill_files:
+            path = os.path.join(self.spill_dir, fn_)
+            try:
+                with salt.utils.files.fopen(path, "rb") as fp_:
+                    batch = self.serial.loads(fp_.read())
+            except Exception as exc:  # pylint: disable=broad-except
+                log.error("Discarding unreadable spilled events %s: %s", path, exc)
+                batch = None
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            if batch:
+                return batch
+        return None
+
+    def _next_batch(self):
+        """
+        Wait for a batch of events to deliver. Returns a (enqueue time,
+        events) tuple, or None once the worker is stopped and drained.
+        """
+        while True:
+            spill_files = None
+            with self.cond:
+                while True:
+                    if self.queue and (
+                        len(self.queue) >= self.batch_size
+                        or self.stopping
+                        or (
+                            self.max_seconds > 0
+                            and time.time() - self.queue[0][0] >= self.max_seconds
+                        )
+                    ):
+                        batch = [
+                            self.queue.popleft()
+                            for _ in range(min(self.batch_size, len(self.queue)))
+                        ]
+                        return batch[0][0], [event for _, event in batch]
+                    if self.overflow == "spill" and len(self.queue) < self.batch_size:
+                        # Caught up with the live events, replay spilled ones
+                        spill_files = self._spill_files()
+                        if spill_files:
+                            break
+                    if self.stopping:
+                        return None
+                    if self.queue and self.max_seconds > 0:
+                        self.cond.wait(
+                            max(0, self.queue[0][0] + self.max_seconds - time.time())
+                        )
+                    else:
+                        self.cond.wait()
+            # Read the spilled batch without holding the lock, so that put()
+            # is not blocked on the disk meanwhile
+            spilled = self._unspill(spill_files)
+            if spilled:
+                return None, spilled
+
+    def deliver(self, batch):
+        """
+        Hand a batch of events to the returner, retrying with exponential
+        backoff. Returns True if the batch was stored.
+        """
+        retries = self.opts["event_return_retries"]
+        backoff = self.opts["event_return_retry_backoff"]
+        for attempt in range(retries + 1):
+            try:
+                self.returner(batch)
+                return True
+            except Exception as exc:  # pylint: disable=broad-except
+                log.error(
+                    "Could not store events - returner '%s' raised "
+                    "exception: %s",
+                    self.returner_name,
+                    exc,
+                )
+                # don't waste processing power unnecessarily on converting a
+                # potentially huge dataset to a string
+                if log.level <= logging.DEBUG:
+                    log.debug("Event data that caused an exception: %s", batch)
+            if attempt >= retries or self.stopping:
+                break
+            self.stats["retries"] += 1
+            time.sleep(
+                min(
+                    backoff * 2 ** attempt,
+                    self.opts["event_return_retry_backoff_max"],
+                )
+            )
+        return False
+
+    def run(self):
+        while True:
+            item = self._next_batch()
+            if item is None:
+                break
+            queued_at, batch = item
+            if self.deliver(batch):
+                self.stats["delivered"] += len(batch)
+                if queued_at is not None:
+                    self.stats["lag"] = time.time() - queued_at
+                    self.stats["max_lag"] = max(
+                        self.stats["max_lag"], self.stats["lag"]
+                    )
+            else:
+                self.stats["failed"] += len(batch)
+                if self.overflow == "spill":
+                    # Keep the batch on disk, it is replayed once the
+                    # returner has caught up with the live events
+                    self._spill(batch)
+                    if not self.stopping:
+                        time.sleep(self.opts["event_return_retry_backoff_max"])
+
+
 class EventReturn(salt.utils.process.SignalHandlingProcess):
     """
     A dedicated process which listens to the master event bus and queues
@@ -1248,12 +1676,10 @@ class EventReturn(salt.utils.process.SignalHandlingProcess):
         super(EventReturn, self).__init__(**kwargs)
 
         self.opts = opts
-        self.event_return_queue = self.opts['event_return_queue']
-        self.event_return_queue_max_seconds = self.opts.get('event_return_queue_max_seconds', 0)
         local_minion_opts = self.opts.copy()
         local_minion_opts["file_client"] = "local"
         self.minion = salt.minion.MasterMinion(local_minion_opts)
-        self.event_queue = []
+        self.workers = {}
         self.stop = False
 
     # __setstate__ and __getstate__ are only used on Windows.
@@ -1274,46 +1700,70 @@ class EventReturn(salt.utils.process.SignalHandlingProcess):
         }
 
     def _handle_signals(self, signum, sigframe):
-        # Flush and terminate
-        if self.event_queue:
-            self.flush_events()
+        # Only stop the loop of run(), which flushes the queues on its way
+        # out, joining the workers here would block the signal handler
+        self._signal_handled.set()
         self.stop = True
-        super(EventReturn, self)._handle_signals(signum, sigframe)
 
-    def flush_events(self):
+    def _returner_names(self):
         if isinstance(self.opts["event_return"], list):
-            # Multiple event returners
-            for r in self.opts['event_return']:
-                log.debug('Calling event returner %s, one of many.', r)
-                event_return = '{0}.event_return'.format(r)
-                self._flush_event_single(event_return)
-        else:
-            # Only a single event returner
-            log.debug('Calling event returner %s, only one configured.',
-                      self.opts['event_return'])
-            event_return = '{0}.event_return'.format(
-                self.opts['event_return']
+            return self.opts["event_return"]
+        return [self.opts["event_return"]]
+
+    def start_workers(self):
+        """
+        Start a delivery thread for each configured event returner
+        """
+        for name in self._returner_names():
+            event_return = "{0}.event_return".format(name)
+            if event_return not in self.minion.returners:
+                log.error(
+                    "Could not store return for event(s) - returner " "'%s' not found.",
+                    event_return,
                 )
-            self._flush_event_single(event_return)
-        del self.event_queue[:]
+                continue
+            worker = EventReturnWorker(
+                self.opts, name, self.minion.returners[event_return]
+            )
+            worker.start()
+            self.workers[name] = worker
 
-    def _flush_event_single(self, event_return):
-        if event_return in self.minion.returners:
-            try:
-                self.minion.returners[event_return](self.event_queue)
-            except Exception as exc:
-                log.error('Could not store events - returner \'%s\' raised '
-                          'exception: %s', event_return, exc)
-                # don't waste processing power unnecessarily on converting a
-                # potentially huge dataset to a string
-                if log.level <= logging.DEBUG:
-                    log.debug('Event data that caused an exception: %s',
-                              self.event_queue)
-        else:
-            log.error(
-                "Could not store return for event(s) - returner " "'%s' not found.",
-                event_return,
+    def stop_workers(self, timeout=30):
+        """
+        Flush the queued events and stop the delivery threads
+        """
+        for worker in six.itervalues(self.workers):
+            worker.stop()
+        for worker in six.itervalues(self.workers):
+            worker.join(timeout)
+        self.workers = {}
+
+    def queue_event(self, event):
+        """
+        Queue an event on every returner worker
+        """
+        for worker in six.itervalues(self.workers):
+            worker.put(event)
+
+    def get_stats(self):
+        """
+        Return the delivery metrics of every returner worker
+        """
+        return dict(
+            (name, worker.get_stats()) for name, worker in six.iteritems(self.workers)
+        )
+
+    def _post_stats(self):
+        """
+        Fire an event with the returner metrics if it's time
+        """
+        now = time.time()
+        if now - self.stat_clock > self.opts["event_return_stats_event_iter"]:
+            self.event.fire_event(
+                {"time": now - self.stat_clock, "stats": self.get_stats()},
+                "salt/event_return/stats",
             )
+            self.stat_clock = now
 
     def run(self):
         """
@@ -1321,56 +1771,34 @@ class EventReturn(salt.utils.process.SignalHandlingProcess):
         """
         salt.utils.process.appendproctitle(self.__class__.__name__)
         self.event = get_event("master", opts=self.opts, listen=True)
-        events = self.event.iter_events(full=True)
+        self.start_workers()
+        self.stat_clock = time.time()
         self.event.fire_event({}, "salt/event_listen/start")
         try:
-            # events below is a generator, we will iterate until we get the salt/event/exit tag
-            oldestevent = None
-            for event in events:
-
-                if event['tag'] == 'salt/event/exit':
-                    # We're done eventing
-                    self.stop = True
-                if self._filter(event):
-                    # This event passed the filter, add it to the queue
-                    self.event_queue.append(event)
-                too_long_in_queue = False
-
-                # if max_seconds is >0, then we want to make sure we flush the queue
-                # every event_return_queue_max_seconds seconds,  If it's 0, don't
-                # apply any of this logic
-                if self.event_return_queue_max_seconds > 0:
-                    rightnow = datetime.datetime.now()
-                    if not oldestevent:
-                        oldestevent = rightnow
-                    age_in_seconds = (rightnow - oldestevent).seconds
-                    if age_in_seconds > 0:
-                        log.debug('Oldest event in queue is %s seconds old.', age_in_seconds)
-                    if age_in_seconds >= self.event_return_queue_max_seconds:
-                        too_long_in_queue = True
-                        oldestevent = None
+            while not self.stop:
+                # Events are filtered on their tag before they are decoded
+                event = self.event.get_event(
+                    wait=1, full=True, match_type=self._match_tag
+                )
+                if event is not None:
+                    if event["tag"] == "salt/event/exit":
+                        # We're done eventing
+                        self.stop = True
                     else:
-                        too_long_in_queue = False
-
-                    if too_long_in_queue:
-                        log.debug('Oldest event has been in queue too long, will flush queue')
-
-                # If we are over the max queue size or the oldest item in the queue has been there too long
-                # then flush the queue
-                if len(self.event_queue) >= self.event_return_queue or too_long_in_queue:
-                    log.debug('Flushing %s events.', len(self.event_queue))
-                    self.flush_events()
-                    oldestevent = None
-                if self.stop:
-                    # We saw the salt/event/exit tag, we can stop eventing
-                    break
-        finally:  # flush all we have at this moment
-            # No matter what, make sure we flush the queue even when we are exiting
-            # and there will be no more events.
-            if self.event_queue:
-                log.debug('Flushing %s events.', len(self.event_queue))
-
-                self.flush_events()
+                        self.queue_event(event)
+                if self.opts["event_return_stats"]:
+                    self._post_stats()
+        finally:
+            # No matter what, make sure we flush the queues even when we are
+            # exiting and there will be no more events.
+            self.stop_workers()
+
+    def _match_tag(self, event_tag, search_tag):  # pylint: disable=unused-argument
+        """
+        Match function for get_event, selecting the events to store, and the
+        exit event, from their tag alone
+        """
+        return event_tag == "salt/event/exit" or self._filter_tag(event_tag)
 
     def _filter(self, event):
         """
@@ -1378,7 +1806,14 @@ class EventReturn(salt.utils.process.SignalHandlingProcess):
 
         Returns True if event should be stored, else False
         """
-        tag = event["tag"]
+        return self._filter_tag(event["tag"])
+
+    def _filter_tag(self, tag):
+        """
+        Run an event tag through the configured filters.
+
+        Returns True if the event should be stored, else False
+        """
         if self.opts["event_return_whitelist"]:
             ret = False
         else:
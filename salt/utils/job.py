@@ -148,6 +148,29 @@ def store_job(opts, load, event=None, mminion=None):
         mminion.returners[updateetfstr](load["jid"], endtime)
 
 
+def store_jobs(opts, loads, event=None, mminion=None):
+    """
+    Store a batch of job returns using the configured master_job_cache
+
+    The returner loader is only set up once for the whole batch. The returns
+    are still handed one by one to the returner and fired one by one on the
+    event bus, which have no batch interface. Returns the number of loads
+    which were stored.
+    """
+    if mminion is None:
+        mminion = salt.minion.MasterMinion(opts, states=False, rend=False)
+    stored = 0
+    for load in loads:
+        try:
+            if store_job(opts, load, event=event, mminion=mminion) is not False:
+                stored += 1
+        except KeyError as exc:
+            # A missing returner function fails every load the same way
+            log.error("Could not store batched job returns: %s", exc)
+            break
+    return stored
+
+
 def store_minions(opts, jid, minions, mminion=None, syndic_id=None):
     """
     Store additional minions matched on lower-level masters using the configured
@@ -6,12 +6,22 @@ This module contains routines used for the salt mine
 # Import python libs
 from __future__ import absolute_import, unicode_literals
 
+import hashlib
 import logging
+import os
+import re
+import time
 
 # Import salt libs
+import salt.payload
+import salt.utils.atomicfile
 import salt.utils.data
+import salt.utils.files
+import salt.utils.json
+import salt.utils.stringutils
 
 # Import 3rd-party libs
+from salt.ext import six
 
 log = logging.getLogger(__name__)
 
@@ -114,3 +124,259 @@ def parse_function_definition(function_definition):
     )
 
     return (function_name, function_args, function_kwargs, minion_acl)
+
+
+def data_hash(data):
+    """
+    Return a stable hash of a mine value, used to version mine entries.
+
+    :param data: The mine data to hash.
+
+    :rtype: str
+    :return: The sha256 hex digest of the JSON representation of ``data``.
+    """
+    return hashlib.sha256(
+        salt.utils.stringutils.to_bytes(
+            salt.utils.json.dumps(data, sort_keys=True, default=six.text_type)
+        )
+    ).hexdigest()
+
+
+def _hashes_path(opts, master=None):
+    if master is None:
+        master = opts.get("master", "")
+    return os.path.join(
+        opts["cachedir"],
+        "mine_hashes_{0}.p".format(re.sub(r"[^\w.-]", "_", six.text_type(master))),
+    )
+
+
+def _masters(opts):
+    """
+    Return the masters the mine updates of the minion are sent to.
+    """
+    if opts.get("master_type") in ("failover", "distributed") or not opts.get(
+        "master_list"
+    ):
+        return [opts.get("master", "")]
+    return opts["master_list"]
+
+
+def _read_master_hashes(opts, master=None):
+    serial = salt.payload.Serial(opts)
+    try:
+        with salt.utils.files.fopen(_hashes_path(opts, master), "rb") as fp_:
+            data = serial.load(fp_)
+    except (IOError, OSError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def read_hashes(opts):
+    """
+    Return the hashes of the mine entries every master of the minion
+    acknowledged storing.
+
+    Each master keeps its own mine, so the acknowledgements are recorded per
+    master and an entry is only left out of an update when all the masters
+    hold its current value.
+
+    :param dict opts: The minion's opts.
+
+    :rtype: dict
+    :return: Mine function names mapped to the hash of their stored value.
+    """
+    hashes = None
+    for master in _masters(opts):
+        acked = _read_master_hashes(opts, master)
+        if hashes is None:
+            hashes = acked
+        else:
+            hashes = dict(
+                (fun, hash_)
+                for fun, hash_ in six.iteritems(hashes)
+                if acked.get(fun) == hash_
+            )
+    return hashes or {}
+
+
+def ack_hashes(opts, load, ret):
+    """
+    Record which mine entries the master holds, from a mine request sent to
+    it and the reply of the master.
+
+    :param dict opts: The opts of the minion connected to the master.
+    :param dict load: The mine request sent to the master.
+    :param ret: The reply of the master. Only a reply to a mine update which
+        carried hashes acknowledges entries, any other request drops the
+        hashes of the entries it touched.
+    """
+    cmd = load.get("cmd")
+    if cmd not in ("_mine", "_mine_delete", "_mine_flush"):
+        return
+    if cmd == "_mine_flush" or load.get("clear", False):
+        hashes = {}
+    else:
+        hashes = _read_master_hashes(opts)
+    if cmd == "_mine_delete":
+        hashes.pop(load.get("fun"), None)
+    elif cmd == "_mine":
+        for fun in load.get("mine_hashes") or load.get("data") or {}:
+            hashes.pop(fun, None)
+        if isinstance(ret, dict) and isinstance(ret.get("mine_hashes"), dict):
+            hashes.update(ret["mine_hashes"])
+
+    path = _hashes_path(opts)
+    try:
+        if not hashes:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        serial = salt.payload.Serial(opts)
+        with salt.utils.atomicfile.atomic_open(path, "wb") as fp_:
+            serial.dump(hashes, fp_)
+    except (IOError, OSError) as exc:
+        log.error("Unable to write the mine hashes to %s: %s", path, exc)
+
+
+def _get_cache_path(opts, key):
+    return os.path.join(
+        opts["cachedir"],
+        "mine_get",
+        "{0}.p".format(
+            hashlib.sha256(salt.utils.stringutils.to_bytes(key)).hexdigest()
+        ),
+    )
+
+
+def read_get_cache(opts, key):
+    """
+    Return the result of the last ``mine.get`` request identified by ``key``,
+    along with the versions of the entries the master sent back for it.
+
+    :param dict opts: The minion's opts.
+    :param str key: The identifier of the request.
+
+    :rtype: tuple
+    :return: The versions and the result of the request, empty dicts if it was
+        never made.
+    """
+    serial = salt.payload.Serial(opts)
+    try:
+        with salt.utils.files.fopen(_get_cache_path(opts, key), "rb") as fp_:
+            data = serial.load(fp_)
+    except (IOError, OSError):
+        return {}, {}
+    if not isinstance(data, dict):
+        return {}, {}
+    return data.get("versions") or {}, data.get("ret") or {}
+
+
+def write_get_cache(opts, key, versions, ret):
+    """
+    Record the result of a ``mine.get`` request identified by ``key``, so the
+    next identical request, possibly from another job process, only has to
+    fetch the entries which changed.
+
+    :param dict opts: The minion's opts.
+    :param str key: The identifier of the request.
+    :param dict versions: The versions of the entries the master sent back.
+    :param dict ret: The result of the request.
+    """
+    path = _get_cache_path(opts, key)
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        serial = salt.payload.Serial(opts)
+        with salt.utils.atomicfile.atomic_open(path, "wb") as fp_:
+            serial.dump({"versions": versions, "ret": ret}, fp_)
+    except (IOError, OSError) as exc:
+        log.error("Unable to write the mine.get cache to %s: %s", path, exc)
+
+
+class MineCache(object):
+    """
+    In-memory copy of the minions' mine data, indexed by function.
+
+    A minion's entries are only re-read from the cache backend when the
+    backend reports a new timestamp for them, so answering ``mine.get`` for
+    many minions does not deserialize every minion's mine on every call.
+    Backends that cannot report timestamps are always re-read.
+    """
+
+    # Timestamps younger than this are not trusted, a second write within
+    # the resolution of the backend would not change them.
+    settle = 2
+
+    def __init__(self):
+        self.stamps = {}
+        self.hashes = {}
+        self.functions = {}
+
+    def _stamp(self, cache, bank):
+        """
+        Return the timestamp of the mine of a minion, False if the minion
+        has no mine data and None if the backend cannot tell.
+        """
+        try:
+            if not cache.contains(bank, "mine"):
+                return False
+            stamp = cache.updated(bank, "mine")
+        except (AttributeError, KeyError):
+            return None
+        if stamp is None or time.time() - stamp < self.settle:
+            return None
+        return stamp
+
+    def refresh(self, cache, minion):
+        """
+        Make sure the in-memory entries of ``minion`` match the cache backend.
+
+        :rtype: bool
+        :return: True if the minion has mine data.
+        """
+        bank = "minions/{0}".format(minion)
+        stamp = self._stamp(cache, bank)
+        if stamp is False:
+            self.forget(minion)
+            return False
+        if stamp is None or self.stamps.get(minion) != stamp:
+            data = cache.fetch(bank, "mine")
+            self.forget(minion)
+            if not isinstance(data, dict):
+                return False
+            self.hashes[minion] = {}
+            for fun, value in six.iteritems(data):
+                self.functions.setdefault(fun, {})[minion] = value
+                self.hashes[minion][fun] = data_hash(value)
+            if stamp is not None:
+                self.stamps[minion] = stamp
+        return minion in self.hashes
+
+    def forget(self, minion):
+        """
+        Drop the in-memory entries of ``minion``.
+        """
+        self.stamps.pop(minion, None)
+        self.hashes.pop(minion, None)
+        for entries in six.itervalues(self.functions):
+            entries.pop(minion, None)
+
+    def has(self, minion, fun):
+        """
+        Return True if ``minion`` has mine data for ``fun``.
+        """
+        return minion in self.functions.get(fun, {})
+
+    def get(self, minion, fun):
+        """
+        Return the mine data of ``minion`` for ``fun``.
+        """
+        return self.functions.get(fun, {}).get(minion)
+
+    def version(self, minion, functions):
+        """
+        Return the version of the entries of ``minion`` for ``functions``.
+        """
+        hashes = self.hashes.get(minion, {})
+        return data_hash([hashes.get(fun) for fun in sorted(set(functions))])
@@ -12,6 +12,7 @@ import threading
 
 # Import Salt Libs
 import salt.payload
+import salt.utils.atomicfile
 import salt.utils.files
 import salt.utils.platform
 import salt.utils.process
@@ -42,6 +43,48 @@ def running(opts):
     return ret
 
 
+def _job_queue_path(opts):
+    return os.path.join(opts["cachedir"], "job_queue.p")
+
+
+def write_job_queue(opts, queued):
+    """
+    Record the jobs the minion queued until a process slot frees up
+    """
+    path = _job_queue_path(opts)
+    try:
+        if not queued:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        serial = salt.payload.Serial(opts)
+        with salt.utils.atomicfile.atomic_open(path, "wb") as fp_:
+            serial.dump({"pid": os.getpid(), "jobs": queued}, fp_)
+    except (IOError, OSError) as exc:
+        log.error("Unable to write the job queue to %s: %s", path, exc)
+
+
+def queued(opts):
+    """
+    Return the jobs waiting in the minion's job queue
+    """
+    path = _job_queue_path(opts)
+    serial = salt.payload.Serial(opts)
+    try:
+        with salt.utils.files.fopen(path, "rb") as fp_:
+            data = serial.load(fp_)
+    except (IOError, OSError):
+        return []
+    if (
+        not isinstance(data, dict)
+        or not data.get("pid")
+        or not salt.utils.process.os_is_running(data["pid"])
+    ):
+        # Left behind by a minion which is not running anymore
+        return []
+    return data.get("jobs", [])
+
+
 def cache_jobs(opts, jid, ret):
     """
     Write job information to cache
@@ -6,11 +6,18 @@ Functions which implement running reactor jobs
 
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import calendar
 import collections
+import copy
+import datetime
 import fnmatch
 import glob
 import logging
+import multiprocessing
+import os
+import re
 import time
+import zlib
 
 # Import salt libs
 import salt.client
@@ -24,6 +31,7 @@ import salt.utils.event
 import salt.utils.files
 import salt.utils.master
 import salt.utils.process
+import salt.utils.stringutils
 import salt.utils.yaml
 import salt.wheel
 import salt.defaults.exitcodes
@@ -31,6 +39,7 @@ from salt.utils.event import tagify
 
 # Import 3rd-party libs
 from salt.ext import six
+from salt.ext.six.moves import queue
 
 log = logging.getLogger(__name__)
 
@@ -44,6 +53,88 @@ REACTOR_INTERNAL_KEYWORDS = frozenset([
     'state',
 ])
 
+# A reactor SLS file holding none of these is rendered the same for every event
+TEMPLATE_MARKERS = ("{{", "{%", "{#", "<%", "${")
+
+
+class TagMatcher(object):
+    """
+    Match event tags against the globs of the reactor map.
+
+    The globs are indexed by their literal prefix, the part before the first
+    wildcard. A tag is only matched against the globs whose prefix it starts
+    with, found with one lookup per distinct prefix length, instead of against
+    every glob of the map.
+    """
+
+    def __init__(self, react_map):
+        self.index = {}
+        for pos, ropt in enumerate(react_map or []):
+            if not isinstance(ropt, dict):
+                continue
+            if len(ropt) != 1:
+                continue
+            key = next(six.iterkeys(ropt))
+            val = ropt[key]
+            if not isinstance(key, six.string_types):
+                continue
+            if isinstance(val, six.string_types):
+                val = [val]
+            elif not isinstance(val, list):
+                val = []
+            prefix = re.split(r"[*?[]", key, 1)[0]
+            regex = re.compile(fnmatch.translate(key))
+            self.index.setdefault(prefix, []).append((pos, key, regex, val))
+        self.prefix_lens = sorted(set(len(prefix) for prefix in self.index))
+
+    def match(self, tag):
+        """
+        Return the ``(glob, reactors)`` pairs matching the tag, in the order
+        of the reactor map
+        """
+        matches = []
+        for length in self.prefix_lens:
+            if length > len(tag):
+                break
+            for entry in self.index.get(tag[:length], ()):
+                if entry[2].match(tag):
+                    matches.append(entry)
+        return [(entry[1], entry[3]) for entry in sorted(matches)]
+
+
+def _event_lag(data):
+    """
+    Return the seconds elapsed since the event was fired, or None if the event
+    carries no timestamp
+    """
+    stamp = data.get("_stamp") if isinstance(data, dict) else None
+    if not stamp:
+        return None
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            fired = datetime.datetime.strptime(stamp, fmt)
+        except (TypeError, ValueError):
+            continue
+        fired = calendar.timegm(fired.utctimetuple()) + fired.microsecond / 1e6
+        return time.time() - fired
+    return None
+
+
+def shard_index(tag, data, key, shards):
+    """
+    Return the index of the reactor shard handling the event. The key is the
+    colon-delimited path of the routing field, under ``tag`` for the parts of
+    the event tag and under ``data`` for the event data. Events without the
+    field go to the first shard.
+    """
+    value = salt.utils.data.traverse_dict_and_list(
+        {"tag": tag.split("/"), "data": data}, key
+    )
+    if value is None or shards <= 1:
+        return 0
+    value = salt.utils.stringutils.to_bytes(six.text_type(value))
+    return (zlib.crc32(value) & 0xFFFFFFFF) % shards
+
 
 class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
     """
@@ -67,6 +158,10 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
         self.stats = collections.defaultdict(lambda: {'mean': 0, 'latency': 0, 'runs': 0})
         self.stat_clock = time.time()
         self.is_leader = True
+        self.matcher = None
+        self.matcher_mtime = None
+        self.render_cache = {}
+        self.shards = []
 
     # We need __setstate__ and __getstate__ to avoid pickling errors since
     # 'self.rend' (from salt.state.Compiler) contains a function reference
@@ -99,6 +194,19 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
             self.stats = collections.defaultdict(lambda: {'mean': 0, 'latency': 0, 'runs': 0})
             self.stat_clock = end_time
 
+    def _update_stats(self, key, lag, duration=None):
+        """
+        Add an event to the stats of the key. The latency is the time between
+        the event being fired and the reactor reading it, the mean is the time
+        spent rendering and running its reactions.
+        """
+        stat = self.stats[key]
+        stat['runs'] += 1
+        if lag is not None:
+            stat['latency'] = (stat['latency'] * (stat['runs'] - 1) + lag) / stat['runs']
+        if duration is not None:
+            stat['mean'] = (stat['mean'] * (stat['runs'] - 1) + duration) / stat['runs']
+
     def render_reaction(self, glob_ref, tag, data):
         """
         Execute the render system against a single reaction file and return
@@ -117,18 +225,91 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
             )
         for fn_ in globbed_ref:
             try:
-                res = self.render_template(fn_, tag=tag, data=data)
-
-                # for #20841, inject the sls name here since verify_high()
-                # assumes it exists in case there are any errors
-                for name in res:
-                    res[name]["__sls__"] = fn_
+                try:
+                    stat = os.stat(fn_)
+                    sig = (stat.st_mtime, stat.st_size)
+                except OSError:
+                    sig = None
+                cached = self.render_cache.get(fn_)
+                if sig is not None and cached is not None and cached[0] == sig:
+                    res = cached[1]
+                else:
+                    res = None
+                if res is not None:
+                    res = copy.deepcopy(res)
+                else:
+                    res = self.render_template(fn_, tag=tag, data=data)
+
+                    # for #20841, inject the sls name here since verify_high()
+                    # assumes it exists in case there are any errors
+                    for name in res:
+                        res[name]["__sls__"] = fn_
+
+                    if sig is not None and (cached is None or cached[0] != sig):
+                        # Files without templating are only rendered once, the
+                        # others are remembered as such
+                        static = self._is_static_sls(fn_)
+                        self.render_cache[fn_] = (
+                            sig,
+                            copy.deepcopy(res) if static else None,
+                        )
 
                 react.update(res)
             except Exception:  # pylint: disable=broad-except
                 log.exception('Failed to render "%s": ', fn_)
         return react
 
+    @staticmethod
+    def _is_static_sls(fn_):
+        """
+        Return True if the reactor SLS file renders the same for every event
+        """
+        try:
+            with salt.utils.files.fopen(fn_, "r") as fp_:
+                contents = fp_.read()
+        except (OSError, IOError):
+            return False
+        if contents.startswith("#!") and contents.split("\n", 1)[0].strip() != "#!yaml":
+            return False
+        return not any(marker in contents for marker in TEMPLATE_MARKERS)
+
+    def _get_matcher(self):
+        """
+        Return the tag matcher of the reactor map, compiling it again when the
+        reactor map file changed
+        """
+        if isinstance(self.opts["reactor"], six.string_types):
+            try:
+                mtime = os.path.getmtime(self.opts["reactor"])
+            except OSError:
+                mtime = None
+            if self.matcher is None or mtime != self.matcher_mtime:
+                react_map = []
+                try:
+                    with salt.utils.files.fopen(self.opts["reactor"]) as fp_:
+                        react_map = salt.utils.yaml.safe_load(fp_)
+                except (OSError, IOError):
+                    log.error(
+                        'Failed to read reactor map: "%s"', self.opts["reactor"]
+                    )
+                except Exception:  # pylint: disable=broad-except
+                    log.error(
+                        'Failed to parse YAML in reactor map: "%s"',
+                        self.opts["reactor"],
+                    )
+                self.matcher = TagMatcher(react_map)
+                self.matcher_mtime = mtime
+        elif self.matcher is None:
+            self.matcher = TagMatcher(self.opts["reactor"])
+        return self.matcher
+
+    def match_reactors(self, tag):
+        """
+        Take in the tag from an event and return the ``(glob, reactors)``
+        pairs of the reactor map matching it
+        """
+        return self._get_matcher().match(tag)
+
     def list_reactors(self, tag):
         """
         Take in the tag from an event and return a list of the reactors to
@@ -136,30 +317,8 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
         """
         log.debug("Gathering reactors for tag %s", tag)
         reactors = []
-        if isinstance(self.opts["reactor"], six.string_types):
-            try:
-                with salt.utils.files.fopen(self.opts["reactor"]) as fp_:
-                    react_map = salt.utils.yaml.safe_load(fp_)
-            except (OSError, IOError):
-                log.error('Failed to read reactor map: "%s"', self.opts["reactor"])
-            except Exception:  # pylint: disable=broad-except
-                log.error(
-                    'Failed to parse YAML in reactor map: "%s"', self.opts["reactor"]
-                )
-        else:
-            react_map = self.opts["reactor"]
-        for ropt in react_map:
-            if not isinstance(ropt, dict):
-                continue
-            if len(ropt) != 1:
-                continue
-            key = next(six.iterkeys(ropt))
-            val = ropt[key]
-            if fnmatch.fnmatch(tag, key):
-                if isinstance(val, six.string_types):
-                    reactors.append(val)
-                elif isinstance(val, list):
-                    reactors.extend(val)
+        for _, val in self.match_reactors(tag):
+            reactors.extend(val)
         return reactors
 
     def list_all(self):
@@ -193,6 +352,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                 return {"status": False, "comment": "Reactor already exists."}
 
         self.minion.opts["reactor"].append({tag: reaction})
+        self.matcher = None
         return {"status": True, "comment": "Reactor added."}
 
     def delete_reactor(self, tag):
@@ -204,6 +364,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
             _tag = next(six.iterkeys(reactor))
             if _tag == tag:
                 self.minion.opts["reactor"].remove(reactor)
+                self.matcher = None
                 return {"status": True, "comment": "Reactor deleted."}
 
         return {"status": False, "comment": "Reactor does not exists."}
@@ -253,12 +414,119 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
         for chunk in chunks:
             self.wrap.run(chunk)
 
+    def handle_event(self, tag, data):
+        """
+        Render and run the reactions matching the event
+        """
+        lag = _event_lag(data)
+        start = time.time()
+        matches = self.match_reactors(tag)
+        reactors = []
+        for _, val in matches:
+            reactors.extend(val)
+        if reactors:
+            chunks = self.reactions(tag, data, reactors)
+            if chunks:
+                try:
+                    self.call_reactions(chunks)
+                except SystemExit:
+                    log.warning("Exit ignored by reactor")
+
+        if self.opts["master_stats"]:
+            self._update_stats("events", lag)
+            for glob_ref, _ in matches:
+                self._update_stats(glob_ref, lag, time.time() - start)
+            self._post_stats(self.stats)
+
+    def start_shards(self):
+        """
+        Start the reactor shard processes, each reading the events routed to
+        it from its own queue
+        """
+        for index in range(self.opts["reactor_shards"]):
+            shard_queue = multiprocessing.Queue(self.opts["reactor_worker_hwm"])
+            self.shards.append(self._start_shard(index, shard_queue))
+
+    def _start_shard(self, index, shard_queue):
+        shard = ReactorShard(
+            self.opts,
+            index,
+            shard_queue,
+            log_queue=self.log_queue,
+            log_queue_level=self.log_queue_level,
+        )
+        shard.start()
+        return shard
+
+    def dispatch(self, tag, data):
+        """
+        Pass the event on to the shard handling its key. Managing the reactor
+        map is passed on to every shard.
+        """
+        if tag.endswith("salt/reactors/manage/add") or tag.endswith(
+            "salt/reactors/manage/delete"
+        ):
+            targets = range(len(self.shards))
+        else:
+            targets = [
+                shard_index(
+                    tag, data, self.opts["reactor_shard_key"], len(self.shards)
+                )
+            ]
+        for index in targets:
+            shard = self.shards[index]
+            if not shard.is_alive():
+                log.warning(
+                    "Reactor shard %s exited with %s, restarting it",
+                    index,
+                    shard.exitcode,
+                )
+                shard = self.shards[index] = self._start_shard(index, shard.queue)
+            shard.queue.put((tag, data))
+
+    def shard_info(self):
+        """
+        Return the queue depth of each reactor shard
+        """
+        info = []
+        for shard in self.shards:
+            try:
+                depth = shard.queue.qsize()
+            except NotImplementedError:
+                # Not available on macOS
+                depth = None
+            info.append(
+                {"shard": shard.index, "depth": depth, "alive": shard.is_alive()}
+            )
+        return info
+
     def run(self):
         """
         Enter into the server loop
         """
         salt.utils.process.appendproctitle(self.__class__.__name__)
 
+        if self.opts.get("reactor_shards"):
+            self.start_shards()
+
+        try:
+            self._run()
+        finally:
+            self.stop_shards()
+
+    def stop_shards(self):
+        """
+        Ask the reactor shard processes to exit once they handled the events
+        already routed to them
+        """
+        for shard in self.shards:
+            try:
+                shard.queue.put_nowait(None)
+            except (queue.Full, EOFError, IOError, OSError):
+                # The shard notices the main reactor process went away
+                pass
+
+    def _run(self):
         # instantiate some classes inside our new process
         with salt.utils.event.get_event(
             self.opts["__role"],
@@ -306,30 +574,87 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                                            'user': self.wrap.event_user},
                                           'salt/reactors/manage/delete-complete')
                 elif data['tag'].endswith('salt/reactors/manage/list'):
-                    event.fire_event({'reactors': self.list_all(),
-                                           'user': self.wrap.event_user},
-                                          'salt/reactors/manage/list-results')
+                    results = {'reactors': self.list_all(),
+                               'user': self.wrap.event_user}
+                    if self.shards:
+                        results['shards'] = self.shard_info()
+                    event.fire_event(results, 'salt/reactors/manage/list-results')
 
                 # do not handle any reactions if not leader in cluster
                 if not self.is_leader:
                     continue
+                if self.shards:
+                    self.dispatch(data['tag'], data['data'])
                 else:
-                    # do not handle any reactions if not leader in cluster
-                    if not self.is_leader:
-                        continue
-                    chunks = self.reactions(data['tag'], data['data'], reactors)
-                    if chunks:
-                        if self.opts['master_stats']:
-                            _data = data['data']
-                            start = time.time()
-                        try:
-                            self.call_reactions(chunks)
-                        except SystemExit:
-                            log.warning('Exit ignored by reactor')
-
-                        if self.opts['master_stats']:
-                            stats = salt.utils.event.update_stats(self.stats, start, _data)
-                            self._post_stats(stats)
+                    self.handle_event(data['tag'], data['data'])
+
+
+class ReactorShard(Reactor):
+    """
+    A reactor process handling the events routed to it by the main reactor
+    process, in the order they were received
+    """
+
+    def __init__(self, opts, index, shard_queue, reactor_pid=None, **kwargs):
+        super(ReactorShard, self).__init__(opts, **kwargs)
+        self.index = index
+        self.queue = shard_queue
+        self.reactor_pid = os.getpid() if reactor_pid is None else reactor_pid
+
+    # These methods are only used when pickling so will not be used on
+    # non-Windows platforms.
+    def __setstate__(self, state):
+        ReactorShard.__init__(
+            self,
+            state["opts"],
+            state["index"],
+            state["queue"],
+            reactor_pid=state["reactor_pid"],
+            log_queue=state["log_queue"],
+            log_queue_level=state["log_queue_level"],
+        )
+
+    def __getstate__(self):
+        return {
+            "opts": self.opts,
+            "index": self.index,
+            "queue": self.queue,
+            "reactor_pid": self.reactor_pid,
+            "log_queue": self.log_queue,
+            "log_queue_level": self.log_queue_level,
+        }
+
+    def run(self):
+        """
+        Handle the events from the queue, until the main reactor process puts
+        None on it or goes away
+        """
+        salt.utils.process.appendproctitle(
+            "{0}-{1}".format(self.__class__.__name__, self.index)
+        )
+        self.wrap = ReactWrap(self.opts)
+        while True:
+            try:
+                item = self.queue.get(timeout=5)
+            except queue.Empty:
+                if not salt.utils.process.os_is_running(self.reactor_pid):
+                    log.debug(
+                        "The main reactor process went away, stopping %s-%s",
+                        self.__class__.__name__,
+                        self.index,
+                    )
+                    break
+                continue
+            except (EOFError, IOError, OSError):
+                break
+            if item is None:
+                break
+            tag, data = item
+            if tag.endswith("salt/reactors/manage/add"):
+                self.add_reactor(data["event"], data["reactors"])
+            elif tag.endswith("salt/reactors/manage/delete"):
+                self.delete_reactor(data["event"])
+            self.handle_event(tag, data)
 
 
 class ReactWrap(object):
@@ -16,6 +16,7 @@ from __future__ import absolute_import, print_function, unicode_literals, with_s
 import copy
 import datetime
 import errno
+import heapq
 import itertools
 import logging
 import os
@@ -155,6 +156,13 @@ class Schedule(object):
         self.skip_during_range = None
         self.splay = None
         self.enabled = True
+        # Jobs which are not due before a known time, kept in a min-heap of
+        # (time, name) so eval only pops the ones which became due
+        self._heap = []
+        self._deferred = {}
+        # Parsed date strings, relative ones depend on the current day
+        self._parsed = {}
+        self._parsed_day = None
         if isinstance(intervals, dict):
             self.intervals = intervals
         else:
@@ -268,6 +276,62 @@ class Schedule(object):
                             return data
         return data
 
+    def _parse_time(self, value):
+        """
+        Parse a date string, reusing the result for the rest of the day
+        """
+        if not isinstance(value, six.string_types):
+            return dateutil_parser.parse(value)
+        today = datetime.date.today()
+        if self._parsed_day != today:
+            self._parsed = {}
+            self._parsed_day = today
+        if value not in self._parsed:
+            self._parsed[value] = dateutil_parser.parse(value)
+        return self._parsed[value]
+
+    def _defer(self, name, data):
+        """
+        Keep a job out of eval until its next fire time, if nothing but the
+        passing of time can make it run before then
+        """
+        if (
+            self.standalone
+            or not data.get("enabled", True)
+            or not ("_seconds" in data or "cron" in data)
+            or not data.get("_next_fire_time")
+            or any(
+                data.get(item)
+                for item in (
+                    "splay",
+                    "_splay",
+                    "_run_on_start",
+                    "_skipped",
+                    "_skip_reason",
+                    "_error",
+                )
+            )
+            or any(item in data for item in ("run_explicit", "once", "when"))
+        ):
+            return
+        next_fire_time = data["_next_fire_time"]
+        heapq.heappush(
+            self._heap,
+            (
+                next_fire_time
+                - datetime.timedelta(microseconds=next_fire_time.microsecond),
+                name,
+            ),
+        )
+        self._deferred[name] = data
+
+    def _reset_deferred(self):
+        """
+        Evaluate all jobs again on the next eval, after the schedule changed
+        """
+        self._heap = []
+        self._deferred = {}
+
     def persist(self):
         """
         Persist the modified schedule into <<configdir>>/<<default_include>>/_schedule.conf
@@ -311,6 +375,7 @@ class Schedule(object):
         """
         Deletes a job from the scheduler. Ignore jobs from pillar
         """
+        self._reset_deferred()
         # ensure job exists, then delete it
         if name in self.opts["schedule"]:
             del self.opts["schedule"][name]
@@ -335,6 +400,7 @@ class Schedule(object):
         """
         Reset the scheduler to defaults
         """
+        self._reset_deferred()
         self.skip_function = None
         self.skip_during_range = None
         self.enabled = True
@@ -345,6 +411,7 @@ class Schedule(object):
         """
         Deletes a job from the scheduler. Ignores jobs from pillar
         """
+        self._reset_deferred()
         # ensure job exists, then delete it
         for job in list(self.opts["schedule"].keys()):
             if job.startswith(name):
@@ -374,6 +441,7 @@ class Schedule(object):
         the configuration file. See the docs on how YAML is interpreted into
         python data-structures to make sure, you pass correct dictionaries.
         """
+        self._reset_deferred()
 
         # we don't do any checking here besides making sure its a dict.
         # eval() already does for us and raises errors accordingly
@@ -415,6 +483,7 @@ class Schedule(object):
         """
         Enable a job in the scheduler. Ignores jobs from pillar
         """
+        self._reset_deferred()
         # ensure job exists, then enable it
         if name in self.opts["schedule"]:
             self.opts["schedule"][name]["enabled"] = True
@@ -436,6 +505,7 @@ class Schedule(object):
         """
         Disable a job in the scheduler. Ignores jobs from pillar
         """
+        self._reset_deferred()
         # ensure job exists, then disable it
         if name in self.opts["schedule"]:
             self.opts["schedule"][name]["enabled"] = False
@@ -457,6 +527,7 @@ class Schedule(object):
         """
         Modify a job in the scheduler. Ignores jobs from pillar
         """
+        self._reset_deferred()
         # ensure job exists, then replace it
         if name in self.opts["schedule"]:
             self.delete_job(name, persist)
@@ -509,6 +580,7 @@ class Schedule(object):
         """
         Enable the scheduler.
         """
+        self._reset_deferred()
         self.opts["schedule"]["enabled"] = True
 
         # Fire the complete event back along with updated list of schedule
@@ -521,6 +593,7 @@ class Schedule(object):
         '''
         Disable the scheduler.
         """
+        self._reset_deferred()
         self.opts["schedule"]["enabled"] = False
 
         # Fire the complete event back along with updated list of schedule
@@ -533,6 +606,7 @@ class Schedule(object):
         """
         Reload the schedule from saved schedule file.
         """
+        self._reset_deferred()
         # Remove all jobs from self.intervals
         self.intervals = {}
 
@@ -573,6 +647,7 @@ class Schedule(object):
         Postpone a job in the scheduler.
         Ignores jobs from pillar
         """
+        self._reset_deferred()
         time = data["time"]
         new_time = data["new_time"]
         time_fmt = data.get("time_fmt", "%Y-%m-%dT%H:%M:%S")
@@ -606,6 +681,7 @@ class Schedule(object):
         Skip a job at a specific time in the scheduler.
         Ignores jobs from pillar
         """
+        self._reset_deferred()
         time = data["time"]
         time_fmt = data.get("time_fmt", "%Y-%m-%dT%H:%M:%S")
 
@@ -1074,7 +1150,7 @@ class Schedule(object):
 
                 if not isinstance(when_, datetime.datetime):
                     try:
-                        when_ = dateutil_parser.parse(when_)
+                        when_ = self._parse_time(when_)
                     except ValueError:
                         data['_error'] = ('Invalid date string {0}. '
                                           'Ignoring job {1}.'.format(i, data['name']))
@@ -1148,9 +1224,7 @@ class Schedule(object):
                     data["_next_fire_time"] = croniter.croniter(
                         data["cron"], now
                     ).get_next(datetime.datetime)
-                    data["_next_scheduled_fire_time"] = croniter.croniter(
-                        data["cron"], now
-                    ).get_next(datetime.datetime)
+                    data["_next_scheduled_fire_time"] = data["_next_fire_time"]
                 except (ValueError, KeyError):
                     data["_error"] = "Invalid cron string. " "Ignoring job {0}.".format(
                         data["name"]
@@ -1252,7 +1326,7 @@ class Schedule(object):
             end = data["skip_during_range"]["end"]
             if not isinstance(start, datetime.datetime):
                 try:
-                    start = dateutil_parser.parse(start)
+                    start = self._parse_time(start)
                 except ValueError:
                     data["_error"] = (
                         "Invalid date string for start in "
@@ -1264,7 +1338,7 @@ class Schedule(object):
 
             if not isinstance(end, datetime.datetime):
                 try:
-                    end = dateutil_parser.parse(end)
+                    end = self._parse_time(end)
                 except ValueError:
                     data["_error"] = (
                         "Invalid date string for end in "
@@ -1331,7 +1405,7 @@ class Schedule(object):
             end = data["range"]["end"]
             if not isinstance(start, datetime.datetime):
                 try:
-                    start = dateutil_parser.parse(start)
+                    start = self._parse_time(start)
                 except ValueError:
                     data["_error"] = (
                         "Invalid date string for start. "
@@ -1342,7 +1416,7 @@ class Schedule(object):
 
             if not isinstance(end, datetime.datetime):
                 try:
-                    end = dateutil_parser.parse(end)
+                    end = self._parse_time(end)
                 except ValueError:
                     data["_error"] = (
                         "Invalid date string for end."
@@ -1389,7 +1463,7 @@ class Schedule(object):
 
             after = data["after"]
             if not isinstance(after, datetime.datetime):
-                after = dateutil_parser.parse(after)
+                after = self._parse_time(after)
 
             if after >= now:
                 log.debug("After time has not passed skipping job: %s.", data["name"])
@@ -1413,7 +1487,7 @@ class Schedule(object):
 
             until = data["until"]
             if not isinstance(until, datetime.datetime):
-                until = dateutil_parser.parse(until)
+                until = self._parse_time(until)
 
             if until <= now:
                 log.debug("Until time has passed skipping job: %s.", data["name"])
@@ -1442,6 +1516,13 @@ class Schedule(object):
         if "splay" in schedule:
             self.splay = schedule["splay"]
 
+        if not now:
+            now = datetime.datetime.now()
+
+        # Evaluate the deferred jobs which became due
+        while self._heap and self._heap[0][0] <= now:
+            self._deferred.pop(heapq.heappop(self._heap)[1], None)
+
         _hidden = ["enabled", "skip_function", "skip_during_range", "splay"]
         for job, data in six.iteritems(schedule):
 
@@ -1449,6 +1530,10 @@ class Schedule(object):
             if job in _hidden:
                 continue
 
+            # Skip the jobs which are not due yet, unless they were replaced
+            if self.enabled and self._deferred.get(job) is data:
+                continue
+
             # Clear these out between runs
             for item in [
                 "_continue",
@@ -1504,9 +1589,6 @@ class Schedule(object):
             ):
                 data["_run_on_start"] = True
 
-            if not now:
-                now = datetime.datetime.now()
-
             # Used for quick lookups when detecting invalid option
             # combinations.
             schedule_keys = set(data.keys())
@@ -1771,6 +1853,9 @@ class Schedule(object):
                             seconds=data["_seconds"]
                         )
 
+            if self.enabled:
+                self._defer(job, data)
+
     def _run_job(self, func, data):
         job_dry_run = data.get("dry_run", False)
         if job_dry_run:
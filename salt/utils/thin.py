@@ -7,6 +7,7 @@ Generate the salt thin tarball from the installed python files
 from __future__ import absolute_import, print_function, unicode_literals
 
 import copy
+import hashlib
 import logging
 import os
 import shutil
@@ -363,6 +364,74 @@ def _get_thintar_prefix(tarname):
     return tmp_tarname
 
 
+def _get_tops_py_version_mapping(
+    extra_mods="", so_mods="", python2_bin="python2", python3_bin="python3"
+):
+    """
+    Collect the tops for the running Python and for the alternative major
+    Python version, if its binary is available.
+    """
+    tops_failure_msg = "Failed %s tops for Python binary %s."
+    python_check_msg = (
+        "%s binary does not exist. Will not attempt to generate tops for Python %s"
+    )
+    tops_py_version_mapping = {}
+    tops = get_tops(extra_mods=extra_mods, so_mods=so_mods)
+    tops_py_version_mapping[sys.version_info.major] = tops
+
+    # Collect tops, alternative to 2.x version
+    if _six.PY2 and sys.version_info.major == 2:
+        # Get python 3 tops
+        if not salt.utils.path.which(python3_bin):
+            log.debug(python_check_msg, python3_bin, "3")
+        else:
+            py_shell_cmd = "{0} -c 'import salt.utils.thin as t;print(t.gte())' '{1}'".format(
+                python3_bin,
+                salt.utils.json.dumps({"extra_mods": extra_mods, "so_mods": so_mods}),
+            )
+            cmd = subprocess.Popen(
+                py_shell_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True
+            )
+            stdout, stderr = cmd.communicate()
+            if cmd.returncode == 0:
+                try:
+                    tops = salt.utils.json.loads(stdout)
+                    tops_py_version_mapping["3"] = tops
+                except ValueError as err:
+                    log.error(tops_failure_msg, "parsing", python3_bin)
+                    log.exception(err)
+            else:
+                log.debug(tops_failure_msg, "collecting", python3_bin)
+                log.debug(stderr)
+
+    # Collect tops, alternative to 3.x version
+    if _six.PY3 and sys.version_info.major == 3:
+        # Get python 2 tops
+        if not salt.utils.path.which(python2_bin):
+            log.debug(python_check_msg, python2_bin, "2")
+        else:
+            py_shell_cmd = "{0} -c 'import salt.utils.thin as t;print(t.gte())' '{1}'".format(
+                python2_bin,
+                salt.utils.json.dumps({"extra_mods": extra_mods, "so_mods": so_mods}),
+            )
+            cmd = subprocess.Popen(
+                py_shell_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True
+            )
+            stdout, stderr = cmd.communicate()
+            if cmd.returncode == 0:
+                try:
+                    tops = salt.utils.json.loads(stdout.decode("utf-8"))
+                    tops_py_version_mapping["2"] = tops
+                except ValueError as err:
+                    log.error(tops_failure_msg, "parsing", python2_bin)
+                    log.exception(err)
+            else:
+                log.debug(tops_failure_msg, "collecting", python2_bin)
+                log.debug(stderr)
+
+    return tops_py_version_mapping
+
+
 def gen_thin(
     cachedir,
     extra_mods="",
@@ -467,63 +536,12 @@ def gen_thin(
                 log.debug("Unable to detect %s version", python2_bin)
                 log.debug(stdout)
 
-    tops_failure_msg = "Failed %s tops for Python binary %s."
-    python_check_msg = (
-        "%s binary does not exist. Will not attempt to generate tops for Python %s"
+    tops_py_version_mapping = _get_tops_py_version_mapping(
+        extra_mods=extra_mods,
+        so_mods=so_mods,
+        python2_bin=python2_bin,
+        python3_bin=python3_bin,
     )
-    tops_py_version_mapping = {}
-    tops = get_tops(extra_mods=extra_mods, so_mods=so_mods)
-    tops_py_version_mapping[sys.version_info.major] = tops
-
-    # Collect tops, alternative to 2.x version
-    if _six.PY2 and sys.version_info.major == 2:
-        # Get python 3 tops
-        if not salt.utils.path.which(python3_bin):
-            log.debug(python_check_msg, python3_bin, "3")
-        else:
-            py_shell_cmd = "{0} -c 'import salt.utils.thin as t;print(t.gte())' '{1}'".format(
-                python3_bin,
-                salt.utils.json.dumps({"extra_mods": extra_mods, "so_mods": so_mods}),
-            )
-            cmd = subprocess.Popen(
-                py_shell_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True
-            )
-            stdout, stderr = cmd.communicate()
-            if cmd.returncode == 0:
-                try:
-                    tops = salt.utils.json.loads(stdout)
-                    tops_py_version_mapping["3"] = tops
-                except ValueError as err:
-                    log.error(tops_failure_msg, "parsing", python3_bin)
-                    log.exception(err)
-            else:
-                log.debug(tops_failure_msg, "collecting", python3_bin)
-                log.debug(stderr)
-
-    # Collect tops, alternative to 3.x version
-    if _six.PY3 and sys.version_info.major == 3:
-        # Get python 2 tops
-        if not salt.utils.path.which(python2_bin):
-            log.debug(python_check_msg, python2_bin, "2")
-        else:
-            py_shell_cmd = "{0} -c 'import salt.utils.thin as t;print(t.gte())' '{1}'".format(
-                python2_bin,
-                salt.utils.json.dumps({"extra_mods": extra_mods, "so_mods": so_mods}),
-            )
-            cmd = subprocess.Popen(
-                py_shell_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True
-            )
-            stdout, stderr = cmd.communicate()
-            if cmd.returncode == 0:
-                try:
-                    tops = salt.utils.json.loads(stdout.decode("utf-8"))
-                    tops_py_version_mapping["2"] = tops
-                except ValueError as err:
-                    log.error(tops_failure_msg, "parsing", python2_bin)
-                    log.exception(err)
-            else:
-                log.debug(tops_failure_msg, "collecting", python2_bin)
-                log.debug(stderr)
 
     with salt.utils.files.fopen(pymap_cfg, "wb") as fp_:
         fp_.write(
@@ -678,6 +696,214 @@ def thin_sum(cachedir, form="sha1"):
     return code_checksum, salt.utils.hashutils.get_hash(thintar, form)
 
 
+def _thin_layer_files(top, site_pkg_dir):
+    """
+    Return the sorted ``(path, arcname)`` pairs of the files of a thin top.
+    """
+    top_dirname = os.path.dirname(top)
+    if not os.path.isdir(top):
+        # top is a single file module
+        if os.path.exists(top):
+            return [(top, os.path.join(site_pkg_dir, os.path.basename(top)))]
+        return []
+    files = []
+    for root, dirs, names in salt.utils.path.os_walk(top, followlinks=True):
+        for name in names:
+            if not name.endswith((".pyc", ".pyo")):
+                path = os.path.join(root, name)
+                arcname = os.path.join(site_pkg_dir, os.path.relpath(path, top_dirname))
+                files.append((path, arcname))
+    return sorted(files, key=lambda item: item[1])
+
+
+def _gen_thin_layer(layerdir, files, roots, known_sums):
+    """
+    Pack the files into the layer named after their digest, unless that layer
+    already exists, and return its manifest entry.
+    """
+    digest = hashlib.sha256()
+    for path, arcname in files:
+        digest.update(salt.utils.stringutils.to_bytes(arcname))
+        with salt.utils.files.fopen(path, "rb") as ifile:
+            for chunk in iter(lambda: ifile.read(0x10000), b""):
+                digest.update(chunk)
+    layer_id = digest.hexdigest()
+    layer_path = os.path.join(layerdir, "{0}.tgz".format(layer_id))
+    layer_sum = known_sums.get(layer_id)
+    if not os.path.isfile(layer_path):
+        log.debug('Packing thin layer "%s" for %s', layer_id, ", ".join(roots))
+        tmp_layer = _get_thintar_prefix(layer_path)
+        tfp = tarfile.open(tmp_layer, "w:gz", dereference=True)
+        try:
+            for path, arcname in files:
+                tfp.add(path, arcname=arcname)
+        finally:
+            tfp.close()
+        shutil.move(tmp_layer, layer_path)
+        layer_sum = None
+    if layer_sum is None:
+        layer_sum = salt.utils.hashutils.get_hash(layer_path, "sha1")
+    return {"id": layer_id, "sum": layer_sum, "roots": sorted(roots)}
+
+
+def thin_manifest(cachedir):
+    """
+    Return the manifest of the layered salt-thin bundle, or an empty dict if
+    it has not been generated
+    """
+    manifest_path = os.path.join(cachedir, "thin", "manifest.json")
+    if not os.path.isfile(manifest_path):
+        return {}
+    try:
+        with salt.utils.files.fopen(manifest_path, "r") as fh_:
+            return salt.utils.json.load(fh_)
+    except (IOError, OSError, ValueError) as exc:
+        log.debug("Unable to read the thin manifest %s: %s", manifest_path, exc)
+        return {}
+
+
+def gen_thin_layers(
+    cachedir,
+    extra_mods="",
+    overwrite=False,
+    so_mods="",
+    python2_bin="python2",
+    python3_bin="python3",
+    absonly=True,
+    extended_cfg=None,
+):
+    """
+    Generate the salt-thin bundle as content-addressed layers and return the
+    location of its manifest.
+
+    Every top (Salt, each of its dependencies and each of the ``extra_mods``)
+    is packed into its own tarball in ``<cachedir>/thin/layers``, named after
+    the digest of its files. Layers whose files did not change are reused, so
+    only the changed tops are packed again. The last layer holds ``salt-call``
+    and the version files. The manifest lists the layers with the checksum of
+    their tarball and the paths they unpack to, which lets ``salt-ssh`` send a
+    target only the layers it is missing.
+    """
+    thindir = os.path.join(cachedir, "thin")
+    layerdir = os.path.join(thindir, "layers")
+    if not os.path.isdir(layerdir):
+        os.makedirs(layerdir)
+    manifest_path = os.path.join(thindir, "manifest.json")
+    inputs = {
+        "version": salt.version.__version__,
+        "py_version": sys.version_info.major,
+        "extra_mods": extra_mods or "",
+        "so_mods": so_mods or "",
+        "extended_cfg": extended_cfg or {},
+    }
+    old_manifest = thin_manifest(cachedir)
+    layer_paths = [
+        os.path.join(layerdir, "{0}.tgz".format(layer["id"]))
+        for layer in old_manifest.get("layers", [])
+    ]
+    if (
+        not overwrite
+        and old_manifest.get("inputs") == inputs
+        and all(os.path.isfile(path) for path in layer_paths)
+    ):
+        return manifest_path
+    known_sums = dict(
+        (layer["id"], layer["sum"]) for layer in old_manifest.get("layers", [])
+    )
+
+    tops_py_version_mapping = _get_tops_py_version_mapping(
+        extra_mods=extra_mods,
+        so_mods=so_mods,
+        python2_bin=python2_bin,
+        python3_bin=python3_bin,
+    )
+    tops = []
+    for py_ver in sorted(tops_py_version_mapping, key=str):
+        for top in tops_py_version_mapping[py_ver]:
+            if absonly and not os.path.isabs(top):
+                continue
+            site_pkg_dir = (
+                _is_shareable(os.path.basename(top)) and "pyall" or "py{0}".format(py_ver)
+            )
+            tops.append((top, site_pkg_dir))
+    for ns, cfg in _six.iteritems(get_ext_tops(extended_cfg)):
+        py_ver_major = cfg.get("py-version")[0]
+        for top in [cfg.get("path")] + cfg.get("dependencies"):
+            site_pkg_dir = (
+                _is_shareable(os.path.basename(top))
+                and "pyall"
+                or "py{0}".format(py_ver_major)
+            )
+            tops.append((top, os.path.join(ns, site_pkg_dir)))
+
+    layers = []
+    for top, site_pkg_dir in tops:
+        tempdir = None
+        if not os.path.isdir(os.path.dirname(top)):
+            # This is likely a compressed python .egg
+            tempdir = tempfile.mkdtemp()
+            egg = zipfile.ZipFile(os.path.dirname(top))
+            egg.extractall(tempdir)
+            top = os.path.join(tempdir, os.path.basename(top))
+        try:
+            files = _thin_layer_files(top, site_pkg_dir)
+            if not files:
+                continue
+            root = os.path.join(site_pkg_dir, os.path.basename(top))
+            layer = _gen_thin_layer(layerdir, files, [root], known_sums)
+        finally:
+            if tempdir is not None:
+                shutil.rmtree(tempdir)
+        if layer["id"] not in [known["id"] for known in layers]:
+            layers.append(layer)
+
+    code_checksum = hashlib.sha256()
+    for layer in layers:
+        code_checksum.update(salt.utils.stringutils.to_bytes(layer["id"]))
+    code_checksum = code_checksum.hexdigest()
+
+    # The files of the last layer are the same as at the root of thin.tgz
+    metadir = tempfile.mkdtemp(dir=thindir)
+    try:
+        meta = {
+            "salt-call": _get_salt_call("pyall", **_get_ext_namespaces(extended_cfg)),
+            "supported-versions": _get_supported_py_config(
+                tops=tops_py_version_mapping, extended_cfg=extended_cfg
+            ),
+            "version": salt.version.__version__,
+            ".thin-gen-py-version": str(
+                sys.version_info.major
+            ),  # future lint: disable=blacklisted-function
+            "code-checksum": code_checksum + os.linesep,
+        }
+        files = []
+        for fname in sorted(meta):
+            path = os.path.join(metadir, fname)
+            with salt.utils.files.fopen(path, "wb") as fp_:
+                fp_.write(salt.utils.stringutils.to_bytes(meta[fname]))
+            files.append((path, fname))
+        layers.append(_gen_thin_layer(layerdir, files, sorted(meta), known_sums))
+    finally:
+        shutil.rmtree(metadir)
+
+    manifest = {"inputs": inputs, "code_checksum": code_checksum, "layers": layers}
+    tmp_manifest = _get_thintar_prefix(manifest_path)
+    with salt.utils.files.fopen(tmp_manifest, "w") as fp_:
+        salt.utils.json.dump(manifest, fp_)
+    shutil.move(tmp_manifest, manifest_path)
+
+    # Drop the layers the new manifest does not use anymore
+    keep = set("{0}.tgz".format(layer["id"]) for layer in layers)
+    for fname in os.listdir(layerdir):
+        if fname.endswith(".tgz") and not fname.startswith(".") and fname not in keep:
+            try:
+                os.remove(os.path.join(layerdir, fname))
+            except OSError as exc:
+                log.debug("Unable to remove the thin layer %s: %s", fname, exc)
+
+    return manifest_path
+
+
 def gen_min(
     cachedir,
     extra_mods="",
@@ -133,6 +133,7 @@ class AsyncBatchTestCase(AsyncTestCase, TestCase):
                     'done_minions': set(),
                     'down_minions': set(),
                     'timedout_minions': set(),
+                    'latency': self.batch.latency.to_dict(),
                     'metadata': self.batch.metadata
                 },
                 "salt/batch/1235/done"
@@ -259,13 +260,42 @@ class AsyncBatchTestCase(AsyncTestCase, TestCase):
             unpack=MagicMock(return_value=('salt/job/1235/ret/foo', {'id': 'foo'})))
         self.batch.start()
         self.batch.active = {'foo'}
-        self.batch._BatchAsync__event_handler(MagicMock())
+        self.batch.started = {'foo': 0}
+        with patch('time.time', MagicMock(return_value=3)):
+            self.batch._BatchAsync__event_handler(MagicMock())
         self.assertEqual(self.batch.active, set())
         self.assertEqual(self.batch.done_minions, {'foo'})
+        self.assertEqual(
+            self.batch.event.io_loop.spawn_callback.call_args[0],
+            (self.batch.schedule_next,))
+        self.assertEqual(self.batch.latency.to_dict()['histogram']['<=5'], 1)
+        progress = self.batch.event.fire_event.call_args[0]
+        self.assertEqual(progress[1], 'salt/batch/1235/progress')
+        self.assertEqual(progress[0]['minion'], 'foo')
+        self.assertEqual(progress[0]['done'], 1)
+
+    def test_batch__event_handler_batch_run_return_batch_delay(self):
+        self.batch.event = MagicMock(
+            unpack=MagicMock(return_value=('salt/job/1235/ret/foo', {'id': 'foo'})))
+        self.batch.start()
+        self.batch.batch_delay = 1
+        self.batch.active = {'foo'}
+        self.batch._BatchAsync__event_handler(MagicMock())
         self.assertEqual(
             self.batch.event.io_loop.call_later.call_args[0],
             (self.batch.batch_delay, self.batch.schedule_next))
 
+    def test_batch__event_handler_heartbeat(self):
+        self.batch.event = MagicMock(
+            unpack=MagicMock(return_value=(
+                'salt/job/1235/heartbeat/foo', {'id': 'foo', 'heartbeat': 5})))
+        self.batch.start()
+        self.batch.active = {'foo'}
+        with patch('time.time', MagicMock(return_value=100)):
+            self.batch._BatchAsync__event_handler(MagicMock())
+        self.assertEqual(self.batch.heartbeats, {'foo': 110})
+        self.assertEqual(self.batch.active, {'foo'})
+
     def test_batch__event_handler_find_job_return(self):
         self.batch.event = MagicMock(
             unpack=MagicMock(return_value=('salt/job/1236/ret/foo', {'id': 'foo'})))
@@ -315,6 +345,73 @@ class AsyncBatchTestCase(AsyncTestCase, TestCase):
             (self.batch.opts['gather_job_timeout'], self.batch.check_find_job, {'foo'})
         )
 
+    @tornado.testing.gen_test
+    def test_batch_find_job_heartbeat(self):
+        self.batch.event = MagicMock()
+        self.batch.heartbeats = {'foo': 110}
+        future = tornado.gen.Future()
+        future.set_result({})
+        self.batch.local.run_job_async.return_value = future
+        with patch('time.time', MagicMock(return_value=100)):
+            self.batch.find_job({'foo', 'bar'})
+        # only the minion without heartbeat is pinged
+        self.assertEqual(
+            self.batch.local.run_job_async.call_args[0][0], {'bar'})
+        self.assertEqual(
+            self.batch.event.io_loop.call_later.call_args[0],
+            (self.batch.opts['gather_job_timeout'], self.batch.check_find_job, {'foo', 'bar'})
+        )
+
+    def test_batch__event_handler_find_job_not_running(self):
+        self.batch.event = MagicMock(
+            unpack=MagicMock(return_value=(
+                'salt/job/1236/ret/foo', {'id': 'foo', 'return': {}})))
+        self.batch.start()
+        self.batch._BatchAsync__event_handler(MagicMock())
+        self.assertEqual(self.batch.find_job_returned, set())
+
+    def test_batch_check_find_job_heartbeat(self):
+        self.batch.event = MagicMock()
+        self.batch.active = {'foo'}
+        self.batch.find_job_returned = set()
+        self.batch.heartbeats = {'foo': 110}
+        with patch('time.time', MagicMock(return_value=100)):
+            self.batch.check_find_job({'foo'})
+        self.assertEqual(self.batch.timedout_minions, set())
+        self.assertEqual(
+            self.batch.event.io_loop.add_callback.call_args[0],
+            (self.batch.find_job, {'foo'})
+        )
+
+    @tornado.testing.gen_test
+    def test_batch_start_from_minion_data_cache(self):
+        self.batch.event = MagicMock()
+        self.batch.use_minion_data_cache = True
+        self.batch.opts['batch'] = '1'
+        future = tornado.gen.Future()
+        future.set_result(None)
+        self.batch.schedule_next = MagicMock(return_value=future)
+        with patch('salt.cli.batch_async.batch_get_minions_from_cache',
+                   MagicMock(return_value=({'foo'}, {'bar'}))):
+            yield self.batch.start()
+        # no test.ping
+        self.assertEqual(len(self.batch.local.run_job_async.mock_calls), 0)
+        self.assertEqual(self.batch.minions, {'foo'})
+        self.assertEqual(self.batch.down_minions, {'bar'})
+        self.assertTrue(self.batch.initialized)
+
+    def test_batch_latency(self):
+        self.batch.latency.add(0.2)
+        self.batch.latency.add(3)
+        self.batch.latency.add(1000)
+        latency = self.batch.latency.to_dict()
+        self.assertEqual(latency['count'], 3)
+        self.assertEqual(latency['min'], 0.2)
+        self.assertEqual(latency['max'], 1000)
+        self.assertEqual(latency['histogram']['<=0.5'], 1)
+        self.assertEqual(latency['histogram']['<=5'], 1)
+        self.assertEqual(latency['histogram']['>600'], 1)
+
     def test_batch_check_find_job_did_not_return(self):
         self.batch.event = MagicMock()
         self.batch.active = {'foo'}
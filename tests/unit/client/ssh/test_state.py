@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+# Import python libs
+from __future__ import absolute_import
+
+import os
+import shutil
+import tarfile
+import tempfile
+
+# Import Salt libs
+import salt.client.ssh.state
+import salt.utils.files
+
+# Import Salt Testing libs
+from tests.support.mock import MagicMock
+from tests.support.runtests import RUNTIME_VARS
+from tests.support.unit import TestCase
+
+
+class PrepTransBundleTests(TestCase):
+    def setUp(self):
+        if not os.path.isdir(RUNTIME_VARS.TMP):
+            os.makedirs(RUNTIME_VARS.TMP)
+        self.tmpdir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        self.motd = os.path.join(self.tmpdir, "motd")
+        with salt.utils.files.fopen(self.motd, "w") as fp_:
+            fp_.write("hello\n")
+
+        def cache_file(name, saltenv, cachedir=None):
+            if name == "salt://motd":
+                return self.motd
+            return ""
+
+        self.file_client = MagicMock()
+        self.file_client.opts = {"cachedir": os.path.join(self.tmpdir, "cache")}
+        self.file_client.cache_file = cache_file
+        self.file_client.cache_dir = MagicMock(return_value=[])
+
+    def _names(self, path):
+        with tarfile.open(path, "r:gz") as tfp:
+            return sorted(tfp.getnames())
+
+    def test_prep_trans_bundle(self):
+        """
+        Test targets using the same files share the bundle, and only their
+        low state data and pillar differ.
+        """
+        chunks = [{"state": "file", "fun": "managed", "source": "salt://motd"}]
+        bundle_one, overlay_one = salt.client.ssh.state.prep_trans_bundle(
+            self.file_client, chunks, {"base": [["salt://motd"]]}, {"a": 1}, "one"
+        )
+        self.addCleanup(os.remove, overlay_one)
+        bundle_two, overlay_two = salt.client.ssh.state.prep_trans_bundle(
+            self.file_client, chunks, {"base": [["salt://motd"]]}, {"a": 2}, "two"
+        )
+        self.addCleanup(os.remove, overlay_two)
+
+        self.assertEqual(bundle_one, bundle_two)
+        self.assertEqual(
+            os.path.dirname(bundle_one),
+            os.path.join(self.tmpdir, "cache", "ssh_state_bundles"),
+        )
+        self.assertEqual(self._names(bundle_one), ["base", "base/motd"])
+        self.assertNotEqual(overlay_one, overlay_two)
+        self.assertEqual(self._names(overlay_one), ["lowstate.json", "pillar.json"])
+
+        # A changed file makes a new bundle
+        with salt.utils.files.fopen(self.motd, "w") as fp_:
+            fp_.write("bye\n")
+        bundle_three, overlay_three = salt.client.ssh.state.prep_trans_bundle(
+            self.file_client, chunks, {"base": [["salt://motd"]]}, {"a": 1}, "one"
+        )
+        self.addCleanup(os.remove, overlay_three)
+        self.assertNotEqual(bundle_one, bundle_three)
+
+    def test_prep_trans_tar(self):
+        """
+        Test the single package holds both the files and the target data.
+        """
+        chunks = [{"state": "file", "fun": "managed", "source": "salt://motd"}]
+        trans_tar = salt.client.ssh.state.prep_trans_tar(
+            self.file_client, chunks, {"base": [["salt://motd"]]}, {"a": 1}, "one"
+        )
+        self.addCleanup(os.remove, trans_tar)
+        self.assertEqual(
+            self._names(trans_tar),
+            ["base", "base/motd", "lowstate.json", "pillar.json"],
+        )
+
+    def test_prep_trans_tar_saltenv_dirs(self):
+        """
+        Test every saltenv gets a directory in the package, even without files.
+        """
+        trans_tar = salt.client.ssh.state.prep_trans_tar(
+            self.file_client, [], {"base": [["salt://motd"]], "dev": []}
+        )
+        self.addCleanup(os.remove, trans_tar)
+        with tarfile.open(trans_tar, "r:gz") as tfp:
+            self.assertTrue(tfp.getmember("base").isdir())
+            self.assertTrue(tfp.getmember("dev").isdir())
+            self.assertTrue(tfp.getmember("base/motd").isfile())
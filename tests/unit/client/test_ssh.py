@@ -9,6 +9,7 @@ import os
 import re
 import shutil
 import tempfile
+import time
 
 # Import Salt Testing libs
 from tests.support.runtests import RUNTIME_VARS
@@ -17,13 +18,16 @@ from tests.support.case import ShellCase
 from tests.support.mock import NO_MOCK, NO_MOCK_REASON, patch, MagicMock
 
 # Import Salt libs
+import salt.client.ssh.shell
 import salt.config
 import salt.roster
 import salt.utils.files
+import salt.utils.json
 import salt.utils.path
 import salt.utils.thin
 import salt.utils.yaml
 from salt.client import ssh
+from salt.ext.six.moves import queue
 from tests.support.case import ShellCase
 from tests.support.mock import MagicMock, call, patch
 from tests.support.runtests import RUNTIME_VARS
@@ -438,3 +442,148 @@ class SSHSingleTests(TestCase):
 
         ret = single._cmd_str()
         assert re.search('SET_PATH=""', ret)
+
+    def test_deploy_layers(self):
+        """
+        test only the requested layers of the thin manifest are deployed
+        """
+        opts = dict(self.opts, ssh_thin_layers=True)
+        single = ssh.Single(
+            opts,
+            opts["argv"],
+            "localhost",
+            mods={},
+            fsclient=None,
+            thin=salt.utils.thin.thin_path(opts["cachedir"]),
+            mine=False,
+            **self.target
+        )
+        manifest = {
+            "code_checksum": "abc",
+            "layers": [
+                {"id": "one", "sum": "1", "roots": ["pyall/salt"]},
+                {"id": "two", "sum": "2", "roots": ["version"]},
+            ],
+        }
+        layer_dir = os.path.join(self.tmp_cachedir, "thin", "layers")
+        remote_dir = os.path.join(single.thin_dir, "layers") + "/"
+        mock_send = MagicMock()
+        with patch(
+            "salt.utils.thin.thin_manifest", MagicMock(return_value=manifest)
+        ), patch("salt.client.ssh.shell.Shell.send", mock_send):
+            single.deploy_layers(["two", "../../etc/passwd"])
+            mock_send.assert_called_once_with(
+                os.path.join(layer_dir, "two.tgz"), remote_dir
+            )
+            mock_send.reset_mock()
+            single.deploy()
+            mock_send.assert_called_once_with(
+                " ".join(
+                    [
+                        os.path.join(layer_dir, "one.tgz"),
+                        os.path.join(layer_dir, "two.tgz"),
+                    ]
+                ),
+                remote_dir,
+            )
+
+
+class SSHShellControlTests(TestCase):
+    def setUp(self):
+        self.tmp_cachedir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.tmp_cachedir, ignore_errors=True)
+
+    def test_control_opts(self):
+        """
+        Test the ssh commands share a persistent connection with ssh_control_persist
+        """
+        opts = {
+            "cachedir": self.tmp_cachedir,
+            "ssh_control_persist": 60,
+            "_ssh_version": (7, 4),
+        }
+        shell = salt.client.ssh.shell.Shell(opts, "login1")
+        control_path = os.path.join(self.tmp_cachedir, "ssh_control", "%C")
+        self.assertEqual(
+            shell._cmd_str("date"),
+            "ssh login1 -o ControlMaster=auto -o ControlPath={0} "
+            "-o ControlPersist=60 date".format(control_path),
+        )
+        self.assertTrue(
+            os.path.isdir(os.path.join(self.tmp_cachedir, "ssh_control"))
+        )
+
+    def test_no_control_opts(self):
+        shell = salt.client.ssh.shell.Shell({"cachedir": self.tmp_cachedir}, "login1")
+        self.assertEqual(shell._cmd_str("date"), "ssh login1 date")
+
+
+class SSHPoolTests(TestCase):
+    def test_handle_pool_worker(self):
+        """
+        Test a pool worker runs the routines of every task in its threads
+        """
+        tasks = queue.Queue()
+        que = queue.Queue()
+        for host in ("foo", "bar", "baz"):
+            tasks.put((host, {}))
+        for _ in range(2):
+            tasks.put(None)
+
+        def handle_routine(que, opts, host, target, mine=False, fsclient=None):
+            if host == "baz":
+                raise Exception("boom")
+            que.put({"id": host, "ret": True})
+
+        client = ssh.SSH.__new__(ssh.SSH)
+        client.handle_routine = handle_routine
+        with patch("salt.fileclient.FSClient", MagicMock()):
+            client.handle_pool_worker(tasks, que, {}, False, 2)
+
+        rets = {}
+        while not que.empty():
+            ret = que.get()
+            rets[ret["id"]] = ret["ret"]
+        self.assertEqual(rets["foo"], True)
+        self.assertEqual(rets["bar"], True)
+        self.assertIn("did not return any data: boom", rets["baz"])
+
+    def test_handle_pool_worker_opts(self):
+        """
+        Test the targets run by the threads of a pool worker do not share
+        their opts
+        """
+        tasks = queue.Queue()
+        que = queue.Queue()
+        opts = {"argv": ["test.ping"]}
+        tasks.put(("foo", {"thin_dir": "/tmp/foo"}))
+        tasks.put(("bar", {"thin_dir": "/tmp/bar"}))
+        for _ in range(2):
+            tasks.put(None)
+
+        class Single(object):
+            def __init__(self, opts, argv, host, thin_dir=None, **kwargs):
+                self.id = host
+                self.opts = opts
+                self.opts["thin_dir"] = thin_dir
+
+            def run(self):
+                # Let the other thread set its thin_dir in the meantime
+                time.sleep(0.2)
+                return salt.utils.json.dumps({"local": self.opts["thin_dir"]}), "", 0
+
+        client = ssh.SSH.__new__(ssh.SSH)
+        client.mods = {}
+        client.fsclient = None
+        client.thin = None
+        with patch("salt.fileclient.FSClient", MagicMock()), patch(
+            "salt.client.ssh.Single", Single
+        ):
+            client.handle_pool_worker(tasks, que, opts, False, 2)
+
+        rets = {}
+        while not que.empty():
+            ret = que.get()
+            rets[ret["id"]] = ret["ret"]
+        self.assertEqual(rets, {"foo": "/tmp/foo", "bar": "/tmp/bar"})
+        self.assertNotIn("thin_dir", opts)
@@ -11,6 +11,7 @@ from functools import wraps
 # Import Salt libs
 import salt.config
 import salt.daemons.masterapi as masterapi
+import salt.utils.mine
 import salt.utils.platform
 from tests.support.mock import MagicMock, patch
 
@@ -892,3 +893,61 @@ class RemoteFuncsTestCase(TestCase):
                 }
             )
         self.assertDictEqual(ret, dict(ip_addr=dict(webserver='2001:db8::1:3'), ip4_addr=dict(webserver='127.0.0.1')))
+
+    def test_mine_get_known(self):
+        """
+        Asserts that ``mine_get`` only sends back the entries which changed
+        since the versions the requester knows.
+        """
+        self.funcs.cache.store("minions/webserver", "mine", dict(ip_addr="10.0.0.1"))
+        self.funcs.cache.store("minions/dbserver", "mine", dict(ip_addr="10.0.0.2"))
+        load = {
+            "id": "requester_minion",
+            "tgt": "*",
+            "fun": "ip_addr",
+            "tgt_type": "compound",
+            "mine_known": {},
+        }
+        with patch(
+            "salt.utils.minions.CkMinions._check_compound_minions",
+            MagicMock(return_value=dict(minions=["webserver", "dbserver"], missing=[])),
+        ):
+            ret = self.funcs._mine_get(dict(load))
+            self.assertDictEqual(
+                ret["mine_data"], dict(webserver="10.0.0.1", dbserver="10.0.0.2")
+            )
+            self.assertEqual(sorted(ret["mine_versions"]), ["dbserver", "webserver"])
+
+            load["mine_known"] = ret["mine_versions"]
+            self.funcs.cache.store(
+                "minions/dbserver", "mine", dict(ip_addr="10.0.0.3")
+            )
+            ret = self.funcs._mine_get(dict(load))
+        self.assertDictEqual(ret["mine_data"], dict(dbserver="10.0.0.3"))
+        self.assertEqual(
+            ret["mine_versions"]["webserver"], load["mine_known"]["webserver"]
+        )
+
+    def test_mine_hashes(self):
+        """
+        Asserts that ``mine`` acknowledges the entries the cache holds the
+        same value of as the minion.
+        """
+        self.funcs.cache.store("minions/webserver", "mine", dict(ip_addr="10.0.0.1"))
+        hashes = dict(
+            ip_addr=salt.utils.mine.data_hash("10.0.0.1"),
+            kernel=salt.utils.mine.data_hash("Linux"),
+        )
+        ret = self.funcs._mine(
+            {"id": "webserver", "data": {}, "mine_hashes": hashes}
+        )
+        self.assertEqual(ret, {"mine_hashes": dict(ip_addr=hashes["ip_addr"])})
+
+        ret = self.funcs._mine(
+            {"id": "webserver", "data": dict(kernel="Linux"), "mine_hashes": hashes}
+        )
+        self.assertEqual(ret, {"mine_hashes": hashes})
+        self.assertEqual(
+            self.funcs.cache.fetch("minions/webserver", "mine"),
+            dict(ip_addr="10.0.0.1", kernel="Linux"),
+        )
@@ -30,11 +30,11 @@ class ElasticsearchTestCase(TestCase):
     """
 
     @staticmethod
-    def es_return_true(hosts=None, profile=None):
+    def es_return_true(hosts=None, profile=None, reuse=True):
         return True
 
     @staticmethod
-    def es_raise_command_execution_error(hosts=None, profile=None):
+    def es_raise_command_execution_error(hosts=None, profile=None, reuse=True):
         raise CommandExecutionError("custom message")
 
     # 'ping' function tests: 2
@@ -677,6 +677,46 @@ class ElasticsearchTestCase(TestCase):
                 CommandExecutionError, elasticsearch.document_create, "foo", "bar"
             )
 
+    def test_document_bulk(self):
+        """
+        Test if several documents can be sent with one request
+        """
+        fake_es = MagicMock()
+        fake_es.bulk.return_value = {"errors": False, "items": []}
+        with patch.object(
+            elasticsearch, "_get_instance", MagicMock(return_value=fake_es)
+        ):
+            self.assertDictEqual(
+                elasticsearch.document_bulk("{}\n{}\n", index="foo"),
+                {"errors": False, "items": []},
+            )
+            fake_es.bulk.assert_called_with(body="{}\n{}\n", index="foo", doc_type=None)
+
+            fake_es.bulk.side_effect = TransportError("custom message", 123)
+            self.assertRaises(
+                CommandExecutionError, elasticsearch.document_bulk, "{}\n{}\n"
+            )
+
+    def test_get_instance_reuse(self):
+        """
+        Test if the client is reused for the same settings
+        """
+        client = MagicMock()
+        with patch.object(
+            elasticsearch, "__context__", {}, create=True
+        ), patch.object(
+            elasticsearch, "__salt__", {"config.option": MagicMock(return_value={})},
+            create=True,
+        ), patch.object(
+            elasticsearch.elasticsearch, "Elasticsearch", client
+        ):
+            first = elasticsearch._get_instance(hosts="10.0.0.1:9200")
+            self.assertIs(elasticsearch._get_instance(hosts="10.0.0.1:9200"), first)
+            self.assertEqual(client.call_count, 1)
+            elasticsearch._get_instance(hosts="10.0.0.2:9200")
+            elasticsearch._get_instance(hosts="10.0.0.1:9200", reuse=False)
+            self.assertEqual(client.call_count, 3)
+
     # 'document_delete' function tests: 2
 
     def test_document_delete(self):
@@ -18,6 +18,8 @@ from tests.support.mock import (
 )
 
 # Import Salt libs
+import salt.loader
+import salt.modules.grains as grainsmod
 from salt.exceptions import SaltException
 
 # Import 3rd-party libs
@@ -735,3 +737,32 @@ class GrainsModuleTestCase(TestCase, LoaderModuleMockMixin):
         grainsmod.__salt__["saltutil.refresh_grains"].assert_called_with(
             refresh_pillar=False
         )
+
+    def test_timings(self):
+        """
+        Test that grains.timings lists the grains functions slowest first
+        """
+        timings = {"core.os_data": 0.5, "core.hostname": 0.01, "core.dns": 2.0}
+        with patch.dict(salt.loader.GRAINS_TIMINGS, timings, clear=True):
+            ret = grainsmod.timings()
+        self.assertEqual(
+            list(ret.items()),
+            [("core.dns", 2.0), ("core.os_data", 0.5), ("core.hostname", 0.01)],
+        )
+
+    def test_timings_incremental(self):
+        """
+        Test that grains.timings reports the duration of the cached results
+        when the grains are refreshed incrementally
+        """
+        timings = {"core.dns": 0.0, "core.os_data": 0.5}
+        funcs_cache = {"core.dns": {"duration": 3.0}, "core.fqdns": {"duration": 1.0}}
+        load_cache = MagicMock(return_value=funcs_cache)
+        with patch.dict(salt.loader.GRAINS_TIMINGS, timings, clear=True):
+            with patch.dict(grainsmod.__opts__, {"grains_refresh_incremental": True}):
+                with patch("salt.loader._load_grains_funcs_cache", load_cache):
+                    ret = grainsmod.timings()
+        self.assertEqual(
+            list(ret.items()),
+            [("core.dns", 3.0), ("core.fqdns", 1.0), ("core.os_data", 0.5)],
+        )
@@ -7,6 +7,9 @@
 # Import Python Libs
 from __future__ import absolute_import, print_function, unicode_literals
 
+import shutil
+import tempfile
+
 # Import Salt Libs
 import salt.modules.mine as mine
 import salt.utils.mine
@@ -15,6 +18,7 @@ from salt.utils.odict import OrderedDict
 # Import Salt Testing Libs
 from tests.support.mixins import LoaderModuleMockMixin
 from tests.support.mock import MagicMock, patch
+from tests.support.runtests import RUNTIME_VARS
 from tests.support.unit import TestCase
 
 
@@ -46,8 +50,11 @@ class MineTestCase(TestCase, LoaderModuleMockMixin):
 
     def setup_loader_modules(self):
         mock_match = MagicMock(return_value="webserver")
+        cachedir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, cachedir, ignore_errors=True)
         return {
             mine: {
+                "__opts__": {"cachedir": cachedir},
                 "__salt__": {
                     "match.glob": mock_match,
                     "match.pcre": mock_match,
@@ -252,6 +259,66 @@ class MineTestCase(TestCase, LoaderModuleMockMixin):
             )
             self.assertEqual(mine.get("*", "foo.bar", exclude_minion=True), {})
 
+    def test_get_master_versioned(self):
+        """
+        Tests merging versioned replies of the master with the result of the
+        previous identical request.
+        """
+        replies = [
+            {
+                "mine_versions": {"webserver": "1", "dbserver": "1"},
+                "mine_data": {"webserver": "a", "dbserver": "b"},
+            },
+            {
+                "mine_versions": {"webserver": "1", "dbserver": "2"},
+                "mine_data": {"dbserver": "c"},
+            },
+        ]
+        mock_mine_get = MagicMock(side_effect=replies)
+        with patch.object(mine, "_mine_get", mock_mine_get), patch.dict(
+            mine.__opts__, {"file_client": "remote", "id": "foo"}
+        ), patch.dict(mine.__context__, {}):
+            self.assertEqual(
+                mine.get("*", "foo.bar"), {"webserver": "a", "dbserver": "b"}
+            )
+            self.assertEqual(
+                mine.get("*", "foo.bar"), {"webserver": "a", "dbserver": "c"}
+            )
+        self.assertEqual(
+            mock_mine_get.call_args[0][0]["mine_known"],
+            {"webserver": "1", "dbserver": "1"},
+        )
+
+    def test_get_master_versioned_across_jobs(self):
+        """
+        Tests the result of a request is merged with the result of the same
+        request made by a previous job.
+        """
+        replies = [
+            {
+                "mine_versions": {"webserver": "1", "dbserver": "1"},
+                "mine_data": {"webserver": "a", "dbserver": "b"},
+            },
+            {
+                "mine_versions": {"webserver": "2", "dbserver": "1"},
+                "mine_data": {"webserver": "d"},
+            },
+        ]
+        mock_mine_get = MagicMock(side_effect=replies)
+        with patch.object(mine, "_mine_get", mock_mine_get), patch.dict(
+            mine.__opts__, {"file_client": "remote", "id": "foo"}
+        ):
+            with patch.dict(mine.__context__, {}):
+                mine.get("*", "foo.bar")
+            with patch.dict(mine.__context__, {}):
+                self.assertEqual(
+                    mine.get("*", "foo.bar"), {"webserver": "d", "dbserver": "b"}
+                )
+        self.assertEqual(
+            mock_mine_get.call_args[0][0]["mine_known"],
+            {"webserver": "1", "dbserver": "1"},
+        )
+
     def test_update_local(self):
         """
         Tests the ``update``-function on the minion's local cache.
@@ -368,6 +435,12 @@ class MineTestCase(TestCase, LoaderModuleMockMixin):
                 "kernel": self.kernel_ret,
             },
             "clear": False,
+            "mine_hashes": {
+                "ip_addr": salt.utils.mine.data_hash(self.ip_ret),
+                "network.ip_addrs": salt.utils.mine.data_hash(self.ip_ret),
+                "foo.bar": salt.utils.mine.data_hash(self.foo_ret),
+                "kernel": salt.utils.mine.data_hash(self.kernel_ret),
+            },
         }
         with patch.object(
             mine, "_mine_send", MagicMock(side_effect=lambda x, y: x)
@@ -381,10 +454,86 @@ class MineTestCase(TestCase, LoaderModuleMockMixin):
                 "network.ip_addrs": MagicMock(return_value=self.ip_ret),
                 "foo.bar": MagicMock(return_value=self.foo_ret),
             },
+        ), patch(
+            "salt.utils.mine.read_hashes", MagicMock(return_value={})
         ):
             # Verify the correct load
             self.assertEqual(mine.update(), mock_load)
 
+    def test_update_master_changed(self):
+        """
+        Tests whether the ``update``-function only sends the entries which
+        changed since the master acknowledged them.
+        """
+        config_mine_functions = {
+            "network.ip_addrs": [],
+            "kernel": [{"mine_function": "grains.get"}, "kernel"],
+        }
+        acked = {
+            "network.ip_addrs": salt.utils.mine.data_hash(self.ip_ret),
+            "kernel": salt.utils.mine.data_hash("Windows!"),
+        }
+        with patch.object(
+            mine, "_mine_send", MagicMock(side_effect=lambda x, y: x)
+        ), patch.dict(
+            mine.__opts__, {"file_client": "remote", "id": "webserver"}
+        ), patch.dict(
+            mine.__salt__,
+            {
+                "config.merge": MagicMock(return_value=config_mine_functions),
+                "grains.get": lambda x: self.kernel_ret,
+                "network.ip_addrs": MagicMock(return_value=self.ip_ret),
+            },
+        ), patch(
+            "salt.utils.mine.read_hashes", MagicMock(return_value=acked)
+        ):
+            load = mine.update()
+        self.assertEqual(load["data"], {"kernel": self.kernel_ret})
+        self.assertEqual(
+            load["mine_hashes"],
+            {
+                "network.ip_addrs": acked["network.ip_addrs"],
+                "kernel": salt.utils.mine.data_hash(self.kernel_ret),
+            },
+        )
+
+    def test_update_master_multimaster(self):
+        """
+        Tests whether the ``update``-function keeps sending an entry until
+        every master acknowledged it.
+        """
+        config_mine_functions = {"network.ip_addrs": []}
+        ip_hash = salt.utils.mine.data_hash(self.ip_ret)
+        sent = {
+            "cmd": "_mine",
+            "data": {"network.ip_addrs": self.ip_ret},
+            "mine_hashes": {"network.ip_addrs": ip_hash},
+        }
+        reply = {"mine_hashes": {"network.ip_addrs": ip_hash}}
+        with patch.object(
+            mine, "_mine_send", MagicMock(side_effect=lambda x, y: x)
+        ), patch.dict(
+            mine.__opts__,
+            {
+                "file_client": "remote",
+                "id": "webserver",
+                "master": "master1",
+                "master_list": ["master1", "master2"],
+            },
+        ), patch.dict(
+            mine.__salt__,
+            {
+                "config.merge": MagicMock(return_value=config_mine_functions),
+                "network.ip_addrs": MagicMock(return_value=self.ip_ret),
+            },
+        ):
+            salt.utils.mine.ack_hashes(mine.__opts__, sent, reply)
+            self.assertEqual(mine.update()["data"], sent["data"])
+            salt.utils.mine.ack_hashes(
+                dict(mine.__opts__, master="master2"), sent, reply
+            )
+            self.assertEqual(mine.update()["data"], {})
+
     def test_delete_local(self):
         """
         Tests the ``delete``-function on the minion's local cache.
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the elasticsearch returner
+"""
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+
+# Import Salt libs
+import salt.returners.elasticsearch_return as elasticsearch_return
+import salt.utils.json
+from salt.exceptions import CommandExecutionError
+
+# Import Salt Testing libs
+from tests.support.mixins import LoaderModuleMockMixin
+from tests.support.mock import MagicMock, patch
+from tests.support.unit import TestCase
+
+
+class ElasticsearchReturnBulkTestCase(TestCase, LoaderModuleMockMixin):
+    """
+    Tests for sending the documents through the bulk endpoint
+    """
+
+    def setup_loader_modules(self):
+        return {
+            elasticsearch_return: {
+                "__opts__": {"__role": "master"},
+                "__salt__": {},
+                "__context__": {},
+            }
+        }
+
+    def setUp(self):
+        self.bulk = MagicMock(return_value={"errors": False, "items": []})
+        self.options = {
+            "index_date": False,
+            "master_event_index": "salt-master-event-cache",
+            "master_event_doc_type": "default",
+            "bulk": False,
+            "bulk_size": 2,
+            "bulk_interval": 60,
+            "bulk_retries": 1,
+        }
+        self.addCleanup(elasticsearch_return._flush_bulk)
+
+    def _lines(self, call):
+        body = call[1]["body"]
+        return [salt.utils.json.loads(line) for line in body.splitlines()]
+
+    def test_event_return(self):
+        """
+        Test all the events of the batch are sent with one request
+        """
+        events = [{"tag": "salt/one", "data": {}}, {"tag": "salt/two", "data": {}}]
+        with patch.dict(
+            elasticsearch_return.__salt__,
+            {
+                "elasticsearch.document_bulk": self.bulk,
+                "elasticsearch.index_exists": MagicMock(return_value=True),
+            },
+        ), patch.object(
+            elasticsearch_return, "_get_options", MagicMock(return_value=self.options)
+        ):
+            elasticsearch_return.event_return(events)
+        self.assertEqual(self.bulk.call_count, 1)
+        lines = self._lines(self.bulk.call_args)
+        self.assertEqual([line["tag"] for line in lines[1::2]], ["salt/one", "salt/two"])
+        self.assertEqual(
+            lines[0]["index"]["_index"], self.options["master_event_index"]
+        )
+
+    def test_event_return_bulk(self):
+        """
+        Test the events are sent right away with the bulk option, and a failed
+        batch is reported to the event returner
+        """
+        self.options["bulk"] = True
+        self.bulk.return_value = {
+            "errors": True,
+            "items": [{"index": {"status": 201}}, {"index": {"status": 503}}],
+        }
+        events = [{"tag": "salt/one", "data": {}}, {"tag": "salt/two", "data": {}}]
+        with patch.dict(
+            elasticsearch_return.__salt__,
+            {
+                "elasticsearch.document_bulk": self.bulk,
+                "elasticsearch.index_exists": MagicMock(return_value=True),
+            },
+        ), patch.object(
+            elasticsearch_return, "_get_options", MagicMock(return_value=self.options)
+        ):
+            with self.assertRaises(CommandExecutionError):
+                elasticsearch_return.event_return(events)
+            first = self._lines(self.bulk.call_args)
+            self.bulk.return_value = {"errors": False, "items": []}
+            elasticsearch_return.event_return(events)
+        self.assertEqual(self.bulk.call_count, 2)
+        # The events keep their ids when the batch is sent again
+        self.assertEqual(first, self._lines(self.bulk.call_args))
+
+    def test_queue_bulk_finalizer(self):
+        """
+        Test the collected documents are sent when the process exits
+        """
+        with patch.dict(
+            elasticsearch_return.__salt__, {"elasticsearch.document_bulk": self.bulk}
+        ), patch.dict(elasticsearch_return._BULK, {"pid": None}), patch(
+            "multiprocessing.util.Finalize"
+        ) as finalize:
+            action = elasticsearch_return._bulk_action("salt-test_ping", "default", {})
+            elasticsearch_return._queue_bulk([action], self.options)
+            elasticsearch_return._queue_bulk([action], self.options)
+        finalize.assert_called_once_with(
+            None, elasticsearch_return._flush_bulk, exitpriority=10
+        )
+
+    def test_queue_bulk(self):
+        """
+        Test the documents are collected until there are enough of them
+        """
+        with patch.dict(
+            elasticsearch_return.__salt__, {"elasticsearch.document_bulk": self.bulk}
+        ):
+            action = elasticsearch_return._bulk_action("salt-test_ping", "default", {})
+            elasticsearch_return._queue_bulk([action], self.options)
+            self.assertEqual(self.bulk.call_count, 0)
+            action = elasticsearch_return._bulk_action("salt-test_ping", "default", {})
+            elasticsearch_return._queue_bulk([action], self.options)
+            self.assertEqual(self.bulk.call_count, 1)
+            self.assertEqual(len(self._lines(self.bulk.call_args)), 4)
+
+    def test_send_bulk_retry(self):
+        """
+        Test only the documents failing with a retryable status are sent again
+        """
+        self.bulk.return_value = {
+            "errors": True,
+            "items": [
+                {"index": {"status": 201}},
+                {"index": {"status": 429}},
+                {"index": {"status": 400, "error": "mapping"}},
+            ],
+        }
+        actions = [
+            elasticsearch_return._bulk_action("salt-test", "default", {"num": num})
+            for num in range(3)
+        ]
+        with patch.dict(
+            elasticsearch_return.__salt__, {"elasticsearch.document_bulk": self.bulk}
+        ):
+            retry = elasticsearch_return._send_bulk(actions, 1)
+            self.assertEqual([action["doc"] for action in retry], [{"num": 1}])
+            # Out of tries
+            self.bulk.return_value = {
+                "errors": True,
+                "items": [{"index": {"status": 503}}],
+            }
+            self.assertEqual(elasticsearch_return._send_bulk(retry, 1), [])
+
+            self.bulk.side_effect = CommandExecutionError("down")
+            self.assertEqual(len(elasticsearch_return._send_bulk(actions[:2], 5)), 2)
@@ -27,6 +27,7 @@ from tests.support.mock import (
 )
 
 # Import Salt libs
+import salt.returners.local_cache as local_cache
 import salt.utils.files
 import salt.utils.jid
 import salt.utils.job
@@ -380,3 +381,118 @@ class Local_CacheTest(
         self._check_dir_files(
             "new_jid_dir was not removed", self.EMPTY_JID_DIR, status="removed"
         )
+
+
+class LocalCacheJobIndexTestCase(TestCase, LoaderModuleMockMixin):
+    """
+    Tests for the job index of the local cache
+    """
+
+    def setup_loader_modules(self):
+        if not os.path.isdir(RUNTIME_VARS.TMP):
+            os.makedirs(RUNTIME_VARS.TMP)
+        self.cachedir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.cachedir, ignore_errors=True)
+        return {
+            local_cache: {
+                "__opts__": {
+                    "cachedir": self.cachedir,
+                    "hash_type": "sha256",
+                    "keep_jobs": 24,
+                }
+            }
+        }
+
+    def _save_load(self, jid, fun, minions=None):
+        load = {"jid": jid, "fun": fun, "arg": ["a"], "tgt": "web*", "user": "root"}
+        local_cache.save_load(jid, load, minions=minions or [])
+
+    def test_get_jids_index(self):
+        jid = salt.utils.jid.gen_jid({})
+        self._save_load(jid, "test.ping", minions=["web1", "web2"])
+        index = local_cache.get_jids_index()
+        self.assertEqual(list(index), [jid])
+        self.assertEqual(index[jid]["Function"], "test.ping")
+        self.assertEqual(index[jid]["Target"], "web*")
+        self.assertEqual(index[jid]["MinionCount"], 2)
+        self.assertEqual(index[jid]["StartTime"], salt.utils.jid.jid_to_time(jid))
+        self.assertNotIn("Arguments", index[jid])
+
+    def test_get_jids_index_build(self):
+        """
+        Test the jobs cached before the index are added to it
+        """
+        jid = salt.utils.jid.gen_jid({})
+        with patch.dict(local_cache.__opts__, {"job_cache_index": False}):
+            self._save_load(jid, "test.ping")
+        self.assertFalse(os.path.exists(local_cache._index_dir()))
+        self.assertEqual(list(local_cache.get_jids_index()), [jid])
+        self.assertTrue(
+            os.path.isfile(
+                os.path.join(local_cache._index_dir(), local_cache.INDEX_COMPLETE)
+            )
+        )
+
+    def test_clean_index(self):
+        self._save_load("20000101010101000000", "test.ping")
+        jid = salt.utils.jid.gen_jid({})
+        self._save_load(jid, "test.ping")
+        self.assertEqual(len(local_cache.get_jids_index()), 2)
+        local_cache.clean_old_jobs()
+        self.assertEqual(list(local_cache.get_jids_index()), [jid])
+
+
+class LocalCacheHourBucketsTestCase(TestCase, LoaderModuleMockMixin):
+    """
+    Tests for the hour bucketed layout of the local cache
+    """
+
+    def setup_loader_modules(self):
+        if not os.path.isdir(RUNTIME_VARS.TMP):
+            os.makedirs(RUNTIME_VARS.TMP)
+        self.cachedir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.cachedir, ignore_errors=True)
+        return {
+            local_cache: {
+                "__opts__": {
+                    "cachedir": self.cachedir,
+                    "hash_type": "sha256",
+                    "keep_jobs": 24,
+                    "job_cache_hour_buckets": True,
+                }
+            }
+        }
+
+    def test_jid_dir(self):
+        old_jid = "20000101010101000000"
+        jid = salt.utils.jid.gen_jid({})
+        for jid_ in (old_jid, jid):
+            local_cache.prep_jid(passed_jid=jid_)
+            local_cache.save_load(jid_, {"jid": jid_, "fun": "test.ping"})
+        self.assertTrue(
+            local_cache._jid_dir(jid).startswith(
+                os.path.join(self.cachedir, "jobs", jid[:10])
+            )
+        )
+        self.assertEqual(local_cache.get_load(jid)["fun"], "test.ping")
+        self.assertEqual(sorted(local_cache.get_jids()), sorted([old_jid, jid]))
+
+        local_cache.clean_old_jobs()
+        self.assertEqual(
+            os.listdir(os.path.join(self.cachedir, "jobs")), [jid[:10]]
+        )
+        self.assertEqual(list(local_cache.get_jids()), [jid])
+
+    def test_jid_dir_hashed(self):
+        """
+        Test the jobs cached before the buckets were used are still found
+        """
+        jid = salt.utils.jid.gen_jid({})
+        with patch.dict(local_cache.__opts__, {"job_cache_hour_buckets": False}):
+            local_cache.prep_jid(passed_jid=jid)
+            local_cache.save_load(jid, {"jid": jid, "fun": "test.ping"})
+        self.assertEqual(local_cache.get_load(jid)["fun"], "test.ping")
+        self.assertEqual(
+            local_cache._jid_dir(jid),
+            salt.utils.jid.jid_dir(jid, os.path.join(self.cachedir, "jobs")),
+        )
@@ -48,3 +48,84 @@ class PGJsonbCleanOldJobsTestCase(TestCase, LoaderModuleMockMixin):
             with patch.dict(pgjsonb.__salt__, {"config.option": MagicMock()}):
                 with patch.dict(pgjsonb.__opts__, {"archive_jobs": 1}):
                     self.assertEqual(pgjsonb.clean_old_jobs(), None)
+
+
+class PGJsonbConnectionTestCase(TestCase, LoaderModuleMockMixin):
+    """
+    Tests for reusing the connection and batching the event inserts.
+    """
+
+    def setup_loader_modules(self):
+        return {pgjsonb: {"__opts__": {"id": "master"}, "__context__": {}}}
+
+    def _psycopg2(self):
+        psycopg2 = MagicMock()
+        psycopg2.DatabaseError = type(str("DatabaseError"), (Exception,), {})
+        psycopg2.OperationalError = type(
+            str("OperationalError"), (psycopg2.DatabaseError,), {}
+        )
+        psycopg2.InterfaceError = type(
+            str("InterfaceError"), (psycopg2.DatabaseError,), {}
+        )
+        psycopg2.connect.return_value.closed = 0
+        psycopg2.connect.return_value.server_version = 120000
+        return psycopg2
+
+    def test_get_serv_reuses_connection(self):
+        psycopg2 = self._psycopg2()
+        options = MagicMock(return_value={"host": "localhost", "port": 5432})
+        with patch.object(pgjsonb, "psycopg2", psycopg2, create=True), patch.object(
+            pgjsonb, "_get_options", options
+        ):
+            with pgjsonb._get_serv(commit=True):
+                pass
+            with pgjsonb._get_serv(commit=True):
+                pass
+            self.assertEqual(psycopg2.connect.call_count, 1)
+
+            # A closed connection is replaced
+            psycopg2.connect.return_value.closed = 1
+            with pgjsonb._get_serv(commit=True):
+                pass
+            self.assertEqual(psycopg2.connect.call_count, 2)
+
+    def test_get_serv_rolls_back(self):
+        psycopg2 = self._psycopg2()
+        conn = psycopg2.connect.return_value
+        cursor = conn.cursor.return_value
+        with patch.object(pgjsonb, "psycopg2", psycopg2, create=True), patch.object(
+            pgjsonb, "_get_options", MagicMock(return_value={})
+        ):
+            # Any error rolls the transaction back
+            with self.assertRaises(TypeError):
+                with pgjsonb._get_serv(commit=True):
+                    raise TypeError("not adaptable")
+            cursor.execute.assert_called_once_with("ROLLBACK")
+            conn.close.assert_not_called()
+
+            # The connection is dropped if the rollback fails
+            cursor.execute.side_effect = psycopg2.InterfaceError("gone")
+            with self.assertRaises(TypeError):
+                with pgjsonb._get_serv(commit=True):
+                    raise TypeError("not adaptable")
+            conn.close.assert_called_once_with()
+
+    def test_event_return(self):
+        psycopg2 = self._psycopg2()
+        events = [
+            {"tag": "salt/one", "data": {"a": 1}},
+            {"tag": "salt/two", "data": {"b": 2}},
+        ]
+        with patch.object(pgjsonb, "psycopg2", psycopg2, create=True), patch.object(
+            pgjsonb, "_get_options", MagicMock(return_value={})
+        ):
+            pgjsonb.event_return(events)
+            execute_values = psycopg2.extras.execute_values
+            self.assertEqual(execute_values.call_count, 1)
+            rows = execute_values.call_args[0][2]
+            self.assertEqual([row[0] for row in rows], ["salt/one", "salt/two"])
+            self.assertEqual(set(row[2] for row in rows), {"master"})
+
+            # No events, no connection
+            pgjsonb.event_return([])
+            self.assertEqual(psycopg2.connect.call_count, 1)
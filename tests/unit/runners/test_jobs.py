@@ -89,3 +89,57 @@ class JobsTest(TestCase, LoaderModuleMockMixin):
             self.assertEqual(
                 jobs.list_jobs(search_target="non-existant"), returns["non-existant"]
             )
+
+    def test_list_jobs_with_index(self):
+        """
+        test jobs.list_jobs and jobs.last_run only read the matching jobs
+        when the returner keeps an index
+        """
+        index = {
+            "20160524035503086853": {
+                "Function": "test.ping",
+                "StartTime": "2016, May 24 03:55:03.086853",
+                "Target": "node-1-1.com",
+                "Target-type": "glob",
+                "User": "root",
+            },
+            "20160524035524895387": {
+                "Function": "state.apply",
+                "StartTime": "2016, May 24 03:55:24.895387",
+                "Target": "node-1-2.com",
+                "Target-type": "glob",
+                "User": "root",
+            },
+        }
+        loads = {
+            "20160524035503086853": {"fun": "test.ping", "tgt": "node-1-1.com"},
+            "20160524035524895387": {"fun": "state.apply", "tgt": "node-1-2.com"},
+        }
+        read = []
+
+        def get_load(jid):
+            read.append(jid)
+            return loads[jid]
+
+        class MockMasterMinion(object):
+
+            returners = {
+                "local_cache.get_jids_index": lambda: index,
+                "local_cache.get_load": get_load,
+            }
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+        with patch.object(salt.minion, "MasterMinion", MockMasterMinion):
+            ret = jobs.list_jobs(search_function="test.*")
+            self.assertEqual(list(ret), ["20160524035503086853"])
+            self.assertEqual(ret["20160524035503086853"]["Function"], "test.ping")
+            self.assertEqual(read, ["20160524035503086853"])
+
+            with patch.object(jobs, "print_job", lambda jid, ext_source: jid):
+                self.assertEqual(jobs.last_run(), "20160524035524895387")
+                self.assertEqual(
+                    jobs.last_run(function="test.ping"), "20160524035503086853"
+                )
+                self.assertFalse(jobs.last_run(target="nope"))
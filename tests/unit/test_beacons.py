@@ -4,6 +4,7 @@ unit tests for the Salt engines
 '''
 # Import Python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import threading
 
 # Import Salt Testing Libs
 from tests.support.mixins import LoaderModuleMockMixin
@@ -11,6 +12,7 @@ from tests.support.unit import skipIf, TestCase
 from tests.support.mock import (
     NO_MOCK,
     NO_MOCK_REASON,
+    MagicMock,
     patch)
 
 # Import Salt Libs
@@ -45,3 +47,85 @@ class BeaconsTestCase(TestCase, LoaderModuleMockMixin):
                           'data': {'id': u'minion', u'apache2': u'Stopped'},
                           'beacon_name': 'ps'}]
             self.assertEqual(ret, _expected)
+
+    def test_process_threads(self):
+        '''
+        Test that beacons run in the thread pool send their events on the
+        next loop, and are not started again while running
+        '''
+        mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        mock_opts['id'] = 'minion'
+        mock_opts['beacons_threads'] = 2
+        beacon = salt.beacons.Beacon(mock_opts, [])
+        self.addCleanup(beacon.destroy)
+        calls = []
+
+        def fake_beacon(config):
+            calls.append(config)
+            return [{'tag': 'ran', 'value': 1}]
+
+        beacon.beacons = {'fake.beacon': fake_beacon}
+        config = {'fake': [{'value': 1}]}
+
+        self.assertEqual(beacon.process(config, {}), [])
+        self.assertIn('fake', beacon.running)
+        beacon.running['fake']['result'].wait(5)
+
+        ret = beacon.process(config, {})
+        self.assertEqual(ret, [{'tag': 'salt/beacon/minion/fake/ran',
+                                'data': {'id': 'minion', 'value': 1},
+                                'beacon_name': 'fake'}])
+        self.assertEqual(beacon.stats['fake']['runs'], 1)
+        # Started again by the second loop
+        self.assertIn('fake', beacon.running)
+        beacon.running['fake']['result'].wait(5)
+        self.assertEqual(len(calls), 2)
+
+    def test_process_threads_timeout(self):
+        '''
+        Test that a beacon running past its own timeout is given up on and
+        started again
+        '''
+        mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        mock_opts['id'] = 'minion'
+        mock_opts['beacons_threads'] = 2
+        beacon = salt.beacons.Beacon(mock_opts, [])
+        self.addCleanup(beacon.destroy)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        calls = []
+
+        def fake_beacon(config):
+            calls.append(config)
+            release.wait(5)
+            return [{'tag': 'ran'}]
+
+        beacon.beacons = {'fake.beacon': fake_beacon}
+        config = {'fake': [{'value': 1}, {'timeout': 10}]}
+
+        self.assertEqual(beacon.process(config, {}), [])
+        self.assertEqual(beacon.running['fake']['timeout'], 10)
+        beacon.running['fake']['start'] -= 11
+
+        self.assertEqual(beacon.process(config, {}), [])
+        self.assertEqual(beacon.stats['fake']['timeouts'], 1)
+        # Started again by the second loop, without the timeout in its config
+        self.assertIn('fake', beacon.running)
+        release.set()
+        beacon.running['fake']['result'].wait(5)
+        self.assertEqual(calls, [[{'value': 1}], [{'value': 1}]])
+
+    def test_process_interval(self):
+        '''
+        Test that beacons with an interval run once it elapsed
+        '''
+        mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        mock_opts['id'] = 'minion'
+        beacon = salt.beacons.Beacon(mock_opts, [])
+        mock_time = MagicMock()
+        mock_time.time.side_effect = [100, 105, 110, 111]
+        with patch.object(beacons, 'time', mock_time):
+            self.assertFalse(beacon._process_interval('fake', 10))
+            self.assertFalse(beacon._process_interval('fake', 10))
+            self.assertTrue(beacon._process_interval('fake', 10))
+            self.assertFalse(beacon._process_interval('fake', 10))
@@ -66,6 +66,61 @@ class LocalClientTestCase(TestCase, SaltClientTestCaseMixin):
         with self.assertRaises(StopIteration):
             next(ret)
 
+    def _get_returns_no_block(self, events):
+        def get_returns_no_block(tag, match_type=None):
+            for event in events:
+                yield event
+            while True:
+                yield None
+
+        return get_returns_no_block
+
+    def test_get_iter_returns_heartbeat(self):
+        """
+        Minions which sent a heartbeat for the job are not pinged with
+        saltutil.find_job
+        """
+        events = [
+            {
+                "tag": "salt/job/0815/heartbeat/m1",
+                "data": {"id": "m1", "jid": "0815", "heartbeat": 5},
+            },
+            None,
+            {
+                "tag": "salt/job/0815/ret/m1",
+                "data": {"id": "m1", "jid": "0815", "return": True},
+            },
+        ]
+        local_client = client.LocalClient(mopts=self.get_temp_config("master"))
+        local_client.returners = MagicMock()
+        with patch.object(
+            local_client, "get_returns_no_block", self._get_returns_no_block(events)
+        ), patch.object(
+            local_client, "gather_job_info", MagicMock(return_value={})
+        ) as gather_job_info:
+            ret = list(local_client.get_iter_returns("0815", ["m1"], timeout=-1))
+        self.assertEqual(ret, [{"m1": {"ret": True, "jid": "0815"}}])
+        gather_job_info.assert_not_called()
+
+    def test_get_iter_returns_no_heartbeat(self):
+        """
+        Minions which sent no heartbeat are pinged with saltutil.find_job
+        """
+        local_client = client.LocalClient(mopts=self.get_temp_config("master"))
+        local_client.returners = MagicMock()
+        with patch.object(
+            local_client, "get_returns_no_block", self._get_returns_no_block([])
+        ), patch.object(
+            local_client, "gather_job_info", MagicMock(return_value={})
+        ) as gather_job_info:
+            ret = list(
+                local_client.get_iter_returns(
+                    "0815", ["m2"], timeout=-1, gather_job_timeout=-1
+                )
+            )
+        self.assertEqual(ret, [])
+        self.assertEqual(gather_job_info.call_args[0][1], ["m2"])
+
     def test_create_local_client(self):
         local_client = client.LocalClient(mopts=self.get_temp_config("master"))
         self.assertIsInstance(
@@ -20,6 +20,7 @@ import shutil
 import sys
 import tempfile
 import textwrap
+import time
 
 # Import Salt Testing libs
 from tests.support.runtests import RUNTIME_VARS
@@ -30,6 +31,7 @@ from tests.support.mock import patch
 # Import Salt libs
 import salt.config
 import salt.loader
+import salt.payload
 import salt.utils.files
 import salt.utils.stringutils
 
@@ -37,7 +39,7 @@ import salt.utils.stringutils
 from salt.ext import six
 from salt.ext.six.moves import range
 from tests.support.case import ModuleCase
-from tests.support.mock import patch
+from tests.support.mock import MagicMock, patch
 
 # Import Salt Testing libs
 from tests.support.runtests import RUNTIME_VARS
@@ -1499,3 +1501,321 @@ class LoaderLoadCachedGrainsTest(TestCase):
         grains = salt.loader.grains(self.opts)
         osrelease_info = grains["osrelease_info"]
         assert isinstance(osrelease_info, tuple), osrelease_info
+
+
+class LazyLoaderIndexTest(TestCase):
+    """
+    Test the on-disk index of the loader file mapping
+    """
+
+    def setUp(self):
+        if not os.path.isdir(RUNTIME_VARS.TMP):
+            os.makedirs(RUNTIME_VARS.TMP)
+        self.module_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.module_dir, ignore_errors=True)
+        self.cache_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.opts = {
+            "cachedir": self.cache_dir,
+            "loader_index": True,
+            "optimization_order": [0, 1, 2],
+        }
+        self.count = 0
+        self.write_module("indexed")
+
+    def write_module(self, name):
+        with salt.utils.files.fopen(
+            os.path.join(self.module_dir, "{0}.py".format(name)), "w"
+        ) as fh:
+            fh.write("def test():\n    return True\n")
+        # Make sure the directory mtime changes, whatever the fs granularity
+        self.count += 1
+        mtime = os.stat(self.module_dir).st_mtime + 10 * self.count
+        os.utime(self.module_dir, (mtime, mtime))
+
+    def get_loader(self):
+        return salt.loader.LazyLoader(
+            [self.module_dir], copy.deepcopy(self.opts), tag="module"
+        )
+
+    def test_index_reused(self):
+        loader = self.get_loader()
+        self.assertIn("indexed", loader.file_mapping)
+        index_path = loader._file_mapping_index_path()
+        self.assertTrue(os.path.isfile(index_path))
+
+        with patch("os.listdir", side_effect=OSError) as listdir:
+            loader = self.get_loader()
+        listdir.assert_not_called()
+        self.assertEqual(
+            loader.file_mapping["indexed"],
+            (os.path.join(self.module_dir, "indexed.py"), ".py", 0),
+        )
+        self.assertTrue(loader["indexed.test"]())
+
+    def test_index_invalidated(self):
+        self.get_loader()
+        self.write_module("added")
+        loader = self.get_loader()
+        self.assertIn("indexed", loader.file_mapping)
+        self.assertIn("added", loader.file_mapping)
+
+    def test_index_disabled(self):
+        self.opts["loader_index"] = False
+        loader = self.get_loader()
+        self.assertIsNone(loader._file_mapping_index_path())
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+
+class LazyLoaderVirtualCacheTest(TestCase):
+    """
+    Test the cache of __virtual__ outcomes
+    """
+
+    modules = {
+        "configured": (
+            "def __virtual__():\n"
+            "    if __opts__.get('configured_enabled'):\n"
+            "        return True\n"
+            "    return (False, 'not configured')\n\n"
+            "def test():\n"
+            "    return 'configured'\n"
+        ),
+        "other": "def test():\n    return 'other'\n",
+        "rejected": (
+            "def __virtual__():\n"
+            "    return (False, 'not here')\n\n"
+            "def test():\n"
+            "    return 'rejected'\n"
+        ),
+        "zaliased": (
+            "__virtualname__ = 'virt'\n\n"
+            "def __virtual__():\n"
+            "    return __virtualname__\n\n"
+            "def test():\n"
+            "    return 'virt'\n"
+        ),
+    }
+
+    def setUp(self):
+        if not os.path.isdir(RUNTIME_VARS.TMP):
+            os.makedirs(RUNTIME_VARS.TMP)
+        self.module_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.module_dir, ignore_errors=True)
+        self.cache_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        for name, code in six.iteritems(self.modules):
+            with salt.utils.files.fopen(
+                os.path.join(self.module_dir, "{0}.py".format(name)), "w"
+            ) as fh:
+                fh.write(code)
+        self.opts = {
+            "cachedir": self.cache_dir,
+            "loader_virtual_cache": True,
+            "optimization_order": [0, 1, 2],
+            "grains": {"os": "Linux"},
+        }
+
+    def get_loader(self):
+        return salt.loader.LazyLoader(
+            [self.module_dir], copy.deepcopy(self.opts), tag="module"
+        )
+
+    def test_rejected_not_imported(self):
+        loader = self.get_loader()
+        loader._load_all()
+        self.assertIn("rejected", loader.missing_modules)
+        self.assertTrue(os.path.isfile(loader._virtual_cache_path()))
+
+        loader = self.get_loader()
+        with patch.object(
+            loader, "_process_virtual", wraps=loader._process_virtual
+        ) as process_virtual:
+            loader._load_all()
+        self.assertEqual(loader.missing_modules["rejected"], "not here")
+        self.assertNotIn("rejected.test", loader)
+        self.assertEqual(
+            sorted(call[0][1] for call in process_virtual.call_args_list),
+            ["other", "zaliased"],
+        )
+
+    def test_alias_lookup(self):
+        self.get_loader()._load_all()
+
+        loader = self.get_loader()
+        self.assertEqual(loader["virt.test"](), "virt")
+        self.assertEqual(loader.loaded_files, set(["zaliased"]))
+
+    def test_grains_change(self):
+        loader = self.get_loader()
+        loader._load_all()
+        self.opts["grains"] = {"os": "FreeBSD"}
+        new_loader = self.get_loader()
+        self.assertNotEqual(
+            new_loader._virtual_cache_path(), loader._virtual_cache_path()
+        )
+        self.assertEqual(new_loader._read_virtual_cache(), {})
+
+    def test_rejection_expiry(self):
+        loader = self.get_loader()
+        loader._load_all()
+        self.assertEqual(loader.missing_modules["configured"], "not configured")
+        self.opts["configured_enabled"] = True
+        loader = self.get_loader()
+        self.assertIsNotNone(loader._virtual_cache_get("configured"))
+
+        # Age the recorded outcomes past loader_virtual_cache_ttl
+        serial = salt.payload.Serial("msgpack")
+        with salt.utils.files.fopen(loader._virtual_cache_path(), "rb") as fp_:
+            cache = serial.load(fp_)
+        for cached in six.itervalues(cache):
+            cached["time"] -= self.opts.get("loader_virtual_cache_ttl", 3600) + 1
+        with salt.utils.files.fopen(loader._virtual_cache_path(), "wb") as fp_:
+            serial.dump(cache, fp_)
+        loader = self.get_loader()
+        self.assertIsNone(loader._virtual_cache_get("configured"))
+        self.assertIsNotNone(loader._virtual_cache_get("other"))
+        self.assertEqual(loader["configured.test"](), "configured")
+
+    def test_rejection_no_expiry(self):
+        self.opts["loader_virtual_cache_ttl"] = 0
+        self.get_loader()._load_all()
+        with patch("salt.loader.time.time", return_value=time.time() + 86400):
+            self.assertIsNotNone(self.get_loader()._virtual_cache_get("rejected"))
+
+    def test_key(self):
+        loader = self.get_loader()
+        self.opts["pillar"] = {"configured": True}
+        self.opts["configured_enabled"] = True
+        self.assertEqual(
+            self.get_loader()._virtual_cache_path(), loader._virtual_cache_path()
+        )
+        self.opts["proxy"] = {"proxytype": "dummy"}
+        self.assertNotEqual(
+            self.get_loader()._virtual_cache_path(), loader._virtual_cache_path()
+        )
+
+    def test_prune(self):
+        paths = []
+        for idx in range(salt.loader.VIRTUAL_CACHE_KEEP + 2):
+            self.opts["grains"] = {"os": "Linux", "idx": idx}
+            loader = self.get_loader()
+            loader._load_all()
+            paths.append(loader._virtual_cache_path())
+            mtime = time.time() - 100 + idx
+            os.utime(paths[-1], (mtime, mtime))
+        self.assertEqual(
+            sorted(
+                os.path.join(self.cache_dir, "loader_index", fn_)
+                for fn_ in os.listdir(os.path.join(self.cache_dir, "loader_index"))
+                if fn_.startswith("virtual-module-")
+            ),
+            sorted(paths[-salt.loader.VIRTUAL_CACHE_KEEP :]),
+        )
+
+    def test_module_change(self):
+        self.get_loader()._load_all()
+        path = os.path.join(self.module_dir, "rejected.py")
+        mtime = os.stat(path).st_mtime + 10
+        os.utime(path, (mtime, mtime))
+        loader = self.get_loader()
+        self.assertIsNone(loader._virtual_cache_get("rejected"))
+        self.assertIsNotNone(loader._virtual_cache_get("other"))
+
+
+class LoaderIncrementalGrainsTest(TestCase):
+    """
+    Test the reuse of grains functions results across refreshes
+    """
+
+    def setUp(self):
+        if not os.path.isdir(RUNTIME_VARS.TMP):
+            os.makedirs(RUNTIME_VARS.TMP)
+        self.cache_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.opts = {
+            "cachedir": self.cache_dir,
+            "grains_refresh_ttl": {"static": 100, "network": 0, "runtime": 0},
+            "grains_refresh_default_volatility": "runtime",
+        }
+        self.calls = collections.Counter()
+
+    def get_func(self, name, volatility=None):
+        def func():
+            self.calls[name] += 1
+            return {name: self.calls[name]}
+
+        if volatility is not None:
+            func.__grains_volatility__ = volatility
+        return func
+
+    def refresh(self, funcs, cache, now):
+        new_cache = {}
+        ret = {}
+        for key, func in six.iteritems(funcs):
+            ret.update(
+                salt.loader._call_grains_func(
+                    self.opts, key, func, {}, cache, new_cache, now
+                )
+            )
+        return ret, new_cache
+
+    def test_expired_classes_rerun(self):
+        funcs = {
+            "core.static": self.get_func("static", "static"),
+            "core.network": self.get_func("network", "network"),
+            "core.default": self.get_func("default"),
+            "custom.ttl": self.get_func("ttl", 10),
+        }
+        ret, cache = self.refresh(funcs, {}, 1000)
+        self.assertEqual(ret, {"static": 1, "network": 1, "default": 1, "ttl": 1})
+        self.assertEqual(set(salt.loader.GRAINS_TIMINGS), set(funcs))
+
+        ret, cache = self.refresh(funcs, cache, 1005)
+        self.assertEqual(ret, {"static": 1, "network": 2, "default": 2, "ttl": 1})
+
+        ret, cache = self.refresh(funcs, cache, 1050)
+        self.assertEqual(ret, {"static": 1, "network": 3, "default": 3, "ttl": 2})
+
+        ret, cache = self.refresh(funcs, cache, 1200)
+        self.assertEqual(ret, {"static": 2, "network": 4, "default": 4, "ttl": 3})
+
+    def test_cached_result_is_copied(self):
+        funcs = {"core.static": self.get_func("static", "static")}
+        ret, cache = self.refresh(funcs, {}, 1000)
+        ret["static"] = "changed"
+        ret, cache = self.refresh(funcs, cache, 1001)
+        self.assertEqual(ret, {"static": 1})
+
+    def test_cache_file(self):
+        cfn = os.path.join(self.cache_dir, "grains.funcs.p")
+        funcs = {"core.static": self.get_func("static", "static")}
+        cache = self.refresh(funcs, {}, 1000)[1]
+        salt.loader._write_grains_funcs_cache(self.opts, cfn, cache)
+        self.assertEqual(
+            salt.loader._load_grains_funcs_cache(self.opts, cfn)["core.static"]["ret"],
+            {"static": 1},
+        )
+
+        # A reboot drops the cache
+        with patch("salt.loader._grains_boot_id", return_value="other boot"):
+            self.assertEqual(salt.loader._load_grains_funcs_cache(self.opts, cfn), {})
+
+    def test_boot_id_boot_time(self):
+        psutil = MagicMock(boot_time=MagicMock(return_value=1600000000.2))
+        with patch("salt.utils.files.fopen", MagicMock(side_effect=IOError)):
+            with patch.object(salt.loader, "HAS_PSUTIL", True):
+                with patch("salt.loader.psutil", psutil, create=True):
+                    self.assertEqual(
+                        salt.loader._grains_boot_id(), "boot-time-1600000000"
+                    )
+            with patch.object(salt.loader, "HAS_PSUTIL", False):
+                self.assertIsNone(salt.loader._grains_boot_id())
+
+    def test_unknown_boot_id(self):
+        cfn = os.path.join(self.cache_dir, "grains.funcs.p")
+        funcs = {"core.static": self.get_func("static", "static")}
+        cache = self.refresh(funcs, {}, 1000)[1]
+        salt.loader._write_grains_funcs_cache(self.opts, cfn, cache)
+        with patch("salt.loader._grains_boot_id", return_value=None):
+            self.assertEqual(salt.loader._load_grains_funcs_cache(self.opts, cfn), {})
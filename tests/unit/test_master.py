@@ -6,6 +6,7 @@ from __future__ import absolute_import
 # Import Salt libs
 import salt.config
 import salt.master
+import salt.serializers.msgpack
 from tests.support.mock import MagicMock, patch
 
 # Import Salt Testing Libs
@@ -554,3 +555,85 @@ class ClearFuncsTestCase(TestCase):
             "salt.utils.minions.CkMinions.auth_check", MagicMock(return_value=False)
         ):
             self.assertEqual(mock_ret, self.clear_funcs.publish(load))
+
+
+class AESFuncsTestCase(TestCase):
+    """
+    TestCase for salt.master.AESFuncs class
+    """
+
+    def setUp(self):
+        opts = salt.config.master_config(None)
+        with patch("salt.master.AESFuncs._AESFuncs__setup_fileserver"), patch(
+            "salt.minion.MasterMinion"
+        ), patch("salt.utils.event.get_master_event"), patch(
+            "salt.client.get_local_client"
+        ), patch(
+            "salt.daemons.masterapi.RemoteFuncs"
+        ):
+            self.aes_funcs = salt.master.AESFuncs(opts)
+
+    def test_return_batch(self):
+        """
+        Test that every return in a batch is stored under the sending minion id
+        """
+        load = {
+            "cmd": "_return_batch",
+            "id": "minion1",
+            "load": [
+                {"jid": "20200101000000000000", "return": True, "id": "minion1"},
+                {"jid": "20200101000000000001", "return": True, "id": "spoofed"},
+                "garbage",
+            ],
+        }
+        with patch("salt.utils.job.store_jobs", MagicMock(return_value=2)) as store:
+            self.aes_funcs._return_batch(load)
+        stored = store.call_args[0][1]
+        self.assertEqual(2, len(stored))
+        self.assertEqual(["minion1", "minion1"], [ret["id"] for ret in stored])
+
+    def test_return_batch_invalid(self):
+        """
+        Test that a batch which is not a list is rejected
+        """
+        load = {"cmd": "_return_batch", "id": "minion1", "load": {}}
+        with patch("salt.utils.job.store_jobs", MagicMock()) as store:
+            self.assertFalse(self.aes_funcs._return_batch(load))
+        store.assert_not_called()
+
+    def test_return_batch_sig(self):
+        """
+        Test that the signature of a batch is verified and kept in the load
+        """
+        self.aes_funcs.opts["drop_messages_signature_fail"] = True
+        load = {
+            "cmd": "_return_batch",
+            "id": "minion1",
+            "load": [{"jid": "20200101000000000000", "return": True}],
+            "sig": "signature",
+        }
+        with patch("salt.utils.job.store_jobs", MagicMock()) as store, patch(
+            "salt.crypt.verify_signature", MagicMock(return_value=False)
+        ) as verify:
+            self.assertFalse(self.aes_funcs._return_batch(load))
+        store.assert_not_called()
+        signed = salt.serializers.msgpack.deserialize(verify.call_args[0][1])
+        self.assertNotIn("sig", signed)
+        self.assertEqual(load["sig"], "signature")
+
+        with patch("salt.utils.job.store_jobs", MagicMock()) as store, patch(
+            "salt.crypt.verify_signature", MagicMock(return_value=True)
+        ):
+            self.aes_funcs._return_batch(load)
+        store.assert_called_once()
+        self.assertEqual(load["sig"], "signature")
+
+    def test_return_sig_required(self):
+        """
+        Test that an unsigned return is rejected when signatures are required
+        """
+        self.aes_funcs.opts["require_minion_sign_messages"] = True
+        load = {"cmd": "_return", "id": "minion1", "jid": "20200101000000000000"}
+        with patch("salt.utils.job.store_job", MagicMock()) as store:
+            self.assertFalse(self.aes_funcs._return(load))
+        store.assert_not_called()
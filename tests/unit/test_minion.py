@@ -207,20 +207,11 @@ class MinionTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
     def test_process_count_max(self):
         """
         Tests that the _handle_decoded_payload function does not spawn more than the configured amount of processes,
-        as per process_count_max.
+        as per process_count_max, and queues the other jobs by priority.
         """
         with patch("salt.minion.Minion.ctx", MagicMock(return_value={})), patch(
-            "salt.utils.process.SignalHandlingProcess.start",
-            MagicMock(return_value=True),
-        ), patch(
-            "salt.utils.process.SignalHandlingProcess.join",
-            MagicMock(return_value=True),
-        ), patch(
-            "salt.utils.minion.running", MagicMock(return_value=[])
-        ), patch(
-            "salt.ext.tornado.gen.sleep",
-            MagicMock(return_value=salt.ext.tornado.concurrent.Future()),
-        ):
+            "salt.utils.minion.write_job_queue", MagicMock()
+        ), patch("salt.utils.minion.running", MagicMock(return_value=[])):
             process_count_max = 10
             mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
             mock_opts['__role'] = 'minion'
@@ -229,42 +220,151 @@ class MinionTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
 
             io_loop = salt.ext.tornado.ioloop.IOLoop()
             minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=io_loop)
+            started = []
+
+            def _run_job(data):
+                started.append(data["jid"])
+                handle = MagicMock()
+                handle.is_alive.return_value = True
+                minion._running_jobs[data["jid"]] = handle
+
             try:
+                with patch.object(minion, "_run_job", _run_job):
+                    # up until process_count_max: jobs are started normally
+                    for i in range(process_count_max):
+                        mock_data = {"fun": "foo.bar", "jid": i}
+                        io_loop.run_sync(
+                            lambda data=mock_data: minion._handle_decoded_payload(data)
+                        )
+                        self.assertEqual(len(started), i + 1)
+                        self.assertEqual(len(minion.jid_queue), i + 1)
+
+                    # above process_count_max: JIDs are queued, no new processes are started
+                    for jid, fun in ((100, "state.highstate"), (101, "test.ping")):
+                        mock_data = {"fun": fun, "jid": jid}
+                        io_loop.run_sync(
+                            lambda data=mock_data: minion._handle_decoded_payload(data)
+                        )
+                    self.assertEqual(len(started), process_count_max)
+                    self.assertEqual(len(minion._job_queue), 2)
+                    queued = salt.utils.minion.write_job_queue.call_args[0][1]
+                    self.assertEqual([job["jid"] for job in queued], [101, 100])
+                    self.assertTrue(all(job["queued"] for job in queued))
+
+                    # a job finishes: the queued job with the best priority starts
+                    minion._running_jobs[0].is_alive.return_value = False
+                    minion._job_done(0)
+                    self.assertEqual(started[-1], 101)
+                    self.assertEqual(len(minion._job_queue), 1)
+            finally:
+                minion.destroy()
 
-                # mock gen.sleep to throw a special Exception when called, so that we detect it
-                class SleepCalledException(Exception):
-                    """Thrown when sleep is called"""
+    @skipIf(True, "SLOWTEST skip")
+    def test_process_count_max_scheduled_jobs(self):
+        """
+        Tests that the scheduled jobs, which are only known through their proc
+        files, count towards process_count_max.
+        """
+        with patch("salt.minion.Minion.ctx", MagicMock(return_value={})), patch(
+            "salt.utils.minion.write_job_queue", MagicMock()
+        ), patch(
+            "salt.utils.minion.running", MagicMock(return_value=[{"jid": "sched"}])
+        ):
+            mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+            mock_opts["__role"] = "minion"
+            mock_opts["minion_jid_queue_hwm"] = 100
+            mock_opts["process_count_max"] = 2
+            io_loop = salt.ext.tornado.ioloop.IOLoop()
+            minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=io_loop)
+            started = []
 
-                salt.ext.tornado.gen.sleep.return_value.set_exception(
-                    SleepCalledException()
-                )
+            def _run_job(data):
+                started.append(data["jid"])
+                handle = MagicMock()
+                handle.is_alive.return_value = True
+                minion._running_jobs[data["jid"]] = handle
 
-                # up until process_count_max: gen.sleep does not get called, processes are started normally
-                for i in range(process_count_max):
-                    mock_data = {"fun": "foo.bar", "jid": i}
-                    io_loop.run_sync(
-                        lambda data=mock_data: minion._handle_decoded_payload(data)
-                    )
-                    self.assertEqual(
-                        salt.utils.process.SignalHandlingProcess.start.call_count, i + 1
-                    )
-                    self.assertEqual(len(minion.jid_queue), i + 1)
-                    salt.utils.minion.running.return_value += [i]
-
-                # above process_count_max: gen.sleep does get called, JIDs are created but no new processes are started
-                mock_data = {"fun": "foo.bar", "jid": process_count_max + 1}
-
-                self.assertRaises(
-                    SleepCalledException,
-                    lambda: io_loop.run_sync(
-                        lambda: minion._handle_decoded_payload(mock_data)
-                    ),
-                )
+            try:
+                with patch.object(minion, "_run_job", _run_job):
+                    for jid in ("1", "2"):
+                        mock_data = {"fun": "foo.bar", "jid": jid}
+                        io_loop.run_sync(
+                            lambda data=mock_data: minion._handle_decoded_payload(data)
+                        )
+                self.assertEqual(started, ["1"])
+                self.assertEqual(len(minion._job_queue), 1)
+            finally:
+                minion.destroy()
+
+    @skipIf(True, "SLOWTEST skip")
+    def test_queued_job_starts_when_job_process_exits(self):
+        """
+        Tests that a queued job is started as soon as the process of the
+        running job exits, when multiprocessing is enabled.
+        """
+        with patch("salt.minion.Minion.ctx", MagicMock(return_value={})), patch(
+            "salt.utils.minion.write_job_queue", MagicMock()
+        ), patch("salt.utils.minion.running", MagicMock(return_value=[])), patch(
+            "salt.utils.platform.is_windows", MagicMock(return_value=False)
+        ):
+            mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+            mock_opts["__role"] = "minion"
+            mock_opts["multiprocessing"] = True
+            mock_opts["process_count_max"] = 1
+            io_loop = salt.ext.tornado.ioloop.IOLoop()
+            minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=io_loop)
+            started = []
+
+            def _process(target, name, args):
+                process = MagicMock()
+                process._after_fork_methods = []
+                process.start.side_effect = lambda: started.append(args[2]["jid"])
+                process.is_alive.return_value = True
+
+                def _join():
+                    process.is_alive.return_value = False
+
+                process.join.side_effect = _join
+                return process
+
+            try:
+                with patch("salt.minion.SignalHandlingProcess", _process):
+                    minion._queue_job({"fun": "test.ping", "jid": "2"})
+                    minion._run_job({"fun": "test.sleep", "jid": "1"})
+                self.assertEqual(started, ["1", "2"])
+                self.assertEqual(minion._job_queue, [])
+                self.assertEqual(minion._running_jobs, {})
+            finally:
+                minion.destroy()
+
+    @skipIf(True, "SLOWTEST skip")
+    def test_send_job_heartbeats(self):
+        """
+        Tests that the minion sends a heartbeat event for its running and queued jobs
+        """
+        with patch("salt.minion.Minion.ctx", MagicMock(return_value={})):
+            mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+            mock_opts["__role"] = "minion"
+            mock_opts["id"] = "minion"
+            mock_opts["multiprocessing"] = False
+            mock_opts["job_heartbeat_interval"] = 5
+            io_loop = salt.ext.tornado.ioloop.IOLoop()
+            minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=io_loop)
+            try:
+                minion.connected = True
+                handle = MagicMock()
+                handle.is_alive.return_value = True
+                minion._running_jobs["1"] = handle
+                minion._job_queue.append((10, 0, 0, {"jid": "2", "fun": "foo.bar"}))
+                with patch.object(minion, "_fire_master", MagicMock()) as fire_master:
+                    minion._send_job_heartbeats()
+                events = fire_master.call_args[1]["events"]
                 self.assertEqual(
-                    salt.utils.process.SignalHandlingProcess.start.call_count,
-                    process_count_max,
+                    [event["tag"] for event in events],
+                    ["salt/job/1/heartbeat/minion", "salt/job/2/heartbeat/minion"],
                 )
-                self.assertEqual(len(minion.jid_queue), process_count_max + 1)
+                self.assertEqual([event["data"]["queued"] for event in events], [False, True])
+                self.assertEqual(events[0]["data"]["heartbeat"], 5)
             finally:
                 minion.destroy()
 
@@ -463,6 +563,94 @@ class MinionTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
             self.assertIn('ps', minion.opts['beacons'])
             self.assertEqual(minion.opts['beacons']['ps'], bdata)
 
+    def test_handle_decoded_payload_job_pool(self):
+        """
+        Tests that jobs are handed to an idle job pool worker instead of a new
+        process
+        """
+        with patch("salt.minion.Minion.ctx", MagicMock(return_value={})), patch(
+            "salt.utils.process.SignalHandlingProcess.start",
+            MagicMock(return_value=True),
+        ), patch(
+            "salt.utils.process.SignalHandlingProcess.join",
+            MagicMock(return_value=True),
+        ):
+            mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+            mock_opts["__role"] = "minion"
+            io_loop = salt.ext.tornado.ioloop.IOLoop()
+            minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=io_loop)
+            try:
+                minion.job_pool = MagicMock()
+                minion.job_pool.submit.return_value = True
+                mock_data = {"fun": "foo.bar", "jid": 123}
+                io_loop.run_sync(lambda: minion._handle_decoded_payload(mock_data))
+                minion.job_pool.submit.assert_called_once_with(mock_data)
+                self.assertEqual(
+                    salt.utils.process.SignalHandlingProcess.start.call_count, 0
+                )
+
+                # Every worker is busy, fork a new process
+                minion.job_pool.submit.return_value = False
+                mock_data = {"fun": "foo.bar", "jid": 456}
+                io_loop.run_sync(lambda: minion._handle_decoded_payload(mock_data))
+                self.assertEqual(
+                    salt.utils.process.SignalHandlingProcess.start.call_count, 1
+                )
+            finally:
+                minion.job_pool = None
+                minion.destroy()
+
+
+class MinionJobPoolTestCase(TestCase):
+    def setUp(self):
+        self.pool = salt.minion.MinionJobPool(MagicMock(), 2, max_jobs=10)
+
+        def _spawn():
+            process = MagicMock()
+            process.is_alive.return_value = True
+            self.pool.workers.append(
+                {"process": process, "conn": MagicMock(), "busy": False}
+            )
+
+        self.pool._spawn = _spawn
+        self.pool.start()
+
+    def test_submit(self):
+        workers = list(self.pool.workers)
+        for worker in workers:
+            worker["conn"].poll.return_value = False
+        self.assertTrue(self.pool.submit({"jid": 1}))
+        self.assertTrue(self.pool.submit({"jid": 2}))
+        workers[0]["conn"].send.assert_called_once_with({"jid": 1})
+        workers[1]["conn"].send.assert_called_once_with({"jid": 2})
+        # Every worker is busy
+        self.assertFalse(self.pool.submit({"jid": 3}))
+
+        # The first worker is done with its job
+        workers[0]["conn"].poll.return_value = True
+        workers[0]["conn"].recv.return_value = "done"
+        self.assertTrue(self.pool.submit({"jid": 3}))
+        workers[0]["conn"].send.assert_called_with({"jid": 3})
+
+    def test_recycle(self):
+        worker = self.pool.workers[0]
+        self.assertTrue(self.pool.submit({"jid": 1}))
+        worker["conn"].poll.return_value = True
+        worker["conn"].recv.return_value = "exit"
+        self.pool.reap()
+        self.assertNotIn(worker, self.pool.workers)
+        self.assertIn(worker["process"], self.pool.retired)
+        # A replacement was forked
+        self.assertEqual(len(self.pool.workers), 2)
+
+    def test_restart(self):
+        workers = list(self.pool.workers)
+        self.pool.restart()
+        for worker in workers:
+            worker["conn"].send.assert_called_once_with(None)
+            self.assertNotIn(worker, self.pool.workers)
+        self.assertEqual(len(self.pool.workers), 2)
+
 
 class MinionAsyncTestCase(
     TestCase, AdaptedConfigurationTestCaseMixin, salt.ext.tornado.testing.AsyncTestCase
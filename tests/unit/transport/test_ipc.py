@@ -271,3 +271,28 @@ class IPCMessagePubSubCase(salt.ext.tornado.testing.AsyncTestCase):
         ret2 = client2.read_sync()
         self.assertEqual(ret1, "TEST")
         self.assertEqual(ret2, "TEST")
+
+    def test_filtered_reading(self):
+        client1 = self.sub_channel
+        client2 = self._get_sub_channel()
+
+        acked = self.io_loop.run_sync(
+            lambda: client1.set_filters([["startswith", "salt/job/"]], timeout=5)
+        )
+        self.assertTrue(acked)
+
+        self.pub_channel.publish("OTHER", tag="salt/auth")
+        self.pub_channel.publish("TEST", tag="salt/job/1/ret/minion")
+        ret1 = client1.read_sync()
+        ret2 = client2.read_sync()
+        ret3 = client2.read_sync()
+        self.assertEqual(ret1, "TEST")
+        self.assertEqual(ret2, "OTHER")
+        self.assertEqual(ret3, "TEST")
+
+    def test_match_filters(self):
+        match_filters = salt.transport.ipc.IPCMessagePublisher._match_filters
+        self.assertTrue(match_filters("salt/job/1/ret/m", [("startswith", "salt/job")]))
+        self.assertTrue(match_filters("salt/job/1/ret/m", [("fnmatch", "salt/*/ret/*")]))
+        self.assertFalse(match_filters("salt/auth", [("startswith", "salt/job")]))
+        self.assertFalse(match_filters("salt/auth", []))
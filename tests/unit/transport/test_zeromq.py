@@ -25,7 +25,7 @@ import zmq.eventloop.ioloop
 from salt.ext import six
 from salt.ext.six.moves import range
 from salt.ext.tornado.testing import AsyncTestCase
-from salt.transport.zeromq import AsyncReqMessageClientPool
+from salt.transport.zeromq import AsyncMuxReqMessageClient, AsyncReqMessageClientPool
 
 # Import test support libs
 from tests.support.runtests import RUNTIME_VARS
@@ -368,6 +368,79 @@ class AsyncReqMessageClientPoolTest(TestCase):
         self.assertEqual([], self.message_client_pool.message_clients)
 
 
+class AsyncMuxReqMessageClientTest(TestCase):
+    def setUp(self):
+        super(AsyncMuxReqMessageClientTest, self).setUp()
+        self.io_loop = MagicMock()
+        with patch(
+            "salt.transport.zeromq.AsyncMuxReqMessageClient._init_socket",
+            MagicMock(return_value=None),
+        ):
+            self.message_client = AsyncMuxReqMessageClient(
+                {"zmq_req_max_inflight": 2}, "tcp://127.0.0.1:4506", io_loop=self.io_loop
+            )
+        self.message_client.stream = MagicMock()
+        self.message_client.context = MagicMock()
+
+    def tearDown(self):
+        del self.message_client
+        super(AsyncMuxReqMessageClientTest, self).tearDown()
+
+    def _sent_request_ids(self):
+        return [
+            call[0][0][0]
+            for call in self.message_client.stream.send_multipart.call_args_list
+        ]
+
+    def test_send_respects_max_inflight(self):
+        futures = [self.message_client.send({"n": n}) for n in range(3)]
+        self.assertEqual(2, len(self.message_client.inflight))
+        self.assertEqual(1, len(self.message_client.send_queue))
+        self.assertEqual(2, self.message_client.stream.send_multipart.call_count)
+        self.assertFalse(any(future.done() for future in futures))
+
+    def test_replies_out_of_order(self):
+        serial = self.message_client.serial
+        first = self.message_client.send({"n": 1})
+        second = self.message_client.send({"n": 2})
+        third = self.message_client.send({"n": 3})
+        first_id, second_id = self._sent_request_ids()
+
+        self.message_client._handle_reply([second_id, b"", serial.dumps("two")])
+        self.assertTrue(second.done())
+        self.assertEqual("two", second.result())
+        self.assertFalse(first.done())
+        # The freed slot is used by the queued request right away
+        self.assertEqual(3, self.message_client.stream.send_multipart.call_count)
+
+        third_id = self._sent_request_ids()[-1]
+        self.message_client._handle_reply([third_id, b"", serial.dumps("three")])
+        self.message_client._handle_reply([first_id, b"", serial.dumps("one")])
+        self.assertEqual("one", first.result())
+        self.assertEqual("three", third.result())
+        self.assertEqual({}, self.message_client.inflight)
+
+    def test_timeout_retries_under_new_id(self):
+        serial = self.message_client.serial
+        future = self.message_client.send({"n": 1}, timeout=5, tries=1)
+        old_id = self._sent_request_ids()[0]
+        self.message_client.timeout_message(future)
+        new_id = self._sent_request_ids()[-1]
+        self.assertNotEqual(old_id, new_id)
+
+        # a late reply to the first attempt is ignored
+        self.message_client._handle_reply([old_id, b"", serial.dumps("late")])
+        self.assertFalse(future.done())
+        self.message_client._handle_reply([new_id, b"", serial.dumps("ok")])
+        self.assertEqual("ok", future.result())
+
+    def test_timeout_exhausted(self):
+        future = self.message_client.send({"n": 1}, timeout=5, tries=0)
+        self.message_client.timeout_message(future)
+        self.assertRaises(salt.exceptions.SaltReqTimeoutError, future.result)
+        self.assertEqual({}, self.message_client.inflight)
+
+
 class ZMQConfigTest(TestCase):
     def test_master_uri(self):
         """
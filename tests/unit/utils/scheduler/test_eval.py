@@ -911,3 +911,50 @@ class SchedulerEvalTest(SchedulerTestsBase):
         ret = self.schedule.job_status(job_name)
         self.assertNotIn("_last_run", ret)
         self.assertEqual(ret["_next_fire_time"], None)
+
+    def test_eval_seconds_deferred(self):
+        """
+        verify that a job which is not due is only evaluated again at its
+        next fire time, or after the schedule changed
+        """
+        job_name = "job_eval_seconds_deferred"
+        job = {
+            "schedule": {
+                job_name: {"function": "test.ping", "seconds": "30", "dry_run": True}
+            }
+        }
+
+        # Add job to schedule
+        self.schedule.opts.update(job)
+
+        # eval at 2:00pm to prime, simulate minion start up.
+        run_time = dateutil.parser.parse("11/29/2017 2:00pm")
+        next_run_time = run_time + datetime.timedelta(seconds=30)
+        self.schedule.eval(now=run_time)
+        self.assertIn(job_name, self.schedule._deferred)
+
+        # eval at 2:00:01pm, the job is not looked at.
+        self.schedule.opts["schedule"][job_name]["_next_fire_time"] = None
+        run_time = dateutil.parser.parse("11/29/2017 2:00:01pm")
+        self.schedule.eval(now=run_time)
+        ret = self.schedule.job_status(job_name)
+        self.assertIsNone(ret["_next_fire_time"])
+        self.schedule.opts["schedule"][job_name]["_next_fire_time"] = next_run_time
+
+        # eval at 2:00:30pm, will run.
+        run_time = dateutil.parser.parse("11/29/2017 2:00:30pm")
+        self.schedule.eval(now=run_time)
+        ret = self.schedule.job_status(job_name)
+        self.assertEqual(ret["_last_run"], run_time)
+        self.assertEqual(
+            ret["_next_fire_time"], run_time + datetime.timedelta(seconds=30)
+        )
+        self.assertIn(job_name, self.schedule._deferred)
+
+        # disabling the job makes it evaluated again.
+        self.schedule.disable_job(job_name, persist=False)
+        self.assertNotIn(job_name, self.schedule._deferred)
+        run_time = dateutil.parser.parse("11/29/2017 2:00:31pm")
+        self.schedule.eval(now=run_time)
+        ret = self.schedule.job_status(job_name)
+        self.assertEqual(ret["_skip_reason"], "disabled")
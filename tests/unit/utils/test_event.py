@@ -13,6 +13,8 @@ from __future__ import absolute_import, print_function, unicode_literals
 import hashlib
 import os
 import shutil
+import signal
+import threading
 import time
 import shutil
 
@@ -20,10 +22,14 @@ import shutil
 from tests.support.unit import expectedFailure, skipIf, TestCase
 from tests.support.runtests import RUNTIME_VARS
 from tests.support.events import eventpublisher_process, eventsender_process
+from tests.support.mock import MagicMock, call, patch
 
 # Import salt libs
 import salt.config
+import salt.ext.tornado.concurrent
 import salt.ext.tornado.ioloop
+import salt.payload
+import salt.utils.asynchronous
 import salt.utils.event
 import salt.utils.stringutils
 
@@ -118,6 +124,132 @@ class TestSaltEvent(TestCase):
             )
         )
 
+    def test_package_tag(self):
+        self.assertEqual(
+            salt.utils.event._package_tag(b"salt/job/1/ret/foo\n\n\x81\xa1a\x01"),
+            "salt/job/1/ret/foo",
+        )
+        self.assertIsNone(salt.utils.event._package_tag(b""))
+
+    def test_publisher_filters(self):
+        opts = {"sock_dir": self.sock_dir, "event_publisher_filtering": True}
+        me = salt.utils.event.MasterEvent(self.sock_dir, opts, listen=False)
+        me.subscriber = MagicMock()
+        ack = salt.ext.tornado.concurrent.Future()
+        ack.set_result(True)
+        me.subscriber.set_filters.return_value = ack
+        me._run_io_loop_sync = False
+        me.io_loop = MagicMock()
+
+        # Nothing subscribed, keep receiving everything
+        me._update_publisher_filters()
+        self.assertIsNone(me._publisher_filters)
+
+        # Narrowing the filters is not waited on
+        self.assertIsNone(me.subscribe("salt/job/1"))
+        me.io_loop.spawn_callback.assert_called_with(
+            me.subscriber.set_filters, [["startswith", "salt/job/1"]], 0
+        )
+
+        # Waiting on a subscribed tag does not register it again
+        me._current_tag = ["salt/job/1/ret/minion", me._match_tag_startswith]
+        me._update_publisher_filters()
+        self.assertEqual(me._publisher_filters, [["startswith", "salt/job/1"]])
+        self.assertEqual(me.io_loop.spawn_callback.call_count, 1)
+
+        # Widening the filters first has the publisher send every event
+        future = me.subscribe("salt/*/ret/*", match_type="fnmatch")
+        self.assertTrue(future.result())
+        me.subscriber.set_filters.assert_called_once_with(None, timeout=1)
+        self.assertEqual(
+            me._publisher_filters,
+            [["startswith", "salt/job/1"], ["fnmatch", "salt/*/ret/*"]],
+        )
+        me.io_loop.spawn_callback.assert_called_with(
+            me.subscriber.set_filters, me._publisher_filters, 0
+        )
+
+        # A subscription the publisher cannot express disables the filtering
+        me.subscribe("syndic/.*/1", match_type="regex")
+        self.assertIsNone(me._publisher_filters)
+        me.unsubscribe("syndic/.*/1", match_type="regex")
+        self.assertEqual(len(me._publisher_filters), 2)
+
+    def test_publisher_filters_widen_ack(self):
+        opts = {"sock_dir": self.sock_dir, "event_publisher_filtering": True}
+        me = salt.utils.event.MasterEvent(self.sock_dir, opts, listen=False)
+        me.subscriber = MagicMock()
+        ack = salt.ext.tornado.concurrent.Future()
+        me.subscriber.set_filters.return_value = ack
+        me._run_io_loop_sync = False
+        io_loop = salt.ext.tornado.ioloop.IOLoop()
+        self.addCleanup(io_loop.close)
+        me.io_loop = io_loop
+        me.pending_tags.append(["salt/job/1", me._match_tag_startswith])
+        me._publisher_filters = [["startswith", "salt/job/1"]]
+
+        with salt.utils.asynchronous.current_ioloop(io_loop):
+            future = me.subscribe("salt/job/2")
+            self.assertFalse(future.done())
+            self.assertIsNone(me._publisher_filters)
+            # Until the publisher acknowledged, updates wait on the same future
+            self.assertIs(me.subscribe("salt/job/3"), future)
+            io_loop.add_callback(ack.set_result, True)
+            self.assertTrue(io_loop.run_sync(lambda: future))
+        self.assertEqual(
+            me.subscriber.set_filters.call_args_list[0], call(None, timeout=1)
+        )
+        self.assertEqual(
+            me._publisher_filters,
+            [
+                ["startswith", "salt/job/1"],
+                ["startswith", "salt/job/2"],
+                ["startswith", "salt/job/3"],
+            ],
+        )
+
+    def _pack(self, tag, data):
+        return b"".join(
+            [
+                salt.utils.stringutils.to_bytes(tag),
+                salt.utils.stringutils.to_bytes(salt.utils.event.TAGEND),
+                salt.payload.Serial({"serial": "msgpack"}).dumps(data),
+            ]
+        )
+
+    def test_unpack_tag(self):
+        raw = self._pack("salt/job/1/ret/minion", {"data": "foo1"})
+        self.assertEqual(
+            salt.utils.event.SaltEvent.unpack_tag(raw), "salt/job/1/ret/minion"
+        )
+        self.assertEqual(
+            salt.utils.event.SaltEvent.unpack(raw),
+            ("salt/job/1/ret/minion", {"data": "foo1"}),
+        )
+
+    def test_unwanted_events_not_decoded(self):
+        me = salt.utils.event.MasterEvent(self.sock_dir, listen=False)
+        me.cpub = True
+        me.subscriber = MagicMock()
+        me.subscriber.read_sync.side_effect = [
+            self._pack("salt/auth", {"data": "foo1"}),
+            self._pack("salt/job/1/ret/minion", {"data": "foo2"}),
+        ]
+        with patch.object(
+            me, "unpack_data", wraps=salt.utils.event.SaltEvent.unpack_data
+        ) as unpack_data:
+            evt = me.get_event(tag="salt/job/", full=True, wait=5)
+        self.assertEqual(evt["tag"], "salt/job/1/ret/minion")
+        self.assertEqual(evt["data"], {"data": "foo2"})
+        self.assertEqual(unpack_data.call_count, 1)
+
+    def test_event_matching_callable(self):
+        me = salt.utils.event.MasterEvent(self.sock_dir, listen=False)
+        self.assertIs(me._get_match_func(len), len)
+        self.assertEqual(
+            me._get_match_func("startswith"), me._match_tag_startswith
+        )
+
     @skipIf(True, "SLOWTEST skip")
     def test_event_single(self):
         '''Test a single event is received'''
@@ -342,6 +474,144 @@ class TestAsyncEventPublisher(AsyncTestCase):
         self.assertEqual(self.data, {"data": "foo1"})
 
 
+class TestEventReturnWorker(TestCase):
+    def setUp(self):
+        self.cachedir = os.path.join(RUNTIME_VARS.TMP, "event-return-cache")
+        self.addCleanup(shutil.rmtree, self.cachedir, ignore_errors=True)
+        self.opts = {
+            "cachedir": self.cachedir,
+            "event_return_queue": 2,
+            "event_return_queue_max_size": 4,
+            "event_return_overflow": "drop",
+            "event_return_retries": 2,
+            "event_return_retry_backoff": 1.0,
+            "event_return_retry_backoff_max": 3.0,
+        }
+        self.returner = MagicMock()
+
+    def _worker(self, **opts):
+        self.opts.update(opts)
+        return salt.utils.event.EventReturnWorker(self.opts, "foo", self.returner)
+
+    def _events(self, count):
+        return [{"tag": "evt{0}".format(idx), "data": {}} for idx in range(count)]
+
+    def test_batches(self):
+        worker = self._worker()
+        for event in self._events(3):
+            worker.put(event)
+        queued_at, batch = worker._next_batch()
+        self.assertEqual([evt["tag"] for evt in batch], ["evt0", "evt1"])
+        # A partial batch is only sent when stopping
+        worker.stop()
+        queued_at, batch = worker._next_batch()
+        self.assertEqual([evt["tag"] for evt in batch], ["evt2"])
+        self.assertIsNone(worker._next_batch())
+
+    def test_overflow_drop(self):
+        worker = self._worker()
+        for event in self._events(6):
+            worker.put(event)
+        stats = worker.get_stats()
+        self.assertEqual(stats["queued"], 4)
+        self.assertEqual(stats["dropped"], 2)
+
+    def test_overflow_spill(self):
+        worker = self._worker(event_return_overflow="spill")
+        for event in self._events(6):
+            worker.put(event)
+        stats = worker.get_stats()
+        self.assertEqual(stats["queued"], 4)
+        self.assertEqual(stats["spilled"], 2)
+        self.assertEqual(stats["spill_pending"], 1)
+
+        # Live events are sent first, spilled ones once caught up
+        tags = []
+        worker.stop()
+        while True:
+            item = worker._next_batch()
+            if item is None:
+                break
+            tags.extend(evt["tag"] for evt in item[1])
+        self.assertEqual(tags, ["evt2", "evt3", "evt4", "evt5", "evt0", "evt1"])
+        self.assertEqual(worker.get_stats()["spill_pending"], 0)
+
+    def test_unspill_unlocked(self):
+        worker = self._worker(event_return_overflow="spill")
+        for event in self._events(6):
+            worker.put(event)
+        worker._next_batch()
+        worker._next_batch()
+
+        # The spilled batch is read while put() can still queue events
+        locked = []
+
+        def _try_lock():
+            acquired = worker.cond.acquire(False)
+            if acquired:
+                worker.cond.release()
+            locked.append(not acquired)
+
+        def _loads(data):
+            thread = threading.Thread(target=_try_lock)
+            thread.start()
+            thread.join()
+            return worker.serial.__class__(self.opts).loads(data)
+
+        with patch.object(worker.serial, "loads", _loads):
+            queued_at, batch = worker._next_batch()
+        self.assertEqual([evt["tag"] for evt in batch], ["evt0", "evt1"])
+        self.assertEqual(locked, [False])
+
+    def test_spill_unlocked(self):
+        worker = self._worker(event_return_overflow="spill")
+        locked = []
+
+        def _try_lock():
+            acquired = worker.cond.acquire(False)
+            if acquired:
+                worker.cond.release()
+            locked.append(not acquired)
+
+        def _dumps(data):
+            thread = threading.Thread(target=_try_lock)
+            thread.start()
+            thread.join()
+            return worker.serial.__class__(self.opts).dumps(data)
+
+        with patch.object(worker.serial, "dumps", _dumps):
+            for event in self._events(5):
+                worker.put(event)
+        self.assertEqual(locked, [False])
+        self.assertEqual(worker.get_stats()["spill_pending"], 1)
+
+    def test_deliver_retries(self):
+        worker = self._worker()
+        self.returner.side_effect = [Exception("down"), Exception("down"), None]
+        with patch("time.sleep") as sleep:
+            self.assertTrue(worker.deliver(self._events(1)))
+        self.assertEqual(self.returner.call_count, 3)
+        self.assertEqual([call[0][0] for call in sleep.call_args_list], [1.0, 2.0])
+        self.assertEqual(worker.stats["retries"], 2)
+
+        self.returner.reset_mock()
+        self.returner.side_effect = Exception("down")
+        with patch("time.sleep"):
+            self.assertFalse(worker.deliver(self._events(1)))
+        self.assertEqual(self.returner.call_count, 3)
+
+    def test_run(self):
+        worker = self._worker()
+        for event in self._events(3):
+            worker.put(event)
+        worker.stop()
+        worker.run()
+        self.assertEqual(self.returner.call_count, 2)
+        stats = worker.get_stats()
+        self.assertEqual(stats["delivered"], 3)
+        self.assertEqual(stats["queued"], 0)
+
+
 class TestEventReturn(TestCase):
     @skipIf(True, "SLOWTEST skip")
     def test_event_return(self):
@@ -368,3 +638,17 @@ class TestEventReturn(TestCase):
         finally:
             if evt is not None:
                 terminate_process(evt.pid, kill_children=True)
+
+    def test_handle_signals(self):
+        """
+        The signal handler only stops the loop, the workers are flushed and
+        joined on the way out of run()
+        """
+        evt = salt.utils.event.EventReturn.__new__(salt.utils.event.EventReturn)
+        evt._signal_handled = threading.Event()
+        evt.stop = False
+        worker = MagicMock()
+        evt.workers = {"foo": worker}
+        evt._handle_signals(signal.SIGTERM, None)
+        self.assertTrue(evt.stop)
+        worker.join.assert_not_called()
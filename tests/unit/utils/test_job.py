@@ -59,3 +59,16 @@ class JobTest(TestCase):
                 with self.assertLogs('salt.utils.job', level='CRITICAL') as logged:
                     job.store_job(MockMasterMinion.opts, {'jid': '20190618090114890985', 'return': {'success': True}, 'id': 'a'})
                     self.assertIn("The specified 'foo' returner threw a stack trace", logged.output[0])
+
+    def test_store_jobs(self):
+        '''
+        test store_jobs stores every valid load with a single MasterMinion
+        '''
+        loads = [
+            {'jid': '20190618090114890985', 'return': True, 'id': 'a'},
+            {'jid': '20190618090114890986', 'return': True, 'id': 'a'},
+            {'jid': '20190618090114890987', 'id': 'a'},
+        ]
+        with patch.object(salt.minion, 'MasterMinion', MockMasterMinion), \
+                patch('salt.utils.verify.valid_id', return_value=True):
+            self.assertEqual(job.store_jobs(MockMasterMinion.opts, loads), 2)
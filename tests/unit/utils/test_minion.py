@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+# Import python libs
+from __future__ import absolute_import, unicode_literals
+
+import os
+import shutil
+import tempfile
+
+# Import Salt Libs
+import salt.utils.minion
+from tests.support.mock import patch
+from tests.support.runtests import RUNTIME_VARS
+
+# Import Salt Testing Libs
+from tests.support.unit import TestCase
+
+
+class JobQueueTestCase(TestCase):
+    def setUp(self):
+        if not os.path.isdir(RUNTIME_VARS.TMP):
+            os.makedirs(RUNTIME_VARS.TMP)
+        self.cachedir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.cachedir, ignore_errors=True)
+        self.opts = {"cachedir": self.cachedir}
+
+    def test_queued(self):
+        self.assertEqual(salt.utils.minion.queued(self.opts), [])
+        jobs = [{"jid": "1", "fun": "test.ping", "queued": True, "queue_position": 0}]
+        salt.utils.minion.write_job_queue(self.opts, jobs)
+        self.assertEqual(salt.utils.minion.queued(self.opts), jobs)
+
+        # An empty queue removes the file
+        salt.utils.minion.write_job_queue(self.opts, [])
+        self.assertEqual(os.listdir(self.cachedir), [])
+
+    def test_queued_stale(self):
+        jobs = [{"jid": "1", "fun": "test.ping", "queued": True, "queue_position": 0}]
+        salt.utils.minion.write_job_queue(self.opts, jobs)
+        with patch("salt.utils.process.os_is_running", return_value=False):
+            self.assertEqual(salt.utils.minion.queued(self.opts), [])
@@ -3,9 +3,12 @@
 from __future__ import absolute_import, print_function, unicode_literals
 
 import codecs
+import datetime
 import glob
 import logging
 import os
+import shutil
+import tempfile
 import textwrap
 
 import salt.loader
@@ -13,8 +16,10 @@ import salt.utils.data
 import salt.utils.files
 import salt.utils.reactor as reactor
 import salt.utils.yaml
+from salt.ext.six.moves import queue
 from tests.support.mixins import AdaptedConfigurationTestCaseMixin
 from tests.support.mock import MagicMock, Mock, mock_open, patch
+from tests.support.runtests import RUNTIME_VARS
 from tests.support.unit import TestCase
 
 REACTOR_CONFIG = """\
@@ -462,6 +467,158 @@ class TestReactor(TestCase, AdaptedConfigurationTestCaseMixin):
                                     )
                                     self.assertEqual(reactions, LOW_CHUNKS[tag])
 
+    def test_render_reaction_cache(self):
+        """
+        Ensure that reactor SLS files without templating are only rendered
+        once.
+        """
+        tmpdir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        static = os.path.join(tmpdir, "static.sls")
+        dynamic = os.path.join(tmpdir, "dynamic.sls")
+        with salt.utils.files.fopen(static, "w") as fp_:
+            fp_.write("run:\n  runner.test.arg:\n    - arg: [1]\n")
+        with salt.utils.files.fopen(dynamic, "w") as fp_:
+            fp_.write("run:\n  runner.test.arg:\n    - arg: [{{ data['x'] }}]\n")
+
+        render = MagicMock(
+            side_effect=lambda *args, **kwargs: {"run": {"runner.test.arg": []}}
+        )
+        with patch.object(self.reactor, "render_template", render):
+            for _ in range(3):
+                react = self.reactor.render_reaction(static, "tag", {})
+                self.assertEqual(react["run"]["__sls__"], static)
+            self.assertEqual(render.call_count, 1)
+
+            for _ in range(3):
+                self.reactor.render_reaction(dynamic, "tag", {"x": 1})
+            self.assertEqual(render.call_count, 4)
+
+            # A changed file is rendered again
+            with salt.utils.files.fopen(static, "a") as fp_:
+                fp_.write("\n")
+            self.reactor.render_reaction(static, "tag", {})
+            self.assertEqual(render.call_count, 5)
+
+
+class TestTagMatcher(TestCase):
+    """
+    Tests for matching event tags against the reactor globs
+    """
+
+    def test_match(self):
+        react_map = [
+            {"salt/minion/*/start": ["/srv/reactor/start.sls"]},
+            {"salt/job/*/ret/*": "/srv/reactor/ret.sls"},
+            {"*": ["/srv/reactor/all.sls"]},
+            {"salt/minion/web?/start": ["/srv/reactor/web.sls"]},
+            {"salt/[ab]uth": ["/srv/reactor/auth.sls"]},
+            "not a dict",
+        ]
+        matcher = reactor.TagMatcher(react_map)
+        self.assertEqual(
+            matcher.match("salt/minion/web1/start"),
+            [
+                ("salt/minion/*/start", ["/srv/reactor/start.sls"]),
+                ("*", ["/srv/reactor/all.sls"]),
+                ("salt/minion/web?/start", ["/srv/reactor/web.sls"]),
+            ],
+        )
+        self.assertEqual(
+            matcher.match("salt/job/20200101/ret/web1"),
+            [
+                ("salt/job/*/ret/*", ["/srv/reactor/ret.sls"]),
+                ("*", ["/srv/reactor/all.sls"]),
+            ],
+        )
+        self.assertEqual(
+            matcher.match("salt/auth"),
+            [("*", ["/srv/reactor/all.sls"]), ("salt/[ab]uth", ["/srv/reactor/auth.sls"])],
+        )
+        self.assertEqual(reactor.TagMatcher(react_map[:2]).match("salt/auth"), [])
+
+    def test_event_lag(self):
+        stamp = (datetime.datetime.utcnow() - datetime.timedelta(seconds=5)).isoformat()
+        lag = reactor._event_lag({"_stamp": stamp})
+        self.assertTrue(4 < lag < 60)
+        self.assertIsNone(reactor._event_lag({}))
+        self.assertIsNone(reactor._event_lag({"_stamp": "garbage"}))
+
+
+class TestShardIndex(TestCase):
+    """
+    Tests for routing events to the reactor shards
+    """
+
+    def test_shard_index(self):
+        data = {"id": "web1", "_stamp": "2020-01-01T00:00:00.000000"}
+        index = reactor.shard_index("salt/minion/web1/start", data, "data:id", 4)
+        self.assertIn(index, range(4))
+        # The same key is always routed to the same shard
+        self.assertEqual(
+            reactor.shard_index("salt/job/1/ret/web1", data, "data:id", 4), index
+        )
+        self.assertEqual(
+            reactor.shard_index("salt/minion/web1/start", {}, "tag:2", 4), index
+        )
+        # The keys are spread over the shards
+        self.assertTrue(
+            len(
+                set(
+                    reactor.shard_index("tag", {"id": "web{0}".format(num)}, "data:id", 4)
+                    for num in range(32)
+                )
+            )
+            > 1
+        )
+
+    def test_shard_index_no_key(self):
+        self.assertEqual(reactor.shard_index("salt/auth", {}, "data:id", 4), 0)
+        self.assertEqual(reactor.shard_index("salt/auth", {}, "tag:5", 4), 0)
+        self.assertEqual(reactor.shard_index("salt/auth", {"id": "a"}, "data:id", 1), 0)
+
+
+class TestReactorShard(TestCase):
+    """
+    Tests for the reactor shard processes
+    """
+
+    def get_shard(self, shard_queue):
+        shard = reactor.ReactorShard.__new__(reactor.ReactorShard)
+        shard.opts = {}
+        shard.index = 0
+        shard.queue = shard_queue
+        shard.reactor_pid = 1234
+        return shard
+
+    def test_run_stops_on_sentinel(self):
+        shard_queue = queue.Queue()
+        shard_queue.put(("salt/test", {"foo": "bar"}))
+        shard_queue.put(None)
+        shard = self.get_shard(shard_queue)
+        with patch.object(reactor, "ReactWrap", MagicMock()), patch.object(
+            shard, "handle_event", MagicMock()
+        ) as handle_event:
+            shard.run()
+        handle_event.assert_called_once_with("salt/test", {"foo": "bar"})
+
+    def test_run_stops_without_reactor(self):
+        shard = self.get_shard(MagicMock(get=MagicMock(side_effect=queue.Empty)))
+        with patch.object(reactor, "ReactWrap", MagicMock()), patch(
+            "salt.utils.process.os_is_running", MagicMock(return_value=False)
+        ) as os_is_running:
+            shard.run()
+        os_is_running.assert_called_once_with(1234)
+
+    def test_stop_shards(self):
+        shards = [MagicMock(), MagicMock()]
+        shards[1].queue.put_nowait.side_effect = queue.Full
+        obj = reactor.Reactor.__new__(reactor.Reactor)
+        obj.shards = shards
+        obj.stop_shards()
+        for shard in shards:
+            shard.queue.put_nowait.assert_called_once_with(None)
+
 
 class TestReactWrap(TestCase, AdaptedConfigurationTestCaseMixin):
     """
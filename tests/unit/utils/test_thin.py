@@ -5,10 +5,15 @@
 from __future__ import absolute_import, print_function, unicode_literals
 
 import os
+import shutil
 import sys
+import tarfile
+import tempfile
 
 import salt.exceptions
 import salt.ext.six
+import salt.utils.files
+import salt.utils.hashutils
 import salt.utils.json
 import salt.utils.platform
 import salt.utils.stringutils
@@ -17,6 +22,7 @@ from salt.utils import thin
 from salt.utils.stringutils import to_bytes as bts
 from tests.support.helpers import TstSuiteLoggingHandler
 from tests.support.mock import MagicMock, patch
+from tests.support.runtests import RUNTIME_VARS
 from tests.support.unit import TestCase, skipIf
 
 try:
@@ -940,3 +946,92 @@ class SSHThinTestCase(TestCase):
         )
         for t_line in ["second-system-effect:2:7", "solar-interference:2:6"]:
             self.assertIn(t_line, out)
+
+
+class SSHThinLayersTestCase(TestCase):
+    """
+    TestCase for the layered salt-thin bundle.
+    """
+
+    def setUp(self):
+        if not os.path.isdir(RUNTIME_VARS.TMP):
+            os.makedirs(RUNTIME_VARS.TMP)
+        self.tmpdir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        self.cachedir = os.path.join(self.tmpdir, "cache")
+        self.pkg = os.path.join(self.tmpdir, "lib", "foo")
+        os.makedirs(self.pkg)
+        for name in ("__init__.py", "bar.py"):
+            with salt.utils.files.fopen(os.path.join(self.pkg, name), "w") as fh_:
+                fh_.write("# {0}\n".format(name))
+        self.mod = os.path.join(self.tmpdir, "lib", "baz.py")
+        with salt.utils.files.fopen(self.mod, "w") as fh_:
+            fh_.write("# baz\n")
+        self.tops = MagicMock(return_value={3: [self.pkg, self.mod]})
+        patcher = patch.multiple(
+            "salt.utils.thin",
+            _get_tops_py_version_mapping=self.tops,
+            _get_salt_call=MagicMock(return_value=bts("salt-call")),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _layers(self):
+        return dict(
+            (layer["roots"][0], layer)
+            for layer in thin.thin_manifest(self.cachedir)["layers"]
+        )
+
+    def test_gen_thin_layers(self):
+        """
+        Test every top is packed into its own layer, listed in the manifest.
+        """
+        manifest_path = thin.gen_thin_layers(self.cachedir)
+        self.assertEqual(
+            manifest_path, os.path.join(self.cachedir, "thin", "manifest.json")
+        )
+        layers = self._layers()
+        self.assertEqual(
+            sorted(layers), [".thin-gen-py-version", "py3/baz.py", "py3/foo"]
+        )
+        self.assertIn("salt-call", layers[".thin-gen-py-version"]["roots"])
+        layer_path = os.path.join(
+            self.cachedir, "thin", "layers", layers["py3/foo"]["id"] + ".tgz"
+        )
+        self.assertEqual(
+            layers["py3/foo"]["sum"], salt.utils.hashutils.get_hash(layer_path, "sha1")
+        )
+        tfp = tarfile.open(layer_path)
+        self.assertEqual(
+            sorted(tfp.getnames()), ["py3/foo/__init__.py", "py3/foo/bar.py"]
+        )
+        tfp.close()
+
+        # Nothing changed, the tops are not even collected again
+        thin.gen_thin_layers(self.cachedir)
+        self.assertEqual(self.tops.call_count, 1)
+
+    def test_gen_thin_layers_changed_top(self):
+        """
+        Test only the layer of a changed top is packed again.
+        """
+        thin.gen_thin_layers(self.cachedir)
+        old = self._layers()
+        layerdir = os.path.join(self.cachedir, "thin", "layers")
+        mod_layer = os.path.join(layerdir, old["py3/baz.py"]["id"] + ".tgz")
+        mtime = os.path.getmtime(mod_layer) - 60
+        os.utime(mod_layer, (mtime, mtime))
+
+        with salt.utils.files.fopen(os.path.join(self.pkg, "bar.py"), "a") as fh_:
+            fh_.write("# changed\n")
+        thin.gen_thin_layers(self.cachedir, overwrite=True)
+        new = self._layers()
+
+        self.assertEqual(new["py3/baz.py"], old["py3/baz.py"])
+        self.assertEqual(os.path.getmtime(mod_layer), mtime)
+        self.assertNotEqual(new["py3/foo"]["id"], old["py3/foo"]["id"])
+        # The replaced layers are dropped
+        self.assertEqual(
+            sorted(os.listdir(layerdir)),
+            sorted(layer["id"] + ".tgz" for layer in new.values()),
+        )